@@ -0,0 +1,240 @@
+# backend/instrumentation.py
+"""
+Per-request performance instrumentation.
+
+- PerfInstrumentationMiddleware times every request, counts ORM queries,
+  measures the response size and adds a Server-Timing header.
+- span("name") marks a phase inside a view (file I/O, CSV parse, indicators, ...).
+  Outside an instrumented request it returns a shared no-op context manager.
+- Per-route histograms (p50/p95/p99) are kept in-process and exported by
+  metrics_view (admins, or anyone with settings.PERF_METRICS_ENABLED).
+
+Enabled with settings.PERF_INSTRUMENTATION. When it is off the middleware
+raises MiddlewareNotUsed, so Django drops it from the chain and span() is a
+single ContextVar lookup.
+"""
+import math
+import time
+import threading
+import contextvars
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import JsonResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+
+_current = contextvars.ContextVar("perf_recorder", default=None)
+_NOOP = nullcontext()
+
+
+class _Recorder:
+    __slots__ = ("phases", "queries", "db_ms")
+
+    def __init__(self):
+        self.phases = {}
+        self.queries = 0
+        self.db_ms = 0.0
+
+    def add(self, name, ms):
+        self.phases[name] = self.phases.get(name, 0.0) + ms
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook: count and time every ORM query
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_ms += (time.perf_counter() - start) * 1000
+
+
+class _Span:
+    __slots__ = ("rec", "name", "start")
+
+    def __init__(self, rec, name):
+        self.rec = rec
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.rec.add(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+def span(name):
+    """
+    Time a block as phase `name` of the current request:
+
+        with span("csv"):
+            df = pd.read_csv(...)
+    """
+    rec = _current.get()
+    if rec is None:
+        return _NOOP
+    return _Span(rec, name)
+
+
+# ---------------------------
+# Histograms
+# ---------------------------
+
+class Histogram:
+    """
+    Fixed log-spaced buckets (about 12% wide by default), so recording is O(1)
+    and memory per route is constant. The default range covers 0.05ms to
+    roughly 2 minutes.
+    """
+    __slots__ = ("low", "growth", "counts", "count", "total", "max")
+
+    def __init__(self, low=0.05, growth=1.12, size=130):
+        self.low = low
+        self.growth = growth
+        self.counts = [0] * size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        if value <= self.low:
+            i = 0
+        else:
+            i = min(len(self.counts) - 1, int(math.log(value / self.low, self.growth)) + 1)
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                # report the bucket's upper edge, capped by the real max
+                return round(min(self.low * self.growth ** i, self.max), 3)
+        return round(self.max, 3)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": round(self.max, 3),
+        }
+
+
+class _RouteStats:
+    __slots__ = ("total", "phases", "queries", "bytes")
+
+    def __init__(self):
+        self.total = Histogram()
+        self.phases = {}
+        self.queries = Histogram(low=1, growth=1.25, size=40)
+        self.bytes = Histogram(low=64, growth=1.25, size=80)
+
+
+_routes = {}
+_routes_lock = threading.Lock()
+
+
+def _record(route, total_ms, rec, size):
+    with _routes_lock:
+        stats = _routes.get(route)
+        if stats is None:
+            stats = _routes[route] = _RouteStats()
+        stats.total.record(total_ms)
+        stats.queries.record(rec.queries)
+        if size is not None:
+            stats.bytes.record(size)
+        for name, ms in rec.phases.items():
+            h = stats.phases.get(name)
+            if h is None:
+                h = stats.phases[name] = Histogram()
+            h.record(ms)
+
+
+def snapshot():
+    with _routes_lock:
+        return {
+            route: {
+                "total_ms": s.total.summary(),
+                "queries": s.queries.summary(),
+                "bytes": s.bytes.summary(),
+                "phases_ms": {name: h.summary() for name, h in sorted(s.phases.items())},
+            }
+            for route, s in sorted(_routes.items())
+        }
+
+
+def reset():
+    with _routes_lock:
+        _routes.clear()
+
+
+# ---------------------------
+# Middleware / export
+# ---------------------------
+
+def _server_timing(rec, total_ms, size):
+    parts = [f'db;dur={rec.db_ms:.2f};desc="{rec.queries} queries"']
+    for name, ms in rec.phases.items():
+        parts.append(f"{name};dur={ms:.2f}")
+    if size is not None:
+        parts.append(f'bytes;desc="{size}"')
+    parts.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(parts)
+
+
+class PerfInstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "PERF_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rec = _Recorder()
+        token = _current.set(rec)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(rec):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        size = None if response.streaming else len(response.content)
+        match = getattr(request, "resolver_match", None)
+        route = f"{request.method} /{match.route}" if match is not None else f"{request.method} <unmatched>"
+        _record(route, total_ms, rec, size)
+
+        response["Server-Timing"] = _server_timing(rec, total_ms, size)
+        response["Timing-Allow-Origin"] = "*"
+        return response
+
+
+@api_view(["GET", "POST"])
+@permission_classes([AllowAny])
+def metrics_view(request):
+    """
+    Per-route latency/phase histograms, for admins only unless
+    settings.PERF_METRICS_ENABLED opens them up (benchmark setups). A POST
+    returns the counters and then clears them.
+    """
+    if not (getattr(settings, "PERF_METRICS_ENABLED", False) or getattr(request.user, "is_admin", False)):
+        return JsonResponse({"success": False, "message": "Forbidden - admin only"}, status=403)
+
+    data = {"enabled": getattr(settings, "PERF_INSTRUMENTATION", False), "routes": snapshot()}
+    if request.method == "POST":
+        reset()
+    return JsonResponse(data)
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.instrumentation.PerfInstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -177,6 +178,12 @@ CORS_ALLOW_HEADERS = [
 
 ]
 
+# Per-request Server-Timing header and /metrics/ histograms (see backend/instrumentation.py).
+# When False the middleware is skipped entirely.
+PERF_INSTRUMENTATION = DEBUG
+# /metrics/ for everyone, not only admins (local benchmark setups)
+PERF_METRICS_ENABLED = False
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
@@ -184,7 +191,39 @@ CACHES = {
     }
 }
 
+# JWT user resolution (users.authentication.CustomJWTAuthentication).
+# Users are cached for AUTH_USER_CACHE_TIMEOUT seconds (0 disables) in the
+# AUTH_USER_CACHE_ALIAS cache; point it at a shared backend (Redis/Memcached)
+# so all workers share one copy. Entries are dropped when a User is saved or deleted.
+AUTH_USER_CACHE_ALIAS = 'default'
+AUTH_USER_CACHE_TIMEOUT = 60
+# Trust the username / is_admin claims in access tokens and skip the lookup
+# entirely. Tokens issued before the user was last saved or deleted are
+# looked up as usual, so role changes and deletions still apply at once.
+JWT_TRUST_USER_CLAIMS = False
+
+
+# Where the price CSVs / nepse / announcement files and the trained model outputs live
+STOCKDATA_DATA_DIR = BASE_DIR / 'stockdata' / 'data'
+STOCKDATA_OUTPUT_DIR = BASE_DIR / 'stockdata' / 'outputs'
+# Where the read views get daily bars: 'csv' (the files above) or 'db' (the
+# DailyBar table, filled by `manage.py load_daily_bars`). See stockdata/storage.py.
+STOCKDATA_PRICE_STORE = 'csv'
+# Post-upload pipeline (stockdata/pipeline.py). 'thread' runs it in a background
+# thread of the web process that took the upload; 'process' leaves it to
+# `manage.py pipeline_worker`, which needs a shared CACHES backend for its
+# cache warming to reach the web workers.
+STOCKDATA_PIPELINE_WORKER = 'thread'
+STOCKDATA_PIPELINE_THREADS = 4
+# Loaded LSTM models kept per process for /api/forecast/ (stockdata/modelpool.py):
+# memory budget, eviction policy ('lru' or 'lfu', both weighted by watchlist
+# counts), loader threads, and how many of the most watched models wsgi.py
+# loads before the server forks its workers (run gunicorn with --preload).
+STOCKDATA_MODEL_POOL_MB = 1024
+STOCKDATA_MODEL_POOL_POLICY = 'lru'
+STOCKDATA_MODEL_POOL_LOADERS = 2
+STOCKDATA_MODEL_POOL_PRELOAD = 0
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'stockdata' / 'data'  
+MEDIA_ROOT = STOCKDATA_DATA_DIR
 
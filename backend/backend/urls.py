@@ -18,6 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from backend.instrumentation import metrics_view
 
 
 urlpatterns = [
@@ -25,4 +26,5 @@ urlpatterns = [
     path('users/', include('users.urls')),
     path('', include("stockdata.urls")),
     path('watchlist/', include('watchlist.urls')), 
+    path('metrics/', metrics_view, name='metrics'),
 ]
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Most watched models, loaded once here so that workers forked from this
+# process share them (STOCKDATA_MODEL_POOL_PRELOAD, off by default).
+from stockdata.modelpool import preload  # noqa: E402
+
+preload()
@@ -0,0 +1,85 @@
+"""
+JWT authentication overhead per request.
+
+    python benchmarks/bench_auth.py --requests 5000
+
+Authenticates the same bearer token through CustomJWTAuthentication in
+three modes and reports the mean cost per request and the DB queries
+issued:
+
+  db      AUTH_USER_CACHE_TIMEOUT = 0 (one SELECT per request, the old behaviour)
+  cache   AUTH_USER_CACHE_TIMEOUT > 0 (first request fills the cache)
+  claims  JWT_TRUST_USER_CLAIMS = True (no lookup at all)
+
+Uses an in-memory SQLite database so nothing real is touched; pass
+--database to run against the configured server instead (a throwaway
+user is created and deleted).
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--database", action="store_true", help="Use the configured database instead of SQLite :memory:")
+    args = parser.parse_args()
+
+    from django.conf import settings
+    django.setup()
+    if not args.database:
+        settings.DATABASES["default"] = {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+        from django.db import connections
+        connections.close_all()
+        from django.core.management import call_command
+        call_command("migrate", verbosity=0)
+
+    from django.core.cache import caches
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import override_settings, CaptureQueriesContext
+    from rest_framework.request import Request
+
+    from users.authentication import CustomJWTAuthentication
+    from users.models import User
+    from users.tokens import CustomRefreshToken
+
+    user = User.objects.create(username="bench-auth", email="bench-auth@example.com", password="x")
+    token = str(CustomRefreshToken.for_user(user).access_token)
+    factory = RequestFactory()
+    auth = CustomJWTAuthentication()
+
+    modes = {
+        "db": {"AUTH_USER_CACHE_TIMEOUT": 0, "JWT_TRUST_USER_CLAIMS": False},
+        "cache": {"AUTH_USER_CACHE_TIMEOUT": 60, "JWT_TRUST_USER_CLAIMS": False},
+        "claims": {"AUTH_USER_CACHE_TIMEOUT": 60, "JWT_TRUST_USER_CLAIMS": True},
+    }
+    try:
+        print(f"{'mode':8s} {'us/request':>11s} {'queries':>8s}")
+        base = None
+        for name, overrides in modes.items():
+            caches[settings.AUTH_USER_CACHE_ALIAS].clear()
+            with override_settings(**overrides):
+                request = Request(factory.get("/", HTTP_AUTHORIZATION=f"Bearer {token}"))
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    for _ in range(args.requests):
+                        resolved, _ = auth.authenticate(request)
+                    elapsed = time.perf_counter() - start
+                assert resolved.pk == user.pk and resolved.username == user.username
+            us = elapsed / args.requests * 1e6
+            base = base or us
+            print(f"{name:8s} {us:11.1f} {len(ctx.captured_queries):8d}   x{base / us:.1f}")
+    finally:
+        user.delete()
+
+
+if __name__ == "__main__":
+    main()
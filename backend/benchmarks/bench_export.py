@@ -0,0 +1,69 @@
+"""
+Streaming export memory check.
+
+    python benchmarks/bench_export.py --format ndjson --store csv
+
+Streams /api/export/ for growing symbol counts (up to every symbol in the
+configured data folder / DailyBar table) and reports bytes sent, time and
+the traced peak memory while the body is consumed. The peak should stay
+roughly flat as the symbol count grows, since only one chunk is held at a
+time.
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import Client, override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from stockdata.storage import get_price_store  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--store", choices=["csv", "db"], default=None)
+    parser.add_argument("--steps", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.store:
+        # the views read the backend from settings only
+        override_settings(STOCKDATA_PRICE_STORE=args.store).enable()
+    symbols = get_price_store().symbols()
+    if not symbols:
+        sys.exit("no symbols to export")
+    client = Client()
+    url = reverse("export_history")
+
+    print(f"{'symbols':>8s} {'rows':>9s} {'MB':>8s} {'seconds':>8s} {'peak KB':>9s}")
+    for k in range(1, args.steps + 1):
+        subset = symbols[: max(1, len(symbols) * k // args.steps)]
+        params = {"symbols": ",".join(subset), "format": args.format}
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = client.get(url, params)
+        sent = rows = 0
+        for block in response.streaming_content:
+            sent += len(block)
+            rows += block.count(b"\n")
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if args.format == "csv":
+            rows -= 1
+        print(f"{len(subset):8d} {rows:9d} {sent / 1e6:8.1f} {elapsed:8.2f} {peak / 1024:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
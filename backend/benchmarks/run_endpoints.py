@@ -0,0 +1,401 @@
+"""
+Endpoint benchmark harness.
+
+    python benchmarks/run_endpoints.py --symbols 1000 --years 20 --repeat 20
+
+1. Generates (or reuses) a synthetic data set under --root in the project's
+   file formats (see benchmarks/synthetic.py).
+2. Migrates a throwaway database and seeds companies, users and watchlists.
+3. Drives every named URL in stockdata/urls.py, watchlist/urls.py and
+   users/urls.py through the Django test client, recording the cold (first)
+   call, warm latency percentiles, throughput and peak traced memory.
+4. Appends one JSON line per run to --output (with the git commit), and
+   prints the change against the previous run at the same scale.
+
+--store db runs the price read views on the DailyBar table instead of the
+CSV files, so the two storage backends can be compared at the same scale.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.dirname(HERE)
+sys.path.insert(0, BACKEND)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default="/tmp/stockpal-bench")
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--years", type=int, default=12)
+    parser.add_argument("--trained-fraction", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--only", default="", help="Comma separated URL names to run")
+    parser.add_argument("--regenerate", action="store_true")
+    parser.add_argument("--database", choices=["sqlite", "postgres"], default="sqlite",
+                        help="'postgres' uses the project's server with a separate <NAME>_bench database")
+    parser.add_argument("--store", choices=["csv", "db"], default="csv",
+                        help="Price store the read views use; 'db' loads the DailyBar table first")
+    parser.add_argument("--output", default=os.path.join(HERE, "results.jsonl"))
+    return parser.parse_args()
+
+
+def prepare_data(args):
+    from benchmarks.synthetic import generate, SECTORS, symbol_names
+
+    params = {"symbols": args.symbols, "years": args.years, "trained_fraction": args.trained_fraction}
+    marker = os.path.join(args.root, "params.json")
+    if not args.regenerate and os.path.exists(marker):
+        with open(marker) as fh:
+            if json.load(fh) == params:
+                names = symbol_names(args.symbols)
+                return [
+                    {"symbol": s, "full_name": f"{s} Limited", "sector": SECTORS[i % len(SECTORS)]}
+                    for i, s in enumerate(names)
+                ]
+
+    import shutil
+    for sub in ("data", "outputs", "bench.sqlite3"):
+        path = os.path.join(args.root, sub)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    started = time.perf_counter()
+    companies = generate(args.root, args.symbols, args.years, args.trained_fraction)
+    print(f"generated {args.symbols} symbols x {args.years}y in {time.perf_counter() - started:.1f}s")
+    os.makedirs(args.root, exist_ok=True)
+    with open(marker, "w") as fh:
+        json.dump(params, fh)
+    return companies
+
+
+class Context:
+    """Seeded rows the cases need (tokens, ids, symbols)."""
+
+    def __init__(self, companies, repeat):
+        from django.contrib.auth.hashers import make_password
+        from stockdata.models import Company
+        from users.models import User
+        from users.views import get_tokens_for_user
+        from watchlist.models import WatchlistItem, AlertRule
+
+        Company.objects.all().delete()
+        User.objects.all().delete()
+
+        Company.objects.bulk_create([Company(logo=f"/media/logos/{c['symbol']}.png", **c) for c in companies])
+        self.symbols = [c["symbol"] for c in companies]
+        self.symbol = self.symbols[0]  # trained, has outputs/
+        self.sector = companies[0]["sector"]
+
+        n = repeat + 2
+        self.user = User.objects.create(username="bench", email="bench@example.com", password=make_password("bench-pass"))
+        # admin_login_jwt compares the stored password as plain text
+        self.admin = User.objects.create(username="bench-admin", email="admin@example.com", password="admin-pass", is_admin=True)
+        self.token = get_tokens_for_user(self.user)["access"]
+        self.admin_token = get_tokens_for_user(self.admin)["access"]
+
+        watch = self.symbols[:50]
+        WatchlistItem.objects.bulk_create([WatchlistItem(user=self.user, symbol=s) for s in watch])
+        # not on the watchlist yet; empty with 50 --symbols or fewer
+        self.unwatched = self.symbols[len(watch):len(watch) + 20]
+        self.removable = [f"RM{i}" for i in range(n)]
+        WatchlistItem.objects.bulk_create([WatchlistItem(user=self.user, symbol=s) for s in self.removable])
+        AlertRule.objects.bulk_create([
+            AlertRule(user=self.user, symbol=self.symbol, direction="above", threshold=float(i)) for i in range(n)
+        ])
+        self.alert_ids = list(AlertRule.objects.filter(user=self.user).values_list("id", flat=True))
+
+        self.update_id = Company.objects.get(symbol=self.symbol).id
+        Company.objects.bulk_create([Company(symbol=f"DEL{i}", full_name="Delete me") for i in range(n)])
+        self.deletable = list(Company.objects.filter(symbol__startswith="DEL").values_list("id", flat=True))
+
+        from stockdata.panel import list_symbol_files
+        with open(list_symbol_files()[self.symbol], "rb") as fh:
+            self.upload_bytes = fh.read()
+
+
+def auth(token):
+    return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+def build_cases(ctx):
+    """
+    name -> fn(i) returning (method, path, client kwargs). Mutating cases are
+    ordered last; anything not listed but routed with only <symbol> is run as a GET.
+    A case set to None cannot run with this data set and is reported as skipped.
+    """
+    from urllib.parse import urlencode
+    from django.urls import reverse
+    from django.utils.text import slugify
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    s = ctx.symbol
+
+    def get(name, **kw):
+        return lambda i: ("get", reverse(name, kwargs=kw or None), {})
+
+    cases = {
+        # stockdata, read only
+        "list_companies": get("list_companies"),
+        "company_search": lambda i: ("get", reverse("company_search") + f"?q={s[:2].lower()}", {}),
+        "company_info": get("company_info", symbol=s),
+        "price_history": get("price_history", symbol=s),
+        "export_history": lambda i: ("get", reverse("export_history") + "?" + urlencode({"sector": ctx.sector}), {}),
+        "announcement": get("announcement", symbol=s),
+        "announcement_search": lambda i: ("get", reverse("announcement_search") + "?q=dividend&page_size=20", {}),
+        "prediction_info": get("prediction_info", symbol=s),
+        "live_forecast": get("live_forecast", symbol=s),
+        "nepse_data": get("nepse_data"),
+        "nepse_breadth": get("nepse_breadth"),
+        "sector_list": get("sector_list"),
+        "sector_index": lambda i: ("get", reverse("sector_index", kwargs={"slug": slugify(ctx.sector)}), {}),
+        "top_gainers_losers": get("top_gainers_losers"),
+        "stock_data": get("stock_data", symbol=s),
+        "list_companies_admin": get("list_companies_admin"),
+        "admin-dashboard-stats": get("admin-dashboard-stats"),
+        "companies_without_stock_files": get("companies_without_stock_files"),
+        "return_correlation": get("return_correlation"),
+        "sector_heatmap": get("sector_heatmap"),
+        "backtest": get("backtest", symbol=s),
+        "sector_sentiment": lambda i: ("get", reverse("sector_sentiment") + "?" + urlencode({"sector": ctx.sector}), {}),
+        # watchlist
+        "watchlist_list": lambda i: ("get", reverse("watchlist_list"), auth(ctx.token)),
+        "watchlist_check": lambda i: ("get", reverse("watchlist_check", kwargs={"symbol": s}), auth(ctx.token)),
+        "watchlist_summary": lambda i: ("get", reverse("watchlist_summary"), auth(ctx.token)),
+        "watchlist_add": lambda i: (
+            "post", reverse("watchlist_add"),
+            {"data": {"symbol": ctx.symbols[(50 + i) % len(ctx.symbols)]}, "content_type": "application/json", **auth(ctx.token)},
+        ),
+        "watchlist_remove": lambda i: (
+            "delete", reverse("watchlist_remove", kwargs={"symbol": ctx.removable[i]}), auth(ctx.token),
+        ),
+        "watchlist_bulk_check": lambda i: (
+            "get", reverse("watchlist_bulk_check") + "?" + urlencode({"symbols": ",".join(ctx.symbols[:60])}),
+            auth(ctx.token),
+        ),
+        "watchlist_bulk_add": lambda i: (
+            "post", reverse("watchlist_bulk_add"),
+            {"data": {"symbols": ctx.unwatched}, "content_type": "application/json", **auth(ctx.token)},
+        ),
+        "watchlist_bulk_remove": lambda i: (
+            "post", reverse("watchlist_bulk_remove"),
+            {"data": {"symbols": ctx.unwatched}, "content_type": "application/json", **auth(ctx.token)},
+        ),
+        "dashboard": lambda i: ("get", reverse("dashboard"), auth(ctx.token)),
+        "alert_rules": lambda i: ("get", reverse("alert_rules"), auth(ctx.token)),
+        "alert_inbox": lambda i: ("get", reverse("alert_inbox"), auth(ctx.token)),
+        "alert_inbox_read": lambda i: (
+            "post", reverse("alert_inbox_read"), {"data": {}, "content_type": "application/json", **auth(ctx.token)},
+        ),
+        "alert_rule_delete": lambda i: (
+            "delete", reverse("alert_rule_delete", kwargs={"rule_id": ctx.alert_ids[i]}), auth(ctx.token),
+        ),
+        # users
+        "login": lambda i: (
+            "post", reverse("login"),
+            {"data": {"username": "bench", "password": "bench-pass"}, "content_type": "application/json"},
+        ),
+        "admin_login_jwt": lambda i: (
+            "post", reverse("admin_login_jwt"),
+            {"data": {"username": "bench-admin", "password": "admin-pass"}, "content_type": "application/json"},
+        ),
+        "signup": lambda i: (
+            "post", reverse("signup"),
+            {"data": {"username": f"new{i}-{time.time_ns()}", "email": f"new{i}-{time.time_ns()}@example.com",
+                      "password": "pw-12345"}, "content_type": "application/json"},
+        ),
+        # company CRUD
+        "create_company": lambda i: (
+            "post", reverse("create_company"),
+            {"data": {"symbol": f"NEW{i}-{time.time_ns() % 10**8}", "full_name": "New Co", "sector": "Finance"},
+             "content_type": "application/json"},
+        ),
+        "update_company": lambda i: (
+            "put", reverse("update_company", kwargs={"company_id": ctx.update_id}),
+            {"data": {"full_name": f"{s} Limited"}, "content_type": "application/json"},
+        ),
+        "delete_company": lambda i: (
+            "delete", reverse("delete_company", kwargs={"company_id": ctx.deletable[i]}), {},
+        ),
+        "pipeline_status": lambda i: ("get", reverse("pipeline_status"), auth(ctx.admin_token)),
+        "model_pool_stats": lambda i: ("get", reverse("model_pool_stats"), auth(ctx.admin_token)),
+        "drift_status": lambda i: ("get", reverse("drift_status"), auth(ctx.admin_token)),
+        # invalidates every data-version keyed cache, so it goes last
+        "upload-stock-files": lambda i: (
+            "post", reverse("upload-stock-files"),
+            {"data": {"file": SimpleUploadedFile(f"{s}.csv", ctx.upload_bytes, content_type="text/csv")},
+             **auth(ctx.admin_token)},
+        ),
+    }
+    if not ctx.unwatched:
+        # an empty symbol list is a 400, not a timing
+        cases["watchlist_bulk_add"] = cases["watchlist_bulk_remove"] = None
+    return cases
+
+
+def discover_url_names():
+    """(name, route, converters) for every named pattern in the three app urlconfs."""
+    import importlib
+    found = []
+    for module in ("stockdata.urls", "watchlist.urls", "users.urls"):
+        for p in importlib.import_module(module).urlpatterns:
+            name = getattr(p, "name", None)
+            if name:
+                found.append((name, str(p.pattern), dict(getattr(p.pattern, "converters", {}))))
+    return found
+
+
+def run_case(client, fn, repeat):
+    timings, statuses, size = [], set(), 0
+
+    def call(i):
+        method, path, kw = fn(i)
+        t = time.perf_counter()
+        resp = getattr(client, method)(path, **kw)
+        body = b"".join(resp.streaming_content) if resp.streaming else resp.content
+        elapsed = (time.perf_counter() - t) * 1000
+        return elapsed, resp.status_code, len(body)
+
+    cold, status, size = call(0)
+    statuses.add(status)
+    for i in range(1, repeat + 1):
+        ms, status, size = call(i)
+        timings.append(ms)
+        statuses.add(status)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    call(repeat + 1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+
+    def pct(q):
+        return round(timings[min(len(timings) - 1, int(q * len(timings)))], 3) if timings else None
+
+    return {
+        "cold_ms": round(cold, 3),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "mean_ms": round(sum(timings) / len(timings), 3) if timings else None,
+        "throughput_rps": round(len(timings) / (sum(timings) / 1000), 2) if timings and sum(timings) else None,
+        "peak_kb": round(peak / 1024, 1),
+        "bytes": size,
+        "status": sorted(statuses),
+    }
+
+
+def git_commit():
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, text=True).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet"], cwd=BACKEND) != 0
+        return sha + ("-dirty" if dirty else "")
+    except Exception:
+        return None
+
+
+def previous_run(path, params):
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path) as fh:
+        for line in fh:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if rec.get("params") == params:
+                last = rec
+    return last
+
+
+def main():
+    args = parse_args()
+    os.environ["STOCKPAL_BENCH_ROOT"] = args.root
+    os.environ["STOCKPAL_BENCH_DB"] = args.database
+    os.environ["STOCKPAL_BENCH_STORE"] = args.store
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings"
+
+    companies = prepare_data(args)
+
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.test import Client
+
+    call_command("migrate", verbosity=0)
+    call_command("sync_model_registry", verbosity=0)
+    ctx = Context(companies, args.repeat)
+    if args.store == "db":
+        start = time.perf_counter()
+        call_command("load_daily_bars", verbosity=0)
+        print(f"loaded DailyBar in {time.perf_counter() - start:.1f}s")
+    cases = build_cases(ctx)
+
+    only = {n.strip() for n in args.only.split(",") if n.strip()}
+    results, skipped = {}, []
+    order = list(cases)
+    for name, route, converters in discover_url_names():
+        if name in cases:
+            continue
+        if set(converters) <= {"symbol"}:
+            from django.urls import reverse
+            kw = {"symbol": ctx.symbol} if converters else None
+            cases[name] = (lambda path: lambda i: ("get", path, {}))(reverse(name, kwargs=kw))
+            order.insert(len(order) - 1, name)
+        else:
+            skipped.append(name)
+
+    client = Client(raise_request_exception=False)
+    params = {"symbols": args.symbols, "years": args.years, "trained_fraction": args.trained_fraction,
+              "repeat": args.repeat, "database": args.database, "store": args.store}
+    prev = previous_run(args.output, params)
+
+    print(f"{'endpoint':32s} {'cold':>9s} {'p50':>9s} {'p95':>9s} {'rps':>8s} {'peak':>9s}  status  (vs prev p50)")
+    too_few = []
+    for name in order:
+        if only and name not in only:
+            continue
+        if cases[name] is None:
+            too_few.append(name)
+            continue
+        r = run_case(client, cases[name], args.repeat)
+        results[name] = r
+        delta = ""
+        if prev and name in prev["results"] and prev["results"][name].get("p50_ms"):
+            before = prev["results"][name]["p50_ms"]
+            delta = f"{(r['p50_ms'] - before) / before:+.0%}"
+        print(f"{name:32s} {r['cold_ms']:8.1f}ms {r['p50_ms']:8.1f}ms {r['p95_ms']:8.1f}ms "
+              f"{r['throughput_rps']:8.1f} {r['peak_kb']:7.0f}KB  {r['status']}  {delta}")
+
+    if skipped:
+        print(f"skipped (no case for their URL parameters): {', '.join(skipped)}")
+    if too_few:
+        print(f"skipped (need more --symbols): {', '.join(too_few)}")
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "params": params,
+        "results": results,
+    }
+    with open(args.output, "a") as fh:
+        fh.write(json.dumps(record) + "\n")
+    print(f"appended results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
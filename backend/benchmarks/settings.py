@@ -0,0 +1,39 @@
+"""
+Settings for the endpoint benchmark: the regular project settings pointed at
+a synthetic data root (STOCKPAL_BENCH_ROOT) and a throwaway database - SQLite
+inside that root, or with STOCKPAL_BENCH_DB=postgres a separate "<NAME>_bench"
+database on the configured server. The harness wipes it, so never the real one.
+"""
+import os
+from pathlib import Path
+
+from backend.settings import *  # noqa: F401,F403
+
+BENCH_ROOT = Path(os.environ.get("STOCKPAL_BENCH_ROOT", "/tmp/stockpal-bench"))
+
+DEBUG = False
+ALLOWED_HOSTS = ["testserver", "localhost", "127.0.0.1"]
+
+if os.environ.get("STOCKPAL_BENCH_DB", "sqlite") == "postgres":
+    DATABASES = {"default": {**DATABASES["default"], "NAME": f"{DATABASES['default']['NAME']}_bench"}}
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BENCH_ROOT / "bench.sqlite3",
+        }
+    }
+
+STOCKDATA_DATA_DIR = BENCH_ROOT / "data"
+STOCKDATA_OUTPUT_DIR = BENCH_ROOT / "outputs"
+MEDIA_ROOT = STOCKDATA_DATA_DIR
+STOCKDATA_PRICE_STORE = os.environ.get("STOCKPAL_BENCH_STORE", "csv")
+
+# measure the views, not the instrumentation
+PERF_INSTRUMENTATION = False
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "loggers": {"django.request": {"level": "CRITICAL"}},
+}
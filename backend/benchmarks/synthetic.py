@@ -0,0 +1,254 @@
+"""
+Synthetic market data in the exact on-disk formats the app reads.
+
+    python benchmarks/synthetic.py /tmp/stockpal-bench --symbols 5000 --years 20
+
+Writes, under <root>:
+  data/<SYMBOL>.csv               price history (latest first, m/d/Y dates,
+                                  "1,234.00" volume/turnover, "0.06%" change)
+  data/nepse/nepse.csv            NEPSE index (S.N., ..., Y-m-d dates)
+  data/announcement/<SYMBOL>.csv  date, headline, link, sentiment
+  outputs/<SYMBOL>/               <SYMBOL>_results.json and _results_with_tol.csv
+                                  for a fraction of the symbols
+
+Keras models and scaler pickles are not generated: nothing on the request
+path loads them and producing real ones needs TensorFlow/scikit-learn.
+"""
+import os
+import sys
+import json
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+SECTORS = [
+    "Commercial Banks", "Development Banks", "Finance", "Hydropower",
+    "Life Insurance", "Non Life Insurance", "Microfinance",
+    "Manufacturing and Processing", "Hotels and Tourism", "Investment",
+    "Trading", "Others",
+]
+
+HEADLINES = [
+    ("{name} has published its provisional financial statement for the {q} quarter of the fiscal year {fy}.", 0),
+    ("Declaration of {pct}% Bonus Share and {cash}% Cash Dividend - {name} ({symbol})", 2),
+    ("{name} is going to issue {ratio} right share to its shareholders.", 1),
+    ("{name} has published its annual report for the fiscal year {fy}.", 0),
+    ("{name} has been penalised by the regulator for non-compliance.", -2),
+    ("{name} has called its annual general meeting (AGM) on {date}.", 0),
+    ("{name} has reported a decline in net profit in the {q} quarter.", -1),
+    ("{name} has published a notice to collect uncollected dividends.", 1),
+]
+
+# NEPSE trades Sunday to Thursday
+WEEKMASK = "Sun Mon Tue Wed Thu"
+
+
+def symbol_names(n):
+    return [f"S{i:04d}" for i in range(n)]
+
+
+def trading_days(years, end=None):
+    end = pd.Timestamp(end or datetime.date(2025, 12, 11))
+    start = end - pd.DateOffset(years=years)
+    return pd.bdate_range(start, end, freq="C", weekmask=WEEKMASK)
+
+
+def _fmt_thousands(values):
+    return [f"{v:,.2f}" for v in values]
+
+
+def _write_symbol(args):
+    root, symbol, days, seed, with_outputs = args
+    rng = np.random.default_rng(seed)
+    n = len(days)
+
+    # listed at some point in the window, ~3% sessions without a trade
+    start = int(rng.integers(0, max(1, n // 3)))
+    keep = rng.random(n - start) > 0.03
+    idx = np.arange(start, n)[keep]
+    if len(idx) < 2:
+        idx = np.arange(max(0, n - 2), n)
+    dates = days[idx]
+    m = len(idx)
+
+    ret = rng.normal(0.0003, 0.018, m)
+    close = np.round(rng.uniform(100, 1500) * np.exp(np.cumsum(ret)), 1)
+    prev = np.concatenate([[close[0]], close[:-1]])
+    open_ = np.round(prev * (1 + rng.normal(0, 0.005, m)), 1)
+    high = np.round(np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.008, m))), 1)
+    low = np.round(np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.008, m))), 1)
+    volume = np.round(rng.lognormal(9, 1, m))
+    turnover = volume * close
+    pct = (close / prev - 1) * 100
+
+    df = pd.DataFrame({
+        "Symbol": symbol,
+        "Date": [f"{d.month}/{d.day}/{d.year}" for d in dates],
+        "Open": open_,
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Percent Change": [f"{p:.2f}%" for p in pct],
+        "Volume": _fmt_thousands(volume),
+        "Turnover": _fmt_thousands(turnover),
+    }).iloc[::-1]
+    df.to_csv(os.path.join(root, "data", f"{symbol}.csv"), index=False, encoding="utf-8-sig")
+
+    _write_announcements(root, symbol, dates, rng)
+    if with_outputs:
+        _write_outputs(root, symbol, dates, close, rng)
+    return symbol
+
+
+def _write_announcements(root, symbol, dates, rng, per_year=12):
+    k = max(1, int(len(dates) / 240 * per_year))
+    picks = np.sort(rng.choice(len(dates), size=min(k, len(dates)), replace=False))[::-1]
+    rows = []
+    for i in picks:
+        template, sentiment = HEADLINES[int(rng.integers(len(HEADLINES)))]
+        d = dates[i]
+        rows.append({
+            "date": d.strftime("%b %d, %Y"),
+            "headline": template.format(
+                name=f"{symbol} Limited", symbol=symbol, q="first", fy="2080/81",
+                pct=int(rng.integers(1, 20)), cash=round(float(rng.uniform(0, 5)), 2),
+                ratio="1:1", date=d.strftime("%B %d, %Y"),
+            ),
+            "link": f"https://merolagani.com/AnnouncementDetail.aspx?id={int(rng.integers(10000, 99999))}",
+            "sentiment": float(sentiment),
+        })
+    pd.DataFrame(rows).to_csv(os.path.join(root, "data", "announcement", f"{symbol}.csv"), index=False)
+
+
+def _write_outputs(root, symbol, dates, close, rng, test_pct=0.10):
+    out = os.path.join(root, "outputs", symbol)
+    os.makedirs(out, exist_ok=True)
+
+    n_test = max(2, int(len(close) * test_pct))
+    actual = close[-n_test:]
+    prev = close[-n_test - 1:-1]
+    pred = actual * (1 + rng.normal(0, 0.02, n_test))
+    abs_err = np.abs(actual - pred)
+    pct_err = abs_err / actual
+    tol = pct_err <= 0.02
+    dir_a = np.where(actual - prev >= 0, "UP", "DOWN")
+    dir_p = np.where(pred - prev >= 0, "UP", "DOWN")
+    match = dir_a == dir_p
+
+    pd.DataFrame({
+        "Date": dates[-n_test:].strftime("%Y-%m-%d"),
+        "Actual_Close": actual,
+        "Predicted_Close": pred,
+        "Error": actual - pred,
+        "Error_Pct": (actual - pred) / actual * 100,
+        "Abs_Error": abs_err,
+        "Pct_Error": pct_err * 100,
+        "Within_Tolerance_Pct": tol,
+        "Dir_Match": match,
+        "Hybrid_Correct": match | tol,
+        "Actual_Direction": dir_a,
+        "Predicted_Direction": dir_p,
+        "Correct": match,
+    }).to_csv(os.path.join(out, f"{symbol}_results_with_tol.csv"), index=False)
+
+    last_close = float(close[-1])
+    next_close = last_close * (1 + float(rng.normal(0, 0.02)))
+    results = {
+        "symbol": symbol,
+        "timestamp": datetime.datetime(2025, 12, 12).isoformat(),
+        "config": {"seq_len": 60, "test_pct": test_pct},
+        "regression": {
+            "mae": float(abs_err.mean()),
+            "rmse": float(np.sqrt(((actual - pred) ** 2).mean())),
+            "mape": float(pct_err.mean() * 100),
+            "r2": 0.8,
+        },
+        "classification": {
+            "accuracy": float(match.mean()),
+            "direction_accuracy": float(match.mean()),
+            "tolerance_accuracy": float(tol.mean()),
+            "hybrid_accuracy": float((match | tol).mean()),
+        },
+        "next_prediction": {
+            "last_date": dates[-1].strftime("%Y-%m-%d"),
+            "last_close": last_close,
+            "predicted_date": (dates[-1] + pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
+            "predicted_close": next_close,
+            "change_amount": next_close - last_close,
+            "change_pct": (next_close / last_close - 1) * 100,
+            "direction": "UP" if next_close > last_close else "DOWN",
+        },
+    }
+    with open(os.path.join(out, f"{symbol}_results.json"), "w") as fh:
+        json.dump(results, fh, indent=2)
+
+
+def _write_nepse(root, days, seed):
+    rng = np.random.default_rng(seed)
+    n = len(days)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, n)))
+    prev = np.concatenate([[close[0]], close[:-1]])
+    open_ = prev * (1 + rng.normal(0, 0.002, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, n)))
+    turnover = rng.lognormal(21, 0.6, n)
+
+    df = pd.DataFrame({
+        "Open": _fmt_thousands(open_),
+        "High": _fmt_thousands(high),
+        "Low": _fmt_thousands(low),
+        "Close": _fmt_thousands(close),
+        "Change": np.round(close - prev, 2),
+        "Per Change (%)": np.round((close / prev - 1) * 100, 2),
+        "Turnover": _fmt_thousands(turnover),
+        "Date": days.strftime("%Y-%m-%d"),
+    }).iloc[::-1].reset_index(drop=True)
+    df.insert(0, "S.N.", np.arange(1, n + 1))
+    df.to_csv(os.path.join(root, "data", "nepse", "nepse.csv"), index=False)
+
+
+def generate(root, symbols=100, years=12, trained_fraction=0.1, seed=42, workers=None):
+    """
+    Generate a synthetic data set under `root`. Returns a list of
+    {"symbol", "sector", "full_name"} dicts for seeding Company rows.
+    """
+    for sub in ("data", os.path.join("data", "nepse"), os.path.join("data", "announcement"), "outputs"):
+        os.makedirs(os.path.join(root, sub), exist_ok=True)
+
+    days = trading_days(years)
+    names = symbol_names(symbols)
+    n_trained = int(round(symbols * trained_fraction))
+    tasks = [(root, s, days, seed + i, i < n_trained) for i, s in enumerate(names)]
+
+    if workers == 1:
+        list(map(_write_symbol, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            list(ex.map(_write_symbol, tasks, chunksize=max(1, len(tasks) // 64)))
+    _write_nepse(root, days, seed)
+
+    return [
+        {"symbol": s, "full_name": f"{s} Limited", "sector": SECTORS[i % len(SECTORS)]}
+        for i, s in enumerate(names)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root")
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--years", type=int, default=12)
+    parser.add_argument("--trained-fraction", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    companies = generate(args.root, args.symbols, args.years, args.trained_fraction, args.seed, args.workers)
+    print(f"Wrote {len(companies)} symbols x {args.years} years to {args.root}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
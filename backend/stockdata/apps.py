@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class StockdataConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'stockdata'
+
+    def ready(self):
+        from stockdata import signals
+
+        post_migrate.connect(signals.fill_registry, sender=self)
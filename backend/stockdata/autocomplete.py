@@ -0,0 +1,159 @@
+# stockdata/autocomplete.py
+"""
+In-process typeahead over Company.symbol and full_name words.
+
+Keys (lower-cased symbols and name words) are kept in one sorted list, so a
+prefix is a bisect range. When no key starts with a query word, a
+single-delete neighbourhood map gives a fuzzy fallback: one typo,
+missing or extra letter, or swapped pair.
+
+Results rank exact symbol hits first, then symbol prefixes, name prefixes
+and fuzzy hits, each by watchlist popularity. The index is rebuilt when the
+shared company version changes (any Company save/delete, see
+stockdata.signals) and popularity is refreshed every POPULARITY_TTL seconds.
+"""
+import re
+import time
+import threading
+from bisect import bisect_left
+
+from django.db.models import Count
+from django.db.models.functions import Upper
+
+from stockdata.models import Company
+from stockdata.signals import company_version
+from watchlist.models import WatchlistItem
+
+POPULARITY_TTL = 60.0
+MAX_LIMIT = 50
+MIN_FUZZY_LEN = 3
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# match kinds, best first
+EXACT, SYMBOL, NAME, FUZZY = 0, 1, 2, 3
+
+
+def _words(text):
+    return _WORD_RE.findall((text or "").lower())
+
+
+def _deletes(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class CompanyIndex:
+    def __init__(self, companies, popularity):
+        self.companies = companies
+        self.popularity = [popularity.get((c["symbol"] or "").upper(), 0) for c in companies]
+
+        pairs = set()
+        for i, c in enumerate(companies):
+            symbol = "".join(_words(c["symbol"]))
+            if symbol:
+                pairs.add((symbol, i, SYMBOL))
+            for w in _words(c["full_name"]):
+                pairs.add((w, i, NAME))
+        pairs = sorted(pairs)
+        self.keys = [k for k, _, _ in pairs]
+        self.ids = [i for _, i, _ in pairs]
+        self.kinds = [kind for _, _, kind in pairs]
+
+        self.neighbours = {}
+        for key, i, _ in pairs:
+            if len(key) < MIN_FUZZY_LEN:
+                continue
+            for variant in _deletes(key) | {key}:
+                self.neighbours.setdefault(variant, set()).add(i)
+
+    def _prefix(self, word):
+        lo = bisect_left(self.keys, word)
+        # keys are [a-z0-9]; "{" sorts right after "z"
+        hi = bisect_left(self.keys, word + "{", lo)
+        found = {}
+        for j in range(lo, hi):
+            i = self.ids[j]
+            kind = self.kinds[j]
+            if kind == SYMBOL and self.keys[j] == word:
+                kind = EXACT
+            if kind < found.get(i, FUZZY + 1):
+                found[i] = kind
+        return found
+
+    def _fuzzy(self, word):
+        if len(word) < MIN_FUZZY_LEN:
+            return {}
+        found = {}
+        for variant in _deletes(word) | {word}:
+            for i in self.neighbours.get(variant, ()):
+                found[i] = FUZZY
+        return found
+
+    def search(self, query, limit=10):
+        words = _words(query)
+        if not words:
+            return []
+
+        best = None
+        for w in words:
+            found = self._prefix(w) or self._fuzzy(w)
+            if best is None:
+                best = found
+            else:
+                # every word has to match; keep the weaker match kind
+                best = {i: max(k, found[i]) for i, k in best.items() if i in found}
+            if not best:
+                return []
+
+        # a multi-word query can't be an exact symbol hit
+        if len(words) > 1:
+            best = {i: max(k, SYMBOL) for i, k in best.items()}
+
+        ranked = sorted(
+            best.items(),
+            key=lambda item: (item[1], -self.popularity[item[0]], self.companies[item[0]]["symbol"] or ""),
+        )
+        out = []
+        for i, kind in ranked[:max(1, min(MAX_LIMIT, limit))]:
+            c = self.companies[i]
+            out.append({
+                "symbol": c["symbol"],
+                "full_name": c["full_name"],
+                "sector": c["sector"],
+                "logo": c["logo"],
+                "watchers": self.popularity[i],
+                "fuzzy": kind == FUZZY,
+            })
+        return out
+
+
+_lock = threading.Lock()
+_state = {"index": None, "version": None, "built_at": 0.0}
+
+
+def _build():
+    companies = list(Company.objects.values("symbol", "full_name", "sector", "logo"))
+    popularity = dict(
+        WatchlistItem.objects.annotate(sym=Upper("symbol")).values("sym")
+        .annotate(n=Count("id")).values_list("sym", "n")
+    )
+    return CompanyIndex(companies, popularity)
+
+
+def get_index():
+    version = company_version()
+    state = _state
+    if (state["index"] is not None and state["version"] == version
+            and time.monotonic() - state["built_at"] < POPULARITY_TTL):
+        return state["index"]
+    with _lock:
+        if not (state["index"] is not None and state["version"] == version
+                and time.monotonic() - state["built_at"] < POPULARITY_TTL):
+            state["index"] = _build()
+            state["version"] = version
+            state["built_at"] = time.monotonic()
+        return state["index"]
+
+
+def autocomplete(query, limit=10):
+    return get_index().search(query, limit)
@@ -0,0 +1,288 @@
+# stockdata/backtest.py
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from stockdata.indicators import add_indicators
+from stockdata.panel import read_price_frame
+
+# NEPSE trades Sunday-Thursday, roughly 240 sessions a year
+TRADING_DAYS_PER_YEAR = 240
+
+
+# ---------------------------
+# Signals
+# ---------------------------
+# Each strategy turns the indicator frame into a target position array
+# (1.0 = long, 0.0 = flat) for the close of every bar. When the requested
+# parameters match the stock_data indicator block, those columns are reused.
+
+def _sma(df, n):
+    col = f"SMA{n}"
+    if col in df.columns:
+        return df[col].to_numpy(dtype=float)
+    return df["Close"].rolling(window=n, min_periods=n).mean().to_numpy(dtype=float)
+
+
+def _rsi(df, n):
+    col = f"RSI{n}"
+    if col in df.columns:
+        return df[col].to_numpy(dtype=float)
+    delta = df["Close"].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=n, min_periods=n).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=n, min_periods=n).mean()
+    return (100 - (100 / (1 + gain / loss))).to_numpy(dtype=float)
+
+
+def _macd(df, fast, slow, signal):
+    if (fast, slow, signal) == (12, 26, 9) and "MACD" in df.columns:
+        return df["MACD"].to_numpy(dtype=float), df["MACD_Signal"].to_numpy(dtype=float)
+    macd = df["Close"].ewm(span=fast, adjust=False).mean() - df["Close"].ewm(span=slow, adjust=False).mean()
+    return macd.to_numpy(dtype=float), macd.ewm(span=signal, adjust=False).mean().to_numpy(dtype=float)
+
+
+def _hold(events):
+    """
+    Forward-fill entry/exit events (1.0 / 0.0, NaN = no event) into a position,
+    starting flat. Vectorized with a running max over event indices.
+    """
+    idx = np.where(np.isfinite(events), np.arange(len(events)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    pos = events[idx]
+    pos[~np.isfinite(pos)] = 0.0
+    return pos
+
+
+def sma_cross(df, fast=20, slow=50):
+    f, s = _sma(df, fast), _sma(df, slow)
+    with np.errstate(invalid="ignore"):
+        return (f > s).astype(float)
+
+
+def rsi_threshold(df, period=14, lower=30, upper=70):
+    rsi = _rsi(df, period)
+    with np.errstate(invalid="ignore"):
+        events = np.where(rsi < lower, 1.0, np.where(rsi > upper, 0.0, np.nan))
+    return _hold(events)
+
+
+def macd_cross(df, fast=12, slow=26, signal=9):
+    macd, sig = _macd(df, fast, slow, signal)
+    with np.errstate(invalid="ignore"):
+        return (macd > sig).astype(float)
+
+
+STRATEGIES = {
+    "sma_cross": {
+        "fn": sma_cross,
+        "defaults": {"fast": 20, "slow": 50},
+        "grid": {"fast": [5, 10, 20], "slow": [50, 100, 200]},
+    },
+    "rsi": {
+        "fn": rsi_threshold,
+        "defaults": {"period": 14, "lower": 30, "upper": 70},
+        "grid": {"period": [14], "lower": [20, 25, 30], "upper": [65, 70, 80]},
+    },
+    "macd": {
+        "fn": macd_cross,
+        "defaults": {"fast": 12, "slow": 26, "signal": 9},
+        "grid": {"fast": [8, 12], "slow": [21, 26], "signal": [9]},
+    },
+}
+
+
+WINDOW_PARAMS = ("fast", "slow", "period", "signal")
+
+
+def param_error(params):
+    """
+    Why a strategy's params cannot run, or None when they can.
+    """
+    for name in WINDOW_PARAMS:
+        if name in params and params[name] < 1:
+            return f"'{name}' must be a positive number of bars"
+    if "fast" in params and "slow" in params and params["fast"] >= params["slow"]:
+        return "'fast' must be shorter than 'slow'"
+    for name in ("lower", "upper"):
+        if name in params and not 0 <= params[name] <= 100:
+            return f"'{name}' must be between 0 and 100"
+    if "lower" in params and "upper" in params and params["lower"] >= params["upper"]:
+        return "'lower' must be below 'upper'"
+    return None
+
+
+def _valid_params(params):
+    return param_error(params) is None
+
+
+def param_grid(strategy, grid=None):
+    grid = grid or STRATEGIES[strategy]["grid"]
+    keys = list(grid)
+    combos = (dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys)))
+    return [p for p in combos if _valid_params(p)]
+
+
+# ---------------------------
+# Simulation
+# ---------------------------
+
+def simulate(close, target, fee_bps=0.0, slippage_bps=0.0):
+    """
+    Long/flat simulation. The signal computed on bar t's close is traded at that
+    close, so the position is held over bar t+1. Every change of position pays
+    fee + slippage (in basis points of traded value).
+    """
+    close = np.asarray(close, dtype=float)
+    target = np.nan_to_num(np.asarray(target, dtype=float))
+    n = len(close)
+    cost = (fee_bps + slippage_bps) / 10_000.0
+
+    ret = np.zeros(n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret[1:] = close[1:] / close[:-1] - 1.0
+    ret[~np.isfinite(ret)] = 0.0
+
+    pos = np.zeros(n)
+    pos[1:] = target[:-1]
+    turnover = np.abs(np.diff(pos, prepend=0.0))
+
+    strat = pos * ret - turnover * cost
+    equity = np.cumprod(1.0 + strat)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+
+    return {
+        "position": pos,
+        "returns": strat,
+        "equity": equity,
+        "drawdown": drawdown,
+        "trades": _trades(close, pos, cost),
+    }
+
+
+def _trades(close, pos, cost):
+    """
+    Pair entries with exits. pos[t] is the position held over bar t, so a trade
+    entered for bar t was filled at close[t - 1].
+    """
+    change = np.diff(pos, prepend=0.0, append=0.0)
+    entries = np.flatnonzero(change > 0)
+    exits = np.flatnonzero(change < 0)  # same length: every entry is closed (or at the end)
+
+    entry_bar = entries - 1
+    exit_bar = np.minimum(exits - 1, len(close) - 1)
+    gross = close[exit_bar] / close[entry_bar]
+    net = gross * (1.0 - cost) ** 2 - 1.0
+    is_open = exits >= len(close)
+
+    return {
+        "entry_idx": entry_bar,
+        "exit_idx": exit_bar,
+        "return": net,
+        "bars": exit_bar - entry_bar,
+        "open": is_open,
+    }
+
+
+def summarize(close, result):
+    strat = result["returns"]
+    equity = result["equity"]
+    trades = result["trades"]
+    n = len(strat)
+
+    std = strat[1:].std(ddof=1) if n > 2 else 0.0
+    sharpe = float(strat[1:].mean() / std * np.sqrt(TRADING_DAYS_PER_YEAR)) if std > 0 else None
+    years = max(n - 1, 1) / TRADING_DAYS_PER_YEAR
+    total = float(equity[-1] - 1.0) if n else 0.0
+    closed = trades["return"][~trades["open"]]
+
+    return {
+        "total_return": total,
+        "cagr": float((1.0 + total) ** (1.0 / years) - 1.0) if total > -1 else -1.0,
+        "volatility": float(std * np.sqrt(TRADING_DAYS_PER_YEAR)),
+        "sharpe": sharpe,
+        "max_drawdown": float(result["drawdown"].min()) if n else 0.0,
+        "exposure": float(result["position"].mean()) if n else 0.0,
+        "num_trades": int(len(trades["return"])),
+        "win_rate": float((closed > 0).mean()) if len(closed) else None,
+        "buy_hold_return": float(close[-1] / close[0] - 1.0) if n else 0.0,
+    }
+
+
+def run_backtest(df, strategy, params=None, fee_bps=0.0, slippage_bps=0.0):
+    """
+    Backtest one strategy over a cleaned, date-sorted price frame.
+    Returns (stats, result) where result holds the per-bar arrays.
+    """
+    spec = STRATEGIES[strategy]
+    params = {**spec["defaults"], **(params or {})}
+    target = spec["fn"](df, **params)
+    close = df["Close"].to_numpy(dtype=float)
+    result = simulate(close, target, fee_bps, slippage_bps)
+    return summarize(close, result), result
+
+
+# ---------------------------
+# Parameter sweep
+# ---------------------------
+
+def _sweep_symbol(task):
+    symbol, path, strategy, combos, fee_bps, slippage_bps = task
+    try:
+        df = add_indicators(read_price_frame(path))
+    except Exception as e:
+        return symbol, [], str(e)
+    if len(df) < 2:
+        return symbol, [], "not enough rows"
+
+    rows = []
+    for params in combos:
+        stats, _ = run_backtest(df, strategy, params, fee_bps, slippage_bps)
+        rows.append({"symbol": symbol, "params": params, **stats})
+    return symbol, rows, None
+
+
+def sweep(files, strategy, grid=None, fee_bps=0.0, slippage_bps=0.0, workers=None):
+    """
+    Run every parameter combination of `strategy` over `files` ({SYMBOL: path})
+    in a process pool. Each worker reads a symbol once and evaluates the whole grid.
+    Returns (rows, errors).
+    """
+    combos = param_grid(strategy, grid)
+    tasks = [(s, p, strategy, combos, fee_bps, slippage_bps) for s, p in sorted(files.items())]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        return _collect(map(_sweep_symbol, tasks))
+
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return _collect(ex.map(_sweep_symbol, tasks, chunksize=chunksize))
+
+
+def _collect(results):
+    rows, errors = [], {}
+    for symbol, r, err in results:
+        rows.extend(r)
+        if err:
+            errors[symbol] = err
+    return rows, errors
+
+
+def rank_params(rows):
+    """Aggregate sweep rows per parameter set (median Sharpe / return across symbols)."""
+    if not rows:
+        return []
+    df = pd.DataFrame(rows)
+    df["key"] = df["params"].apply(lambda p: tuple(sorted(p.items())))
+    agg = df.groupby("key").agg(
+        symbols=("symbol", "count"),
+        median_sharpe=("sharpe", "median"),
+        median_return=("total_return", "median"),
+        median_drawdown=("max_drawdown", "median"),
+        mean_trades=("num_trades", "mean"),
+    )
+    agg = agg.sort_values("median_sharpe", ascending=False)
+    return [{"params": dict(k), **{c: float(v) for c, v in r.items()}} for k, r in agg.iterrows()]
@@ -0,0 +1,137 @@
+# stockdata/breadth.py
+"""
+Market breadth from all symbol files, on the shared (dates x symbols) panel:
+
+- advancers / decliners / unchanged: symbols whose close rose / fell / held
+  against their own previous session
+- new highs / lows: closes above the highest / below the lowest close of the
+  previous HIGH_LOW_WINDOW sessions (52 weeks)
+- turnover share by Company.sector, in percent of the day's total
+
+Computed in one vectorized pass and cached per (panel data version, company
+version). load_panel re-reads only the files that changed, so an upload
+costs one file read plus this pass; the post-upload pipeline warms it.
+"""
+import json
+import hashlib
+import threading
+
+import numpy as np
+
+from stockdata.models import Company
+from stockdata.nepse import MAX_PAYLOADS, period_starts
+from stockdata.panel import load_panel, daily_returns
+from stockdata.signals import company_version
+
+HIGH_LOW_WINDOW = 250
+COUNTS = ("advancers", "decliners", "unchanged", "new_highs", "new_lows")
+
+
+class Breadth:
+    def __init__(self, version, dates, counts, sectors, sector_turnover):
+        self.version = version
+        self.dates = dates                      # datetime64[D]
+        self.counts = counts                    # {name: int array}
+        self.sectors = sectors
+        self.sector_turnover = sector_turnover  # (dates x sectors)
+        self._payloads = {}
+        self._lock = threading.Lock()
+
+    def payload(self, start=None, end=None, interval="day"):
+        """
+        (body bytes, etag) of the breadth response. For week / month the
+        counts are summed over the period's sessions and the turnover share
+        is taken from the period's turnover.
+        """
+        key = (start, end, interval)
+        hit = self._payloads.get(key)
+        if hit is not None:
+            return hit
+
+        lo = np.searchsorted(self.dates, np.datetime64(start, "D")) if start else 0
+        hi = np.searchsorted(self.dates, np.datetime64(end, "D"), side="right") if end else len(self.dates)
+        dates = self.dates[lo:hi]
+        starts = period_starts(dates, interval)
+        ends = np.append(starts[1:], len(dates)) - 1 if len(starts) else starts
+        counts = {name: a[lo:hi] for name, a in self.counts.items()}
+        turnover = self.sector_turnover[lo:hi]
+        if interval != "day" and len(starts):
+            counts = {name: np.add.reduceat(a, starts) for name, a in counts.items()}
+            turnover = np.add.reduceat(turnover, starts, axis=0)
+
+        total = turnover.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(total > 0, np.round(turnover / total * 100, 2), np.nan)
+
+        data = {
+            "dates": [str(d) for d in dates[ends]],
+            **{name: a.tolist() for name, a in counts.items()},
+            "sectors": self.sectors,
+            "turnover_share": {
+                sector: [None if x != x else x for x in share[:, j].tolist()]
+                for j, sector in enumerate(self.sectors)
+            },
+        }
+        body = json.dumps(data).encode("utf-8")
+        encoded = (body, f'"{hashlib.md5(body).hexdigest()}"')
+        with self._lock:
+            if len(self._payloads) >= MAX_PAYLOADS:
+                self._payloads.clear()
+            self._payloads[key] = encoded
+        return encoded
+
+
+def _build(version, panel, sector_of):
+    close = panel["Close"]
+    if close.empty:
+        return Breadth(version, np.array([], dtype="datetime64[D]"), {n: np.zeros(0, dtype=np.int64) for n in COUNTS},
+                       [], np.zeros((0, 0)))
+    arr = close.to_numpy(dtype=float)
+    returns = daily_returns(close).to_numpy()
+
+    # extremes of the previous HIGH_LOW_WINDOW sessions, NaN-skipping
+    prior = close.shift(1).rolling(HIGH_LOW_WINDOW, min_periods=1)
+    prior_max = prior.max().to_numpy()
+    prior_min = prior.min().to_numpy()
+
+    with np.errstate(invalid="ignore"):
+        counts = {
+            "advancers": (returns > 0).sum(axis=1),
+            "decliners": (returns < 0).sum(axis=1),
+            "unchanged": (returns == 0).sum(axis=1),
+            "new_highs": (arr > prior_max).sum(axis=1),
+            "new_lows": (arr < prior_min).sum(axis=1),
+        }
+
+    symbols = list(close.columns)
+    sectors = sorted({sector_of.get(s) or "Others" for s in symbols})
+    pos = {s: i for i, s in enumerate(sectors)}
+    member = np.zeros((len(symbols), len(sectors)))
+    for i, s in enumerate(symbols):
+        member[i, pos[sector_of.get(s) or "Others"]] = 1.0
+    turnover = np.nan_to_num(panel["Turnover"].to_numpy(dtype=float), nan=0.0)
+
+    return Breadth(version, close.index.to_numpy().astype("datetime64[D]"),
+                   {n: c.astype(np.int64) for n, c in counts.items()}, sectors, turnover @ member)
+
+
+_lock = threading.Lock()
+_state = {"breadth": None}
+
+
+def get_breadth():
+    panel, data_version = load_panel(("Close", "Turnover"))
+    version = (data_version, company_version())
+    breadth = _state["breadth"]
+    if breadth is not None and breadth.version == version:
+        return breadth
+    with _lock:
+        breadth = _state["breadth"]
+        if breadth is None or breadth.version != version:
+            sector_of = {
+                (sym or "").upper(): sector
+                for sym, sector in Company.objects.values_list("symbol", "sector")
+            }
+            breadth = _build(version, panel, sector_of)
+            _state["breadth"] = breadth
+    return breadth
@@ -0,0 +1,119 @@
+# stockdata/correlation.py
+import numpy as np
+from django.core.cache import cache
+
+from stockdata.panel import load_panel, daily_returns
+
+CORRELATION_CACHE_TIMEOUT = 3600
+DEFAULT_WINDOW = 250
+DEFAULT_MIN_PERIODS = 60
+
+
+def pairwise_moments(returns):
+    """
+    Pairwise-complete correlation and covariance for a (T x N) float array
+    that may contain NaN (symbol did not trade that day).
+
+    Every pair only uses the days on which both symbols traded. All the sums
+    are done as matrix products so the work goes through BLAS instead of an
+    N^2 Python loop. Returns (corr, cov, n_obs).
+    """
+    x = np.asarray(returns, dtype=np.float64)
+    m = np.isfinite(x).astype(np.float64)
+    xz = np.where(m > 0, x, 0.0)
+
+    n = m.T @ m                  # days both i and j traded
+    sx = xz.T @ m                # sum of x_i over those days
+    sxx = (xz * xz).T @ m        # sum of x_i^2 over those days
+    sxy = xz.T @ xz              # sum of x_i * x_j
+
+    sy = sx.T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cxy = sxy - sx * sy / n
+        cxx = sxx - sx * sx / n
+        # a flat series leaves only rounding noise (possibly negative) here
+        cxx = np.where(cxx > 1e-10 * sxx, cxx, 0.0)
+        cyy = cxx.T
+        cov = cxy / (n - 1)
+        var = cxx * cyy
+        corr = cxy / np.sqrt(np.where(var > 0, var, np.nan))
+
+    corr = np.clip(corr, -1.0, 1.0)
+    # like DataFrame.corr: NaN for a symbol with <2 days or no variance
+    np.fill_diagonal(corr, np.where(np.isfinite(np.diag(corr)), 1.0, np.nan))
+    return corr, cov, n
+
+
+def correlation_matrix(window=DEFAULT_WINDOW, min_periods=DEFAULT_MIN_PERIODS):
+    """
+    Correlation/covariance of daily returns over the last `window` trading days
+    for every symbol file. Cached per (window, min_periods, data version).
+    """
+    panel, version = load_panel(("Close",))
+    key = f"correlation:{window}:{min_periods}:{version}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    close = panel["Close"]
+    returns = daily_returns(close)
+    if window:
+        returns = returns.iloc[-window:]
+    # drop symbols with no data inside the window at all
+    returns = returns.loc[:, returns.notna().any(axis=0)]
+
+    corr, cov, n = pairwise_moments(returns.to_numpy())
+    low = n < min_periods
+    corr[low] = np.nan
+    cov[low] = np.nan
+
+    result = {
+        "version": version,
+        "window": window,
+        "min_periods": min_periods,
+        "start": returns.index[0].strftime("%Y-%m-%d") if len(returns) else None,
+        "end": returns.index[-1].strftime("%Y-%m-%d") if len(returns) else None,
+        "symbols": list(returns.columns),
+        "corr": corr,
+        "cov": cov,
+    }
+    cache.set(key, result, CORRELATION_CACHE_TIMEOUT)
+    return result
+
+
+def sector_correlation(corr, symbols, sector_of):
+    """
+    Average pairwise correlation within and between sectors.
+    `sector_of` maps symbol -> sector; symbols without a sector go to "Others".
+    """
+    sectors = sorted({sector_of.get(s) or "Others" for s in symbols})
+    pos = {s: i for i, s in enumerate(sectors)}
+
+    # one-hot membership (N x K); the block sums are S^T C S
+    member = np.zeros((len(symbols), len(sectors)))
+    for i, s in enumerate(symbols):
+        member[i, pos[sector_of.get(s) or "Others"]] = 1.0
+
+    valid = np.isfinite(corr).astype(np.float64)
+    np.fill_diagonal(valid, 0.0)  # self-correlation would inflate the within-sector mean
+    values = np.where(valid > 0, corr, 0.0)
+
+    total = member.T @ values @ member
+    count = member.T @ valid @ member
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg = total / count
+
+    return {
+        "sectors": sectors,
+        "sizes": member.sum(axis=0).astype(int).tolist(),
+        "matrix": avg,
+    }
+
+
+def matrix_to_list(arr, digits=4):
+    """NaN-safe nested list for JSON."""
+    arr = np.round(np.asarray(arr, dtype=float), digits)
+    out = arr.astype(object)
+    out[~np.isfinite(arr)] = None
+    return out.tolist()
@@ -0,0 +1,148 @@
+# stockdata/dashboard.py
+"""
+Parts of the /api/dashboard/ response, each a (body bytes, etag) taken from
+the cache its own endpoint already uses:
+
+- nepse      the last NEPSE_SESSIONS rows of the nepse_data payload
+- movers     the top_gainers_losers payload
+- watchlist  the watchlist_summary rows for the user's symbols, each with the
+             next-day prediction stored at training time
+
+compose() runs the parts on a small thread pool and waits up to
+DASHBOARD_WAIT seconds. A part that is still cold is sent as null and named
+in "pending"; it keeps building in the background, so the next poll finds it
+warm; polls that arrive while a part is building wait on that same build
+instead of submitting another. A part that fails is sent as null with its
+error in "errors". The ETag covers the parts' ETags, so an unchanged
+dashboard is a 304.
+"""
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from stockdata.nepse import get_series
+from stockdata.panel import DATA_DIR
+from stockdata.snapshot import TOP_MOVERS_KEY, top_movers, portfolio_summary
+
+NEPSE_SESSIONS = 30
+DASHBOARD_WAIT = 1.0      # seconds a request waits for cold parts
+WORKERS = 4
+TOP_MOVERS_TIMEOUT = 3600
+
+
+def _encode(data):
+    body = json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8")
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def nepse_part(sessions=NEPSE_SESSIONS):
+    series = get_series()
+    if series is None:
+        return b"null", '"none"'
+    start = str(series.dates[-sessions]) if len(series.dates) > sessions else None
+    return series.payload(start, None, "day")
+
+
+def movers_part():
+    data = cache.get(TOP_MOVERS_KEY)
+    if not data:
+        data = top_movers(DATA_DIR)
+        cache.set(TOP_MOVERS_KEY, data, TOP_MOVERS_TIMEOUT)
+    return _encode(data)
+
+
+def watchlist_part(items, predictions):
+    """
+    items: (symbol, added_at) newest first; predictions: {symbol: next_prediction}.
+    """
+    summary = portfolio_summary([s for s, _ in items])
+    rows = []
+    for symbol, added_at in items:
+        row = {"symbol": symbol, "added_at": added_at}
+        row.update(summary["items"].get(symbol, {}))
+        row["prediction"] = predictions.get(symbol)
+        rows.append(row)
+    return _encode({"as_of": summary["as_of"], "items": rows, "portfolio": summary["portfolio"]})
+
+
+_lock = threading.Lock()
+# build key -> future of a part still building
+_state = {"executor": None, "building": {}}
+
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+    _state["executor"] = None
+    _state["building"] = {}
+
+
+# pool threads do not survive fork; the child starts its own
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _executor():
+    with _lock:
+        if _state["executor"] is None:
+            _state["executor"] = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="dashboard")
+        return _state["executor"]
+
+
+def _forget(key, future):
+    with _lock:
+        if _state["building"].get(key) is future:
+            del _state["building"][key]
+
+
+def _submit(func, args, key=None):
+    """
+    Future of func(*args), shared with a build of the same key (default
+    (func, args)) that is still running.
+    """
+    executor = _executor()
+    key = (func, key if key is not None else args)
+    with _lock:
+        future = _state["building"].get(key)
+        if future is not None:
+            return future
+        future = executor.submit(func, *args)
+        _state["building"][key] = future
+    # outside the lock: runs right away if the part is already done
+    future.add_done_callback(lambda f: _forget(key, f))
+    return future
+
+
+def compose(parts, timeout=DASHBOARD_WAIT):
+    """
+    parts: {name: (func, args)} or (func, args, key) run concurrently; the key
+    (default args) must be hashable and names builds that polls may share.
+    None instead of a part sends it as null. Returns (body bytes, etag) of
+    {<name>: <part>, ..., "pending": [...], "errors": {...}}.
+    """
+    futures = {name: _submit(*part) for name, part in parts.items() if part is not None}
+    done, _ = wait(futures.values(), timeout=timeout)
+
+    chunks, tags, pending, errors = [], [], [], {}
+    for name in parts:
+        body, tag = b"null", "null"
+        future = futures.get(name)
+        if future is None:
+            pass
+        elif future not in done:
+            pending.append(name)
+        elif future.exception() is not None:
+            errors[name] = str(future.exception())
+        else:
+            body, tag = future.result()
+        chunks.append(json.dumps(name).encode("utf-8") + b": " + body)
+        tags.append(f"{name}={tag}")
+
+    status = json.dumps({"pending": pending, "errors": errors}).encode("utf-8")
+    body = b"{" + b", ".join(chunks) + b", " + status[1:]
+    etag = hashlib.md5("|".join(tags).encode("utf-8") + status).hexdigest()
+    return body, f'"{etag}"'
@@ -0,0 +1,85 @@
+# stockdata/directory.py
+"""
+Company directory served by list_companies, list_companies_admin and
+company_info, kept as pre-encoded JSON:
+
+    d = get_directory()
+    d.public, d.admin          # (body bytes, etag) of the two list responses
+    d.records["NABIL"]         # (body bytes, etag) of one company_info response
+
+A snapshot is tagged with the shared company version (stockdata.signals).
+Every Company save/delete bumps that version and rebuilds the snapshot once
+the transaction commits, so the CRUD views and the admin site both write
+through. The snapshot is stored in the shared cache, so other workers pick
+it up without touching the database; each worker also keeps a local copy
+while the version is unchanged.
+"""
+import json
+import hashlib
+import threading
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from stockdata.models import Company
+from stockdata.signals import company_version
+
+DIRECTORY_KEY = "companies:directory"
+
+PUBLIC_FIELDS = ("symbol", "full_name", "sector", "logo")
+ADMIN_FIELDS = ("id", "symbol", "full_name", "sector", "logo", "metadata")
+
+
+def _encode(data):
+    # same bytes JsonResponse would produce
+    body = json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8")
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
+
+
+class Directory:
+    def __init__(self, version, rows):
+        self.version = version
+        self.public = _encode([{f: r[f] for f in PUBLIC_FIELDS} for r in rows])
+        self.admin = _encode([{f: r[f] for f in ADMIN_FIELDS} for r in rows])
+        self.records = {}
+        for r in rows:
+            key = (r["symbol"] or "").upper()
+            # first one wins if two symbols differ only in case
+            if key not in self.records:
+                self.records[key] = _encode({f: r[f] for f in PUBLIC_FIELDS})
+
+    def record(self, symbol):
+        return self.records.get((symbol or "").strip().upper())
+
+
+_lock = threading.Lock()
+_state = {"directory": None}
+
+
+def refresh():
+    """
+    Rebuild from the database and publish to the shared cache.
+    """
+    # read the version first: a write that lands during the query bumps
+    # it again, so this snapshot is never taken for the newer state
+    version = company_version()
+    rows = list(Company.objects.order_by("symbol").values(*ADMIN_FIELDS))
+    directory = Directory(version, rows)
+    cache.set(DIRECTORY_KEY, directory, None)
+    with _lock:
+        _state["directory"] = directory
+    return directory
+
+
+def get_directory():
+    version = company_version()
+    directory = _state["directory"]
+    if directory is not None and directory.version == version:
+        return directory
+
+    shared = cache.get(DIRECTORY_KEY)
+    if shared is not None and shared.version == version:
+        with _lock:
+            _state["directory"] = shared
+        return shared
+    return refresh()
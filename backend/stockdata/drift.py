@@ -0,0 +1,167 @@
+# stockdata/drift.py
+"""
+Live accuracy of the deployed LSTM models.
+
+Every next-day forecast that is served or produced is logged once per
+(symbol, origin date) in ForecastLog. When the following session is
+ingested, resolve() joins the forecast with the actual close and pushes the
+outcome into the symbol's DriftStat, which keeps the last WINDOW outcomes and
+their running sums, so a new day costs O(1) however long the history is:
+
+- MAE
+- direction accuracy (UP = change >= 0 from the origin close, as in the notebook)
+- hybrid accuracy: direction right or within the model's tolerance, the
+  volatility-scaled threshold using returns known at the origin (same rule
+  as stockdata.walkforward)
+
+A symbol is flagged for retraining once it has MIN_RESOLVED outcomes in the
+window and its live hybrid accuracy is more than MARGIN points below the
+ModelArtifact.hybrid_accuracy measured at training time.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from stockdata.models import ForecastLog, DriftStat, ModelArtifact
+from stockdata.walkforward import tolerance_thresholds
+
+WINDOW = 20            # resolved forecasts the live metrics cover
+MIN_RESOLVED = 10      # before a symbol can be flagged
+MARGIN = 0.0           # hybrid accuracy points below the baseline that are tolerated
+LOGGED_TIMEOUT = 24 * 3600
+
+
+def log_forecast(symbol, prediction, model_version="", source="live"):
+    """
+    Record a forecast in the next_prediction format. Repeats for the same
+    origin date are dropped, mostly without touching the database.
+    """
+    if not prediction or not prediction.get("last_date") or prediction.get("predicted_close") is None:
+        return
+    symbol = symbol.upper()
+    if not cache.add(f"drift:logged:{symbol}:{prediction['last_date']}", 1, LOGGED_TIMEOUT):
+        return
+    ForecastLog.objects.get_or_create(
+        symbol=symbol,
+        origin_date=datetime.date.fromisoformat(prediction["last_date"]),
+        defaults={
+            "last_close": float(prediction["last_close"]),
+            "predicted_close": float(prediction["predicted_close"]),
+            "model_version": model_version,
+            "source": source,
+        },
+    )
+
+
+def _push(stat, abs_error, direction_hit, hybrid_hit):
+    stat.recent.append([abs_error, direction_hit, hybrid_hit])
+    stat.sum_abs_error += abs_error
+    stat.direction_hits += direction_hit
+    stat.hybrid_hits += hybrid_hit
+    if len(stat.recent) > stat.window:
+        old_error, old_direction, old_hybrid = stat.recent.pop(0)
+        stat.sum_abs_error -= old_error
+        stat.direction_hits -= old_direction
+        stat.hybrid_hits -= old_hybrid
+    stat.resolved += 1
+
+
+def _update_flag(stat):
+    n = len(stat.recent)
+    stat.mae = round(stat.sum_abs_error / n, 6)
+    stat.direction_accuracy = round(stat.direction_hits / n, 6)
+    stat.hybrid_accuracy = round(stat.hybrid_hits / n * 100.0, 2)
+    flagged = (n >= MIN_RESOLVED and stat.baseline_hybrid is not None
+               and stat.hybrid_accuracy < stat.baseline_hybrid - MARGIN)
+    if flagged and not stat.flagged:
+        stat.flagged_at = timezone.now()
+    stat.flagged = flagged
+
+
+def resolve(symbol, frame):
+    """
+    Join the symbol's open forecasts with the closes in `frame` (a cleaned,
+    date-sorted price frame) and update its DriftStat. Returns how many
+    forecasts were resolved.
+    """
+    symbol = symbol.upper()
+    if frame.empty:
+        return 0
+    dates = frame["Date"].to_numpy(dtype="datetime64[ns]")
+    pending = list(ForecastLog.objects.filter(
+        symbol=symbol, actual_close=None, origin_date__lt=pd.Timestamp(dates[-1]).date(),
+    ).order_by("origin_date"))
+    if not pending:
+        return 0
+
+    # the first session after each origin
+    origins = np.array([np.datetime64(log.origin_date, "ns") for log in pending])
+    idx = np.searchsorted(dates, origins, side="right")
+    keep = idx >= 1
+    pending, idx = [log for log, k in zip(pending, keep) if k], idx[keep]
+    if not pending:
+        return 0
+
+    artifact = ModelArtifact.objects.filter(symbol=symbol).only("results", "hybrid_accuracy").first()
+    tol = (((artifact.results if artifact else None) or {}).get("config") or {}).get("tolerance_correctness") or {}
+    close = frame["Close"].to_numpy(dtype=float)
+    thresholds = tolerance_thresholds(close, idx, tol)
+    abs_threshold = float(tol.get("abs_threshold", 5.0))
+
+    with transaction.atomic():
+        stat, _ = DriftStat.objects.select_for_update().get_or_create(symbol=symbol, defaults={"window": WINDOW})
+        for k, (log, i) in enumerate(zip(pending, idx)):
+            actual = float(close[i])
+            abs_error = abs(log.predicted_close - actual)
+            direction_hit = (actual - log.last_close >= 0) == (log.predicted_close - log.last_close >= 0)
+            if thresholds is not None:
+                within = abs_error / (abs(actual) + 1e-9) <= thresholds[k]
+            else:
+                within = abs_error <= abs_threshold
+            log.actual_date = pd.Timestamp(dates[i]).date()
+            log.actual_close = actual
+            log.abs_error = abs_error
+            log.direction_hit = bool(direction_hit)
+            log.hybrid_hit = bool(direction_hit or within)
+            _push(stat, abs_error, int(log.direction_hit), int(log.hybrid_hit))
+            stat.last_date = log.actual_date
+
+        ForecastLog.objects.bulk_update(
+            pending, ["actual_date", "actual_close", "abs_error", "direction_hit", "hybrid_hit"],
+        )
+        stat.baseline_hybrid = artifact.hybrid_accuracy if artifact else None
+        _update_flag(stat)
+        stat.save()
+    return len(pending)
+
+
+def drift_summary(flagged_only=False):
+    """
+    Per-symbol live metrics next to the training-time baseline, worst first.
+    """
+    qs = DriftStat.objects.all()
+    if flagged_only:
+        qs = qs.filter(flagged=True)
+    rows = [
+        {
+            "symbol": s.symbol,
+            "flagged": s.flagged,
+            "flagged_at": s.flagged_at.isoformat() if s.flagged_at else None,
+            "window": len(s.recent),
+            "resolved": s.resolved,
+            "mae": s.mae,
+            "direction_accuracy": s.direction_accuracy,
+            "hybrid_accuracy": s.hybrid_accuracy,
+            "baseline_hybrid": s.baseline_hybrid,
+            "gap": round(s.hybrid_accuracy - s.baseline_hybrid, 2)
+            if s.hybrid_accuracy is not None and s.baseline_hybrid is not None else None,
+            "last_date": s.last_date.isoformat() if s.last_date else None,
+        }
+        for s in qs
+    ]
+    rows.sort(key=lambda r: (not r["flagged"], r["gap"] if r["gap"] is not None else float("inf"), r["symbol"]))
+    return rows
@@ -0,0 +1,220 @@
+# stockdata/forecast.py
+"""
+Next-day forecasts from the LSTM models trained in lstm.ipynb.
+
+load_training_frame() is the cleaning and compute_features() the feature
+engineering (the "lstm" feature set of stockdata.indicators) that the
+notebook trains on; training_features() is both, cached. The sequence
+length and feature list of a model come from the "config" block of its
+results JSON. TensorFlow is imported only when a model is loaded, so the
+rest of the app runs without it.
+"""
+import os
+import json
+import importlib.util
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from stockdata import indicators
+from stockdata.models import ModelArtifact
+from stockdata.registry import OUTPUT_DIR, output_path
+
+SEQ_LEN = 60
+FEATURES = [
+    'Close', 'Open', 'High', 'Low',
+    'Volume_norm', 'OBV_norm',
+    'Return', 'Return_lag1', 'Return_lag2', 'Return_lag5',
+    'EMA12', 'EMA26', 'SMA50',
+    'RSI', 'BB_position',
+    'MACD_hist',
+    'Volatility', 'ATR_norm',
+    'ROC', 'Price_position',
+]
+
+
+def tensorflow_available():
+    return importlib.util.find_spec("tensorflow") is not None
+
+
+def load_training_frame(path):
+    """
+    Price CSV cleaned for training (lstm.ipynb loads it with this):
+    numeric OHLCV, sorted by date, Close/Volume clipped to the 1st-99th percentile.
+    """
+    df = pd.read_csv(path)
+    df.columns = [c.strip().replace(" ", "_") for c in df.columns]
+
+    for col in ['Open', 'High', 'Low', 'Close', 'Volume', 'Turnover']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', '').str.replace('"', ''), errors='coerce')
+
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df = df.sort_values('Date').reset_index(drop=True)
+
+    for col in ['Close', 'Volume']:
+        if col in df.columns and df[col].notna().sum() > 0:
+            q01, q99 = df[col].quantile([0.01, 0.99])
+            df[col] = df[col].clip(q01, q99)
+    return df
+
+
+def compute_features(df):
+    """
+    The model inputs lstm.ipynb trains on.
+    """
+    return indicators.compute(df, "lstm")
+
+
+def training_features(symbol, path):
+    """
+    compute_features(load_training_frame(path)), from the shared feature
+    cache, keyed by the file's size and mtime.
+    """
+    st = os.stat(path)
+    return indicators.feature_frame(symbol, f"file-{st.st_size}-{st.st_mtime_ns}", "lstm",
+                                    lambda: load_training_frame(path))
+
+
+_custom_objects = None
+
+
+def custom_objects():
+    """
+    Layers the saved models need to load (ScratchLSTM from the notebook).
+    """
+    global _custom_objects
+    if _custom_objects is not None:
+        return _custom_objects
+
+    import tensorflow as tf
+    from tensorflow.keras import backend as K
+    from tensorflow.keras.layers import Layer
+
+    class ScratchLSTM(Layer):
+        def __init__(self, units, return_sequences=False, recurrent_dropout=0.0,
+                     kernel_regularizer=None, **kwargs):
+            super().__init__(**kwargs)
+            self.units = units
+            self.return_sequences = return_sequences
+            self.recurrent_dropout = recurrent_dropout
+            self.kernel_regularizer = kernel_regularizer
+
+        def build(self, input_shape):
+            input_dim = input_shape[-1]
+            self.W = self.add_weight(shape=(input_dim, 4 * self.units), initializer="glorot_uniform",
+                                     regularizer=self.kernel_regularizer, trainable=True)
+            self.U = self.add_weight(shape=(self.units, 4 * self.units), initializer="orthogonal",
+                                     regularizer=self.kernel_regularizer, trainable=True)
+            self.b = self.add_weight(shape=(4 * self.units,), initializer="zeros", trainable=True)
+            super().build(input_shape)
+
+        def step(self, x_t, states):
+            h, c = states
+            if self.recurrent_dropout > 0:
+                h = tf.nn.dropout(h, rate=self.recurrent_dropout)
+            z = tf.matmul(x_t, self.W) + tf.matmul(h, self.U) + self.b
+            f, i, g, o = tf.split(z, 4, axis=1)
+            f = tf.sigmoid(f)
+            i = tf.sigmoid(i)
+            g = tf.tanh(g)
+            o = tf.sigmoid(o)
+            c = f * c + i * g
+            h = o * tf.tanh(c)
+            return h, [h, c]
+
+        def call(self, inputs):
+            batch_size = tf.shape(inputs)[0]
+            h0 = tf.zeros((batch_size, self.units))
+            c0 = tf.zeros((batch_size, self.units))
+            last_output, outputs, _ = K.rnn(self.step, inputs, [h0, c0])
+            return outputs if self.return_sequences else last_output
+
+    _custom_objects = {"ScratchLSTM": ScratchLSTM}
+    return _custom_objects
+
+
+def limit_threads(threads):
+    """
+    Cap the CPU threads TensorFlow and the BLAS libraries use in this
+    process; call before the first model is built (process pool initializer).
+    """
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    if tensorflow_available():
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def load_model(path):
+    import tensorflow as tf
+    return tf.keras.models.load_model(path, custom_objects=custom_objects(), compile=False)
+
+
+def next_day_prediction(model, scaler, df, seq_len=SEQ_LEN, features=FEATURES):
+    """
+    Predict the close after the last row of `df` (a training_features
+    frame), in the "next_prediction" format of the results JSON.
+    """
+    features = [f for f in features if f in df.columns]
+    df = df[features + ['Date']].dropna().reset_index(drop=True)
+    if len(df) < seq_len:
+        raise ValueError(f"Need at least {seq_len} rows, have {len(df)}")
+
+    close_idx = features.index('Close')
+    scaled = scaler.transform(df[features].to_numpy(dtype=np.float32)[-seq_len:])
+    pred_scaled = float(model.predict(scaled.reshape(1, seq_len, -1), verbose=0)[0, 0])
+
+    row = np.zeros((1, len(features)), dtype=np.float32)
+    row[0, close_idx] = pred_scaled
+    pred_price = float(scaler.inverse_transform(row)[0, close_idx])
+
+    last_close = float(df['Close'].iloc[-1])
+    last_date = df['Date'].iloc[-1]
+    change_amount = pred_price - last_close
+    return {
+        "last_date": str(last_date.date()),
+        "last_close": last_close,
+        "predicted_date": str((last_date + pd.Timedelta(days=1)).date()),
+        "predicted_close": pred_price,
+        "change_amount": change_amount,
+        "change_pct": change_amount / last_close * 100 if last_close else None,
+        "direction": 'UP' if change_amount > 0 else 'DOWN',
+    }
+
+
+def refresh_prediction(symbol, data_path, output_dir=None):
+    """
+    Re-run the stored model of `symbol` on the current price file and write
+    the new next_prediction into its results JSON and ModelArtifact row.
+    The model itself is not retrained, so ModelArtifact.data_hash (the data
+    it was trained on) is left alone. Returns the prediction, or None when
+    the symbol has no model.
+    """
+    output_dir = output_dir or OUTPUT_DIR
+    artifact = ModelArtifact.objects.filter(symbol=symbol.upper()).first()
+    if artifact is None or not artifact.model_path or not artifact.scaler_path:
+        return None
+
+    results = dict(artifact.results or {})
+    config = results.get("config") or {}
+    model = load_model(output_path(artifact.model_path, output_dir))
+    scaler = joblib.load(output_path(artifact.scaler_path, output_dir))
+    prediction = next_day_prediction(
+        model, scaler, training_features(symbol, data_path),
+        seq_len=int(config.get("seq_len") or SEQ_LEN),
+        features=config.get("features") or FEATURES,
+    )
+
+    results["next_prediction"] = prediction
+    if artifact.results_path:
+        path = output_path(artifact.results_path, output_dir)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        os.replace(tmp, path)
+    ModelArtifact.objects.filter(pk=artifact.pk).update(results=results)
+    return prediction
@@ -0,0 +1,254 @@
+# stockdata/indicators.py
+"""
+Technical indicators for the chart views, the backtests and the LSTM models.
+
+compute() works on the OHLCV columns as contiguous float64 arrays and builds
+all the columns of a feature set in one call; intermediates several
+indicators need (close diff, 20-session mean/std, EMA12/26, true range, ...)
+are computed once per call.
+
+Feature sets:
+- "chart"  stock_data / backtest columns: SMA20/50, EMA20, Bollinger bands,
+           RSI14, MACD, ATR14, OBV
+- "lstm"   the model inputs lstm.ipynb trains on (via stockdata.forecast)
+
+Warm-up: with warmup="full" a window indicator is NaN until its window is
+full (pandas min_periods=window); with "partial" it uses the rows it has
+(min_periods=1). "chart" defaults to full and "lstm" to partial, which is
+what the views and the notebook have always used.
+
+feature_frame() caches a computed frame per (symbol, data version, feature
+set); the views, the pipeline and the training / evaluation code read it.
+"""
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+
+INDICATOR_CACHE_TIMEOUT = 24 * 3600
+
+WARMUPS = ("full", "partial")
+
+
+def _lag(x, k=1):
+    out = np.full(len(x), np.nan)
+    if k < len(x):
+        out[k:] = x[:len(x) - k]
+    return out
+
+
+def _fillna(x, value):
+    return np.where(np.isnan(x), value, x)
+
+
+def _rolling(x, window, min_periods, how):
+    """
+    Rolling mean / std / min / max of an array. pandas' kernels are used on
+    purpose: the notebook features divide by std + 1e-9, so on flat windows
+    any other summation order changes the result the models were trained on.
+    """
+    return getattr(pd.Series(x).rolling(window, min_periods=min_periods), how)().to_numpy()
+
+
+def _ewm(x, span):
+    return pd.Series(x).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def _cumsum_skipna(x):
+    # Series.cumsum(): NaN rows stay NaN and do not reset the running total
+    out = np.nancumsum(x)
+    out[np.isnan(x)] = np.nan
+    return out
+
+
+class _Bars:
+    """
+    The input arrays of one compute() call and the intermediates derived from
+    them, each computed on first use.
+    """
+    COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+    def __init__(self, df, warmup):
+        self.n = len(df)
+        self.partial = warmup == "partial"
+        self.arrays = {
+            c: np.ascontiguousarray(df[c].to_numpy(dtype=np.float64, na_value=np.nan))
+            for c in self.COLUMNS if c in df.columns
+        }
+        self._memo = {}
+
+    def has(self, *names):
+        return all(n in self.arrays for n in names)
+
+    def _get(self, key, fn):
+        if key not in self._memo:
+            self._memo[key] = fn()
+        return self._memo[key]
+
+    def col(self, name):
+        if name in self.arrays:
+            return self.arrays[name]
+        return self._get(name, lambda: DERIVED[name](self))
+
+    def rolling(self, name, window, how="mean"):
+        min_periods = 1 if self.partial else window
+        return self._get((how, name, window), lambda: _rolling(self.col(name), window, min_periods, how))
+
+    def ewm(self, name, span):
+        return self._get(("ewm", name, span), lambda: _ewm(self.col(name), span))
+
+
+def _true_range(b):
+    prev = b.col("prev_close")
+    return np.fmax.reduce([b.col("High") - b.col("Low"), np.abs(b.col("High") - prev), np.abs(b.col("Low") - prev)])
+
+
+DERIVED = {
+    "prev_close": lambda b: _lag(b.col("Close")),
+    "delta": lambda b: b.col("Close") - b.col("prev_close"),
+    "return": lambda b: b.col("Close") / b.col("prev_close") - 1,
+    "range": lambda b: b.col("High") - b.col("Low"),
+    "true_range": _true_range,
+    "macd": lambda b: b.ewm("Close", 12) - b.ewm("Close", 26),
+    # chart RSI: the first (NaN) diff counts as no move
+    "up_move": lambda b: np.where(b.col("delta") > 0, b.col("delta"), 0.0),
+    "down_move": lambda b: -np.where(b.col("delta") < 0, b.col("delta"), 0.0),
+    # notebook RSI: NaN diff stays NaN
+    "gain": lambda b: np.maximum(b.col("delta"), 0.0),
+    "loss": lambda b: np.minimum(b.col("delta"), 0.0),
+    "obv_chart": lambda b: _cumsum_skipna(b.col("Volume") * np.where(b.col("Close") > b.col("prev_close"), 1.0, -1.0)),
+    "obv": lambda b: np.cumsum(_fillna(np.sign(b.col("delta")) * b.col("Volume"), 0.0)),
+}
+
+
+def _chart(b):
+    sma20 = b.rolling("Close", 20)
+    std20 = b.rolling("Close", 20, "std")
+    rsi = 100 - (100 / (1 + b.rolling("up_move", 14) / b.rolling("down_move", 14)))
+    return {
+        "SMA20": sma20,
+        "SMA50": b.rolling("Close", 50),
+        "EMA20": b.ewm("Close", 20),
+        "BB_Mid": sma20,
+        "BB_Upper": sma20 + 2 * std20,
+        "BB_Lower": sma20 - 2 * std20,
+        "RSI14": rsi,
+        "MACD": b.col("macd"),
+        "MACD_Signal": b.ewm("macd", 9),
+        "TR": b.col("true_range"),
+        "ATR14": b.rolling("true_range", 14),
+        "OBV": b.col("obv_chart") if b.has("Volume") else np.full(b.n, np.nan),
+    }
+
+
+def _lstm(b):
+    close = b.col("Close")
+    ret = _fillna(b.col("return"), 0.0)
+
+    rs = b.rolling("gain", 14) / (-b.rolling("loss", 14) + 1e-9)
+    volatility = _fillna(b.rolling("return", 20, "std"), 0.0)
+
+    macd = b.col("macd")
+    macd_signal = b.ewm("macd", 9)
+
+    sma20 = b.rolling("Close", 20)
+    std20 = b.rolling("Close", 20, "std")
+    bb_upper = sma20 + 2 * std20
+    bb_lower = sma20 - 2 * std20
+    bb_position = np.clip(_fillna((close - bb_lower) / (bb_upper - bb_lower + 1e-9), 0.5), 0, 1)
+
+    if b.has("High", "Low"):
+        atr_norm = _fillna(b.rolling("range", 14) / close, 0.0)
+    else:
+        atr_norm = volatility
+
+    if b.has("Volume"):
+        volume_norm = np.clip(_fillna(b.col("Volume") / b.rolling("Volume", 20), 1.0), 0, 5)
+        obv_norm = (b.col("obv") - b.rolling("obv", 50)) / (b.rolling("obv", 50, "std") + 1e-9)
+        obv_norm = np.clip(_fillna(obv_norm, 0.0), -3, 3)
+    else:
+        volume_norm = np.ones(b.n)
+        obv_norm = np.zeros(b.n)
+
+    roc = np.clip(_fillna(close / _lag(close, 12) - 1, 0.0) * 100, -20, 20)
+
+    roll_min = b.rolling("Close", 20, "min")
+    roll_max = b.rolling("Close", 20, "max")
+    price_position = _fillna((close - roll_min) / (roll_max - roll_min + 1e-9), 0.5)
+
+    return {
+        "Return": ret,
+        "EMA12": b.ewm("Close", 12),
+        "EMA26": b.ewm("Close", 26),
+        "SMA50": b.rolling("Close", 50),
+        "RSI": _fillna(100 - (100 / (1 + rs)), 50.0),
+        "Volatility": volatility,
+        "MACD": macd,
+        "MACD_signal": macd_signal,
+        "MACD_hist": macd - macd_signal,
+        "BB_position": bb_position,
+        "ATR_norm": atr_norm,
+        "Volume_norm": volume_norm,
+        "OBV_norm": obv_norm,
+        "ROC": roc,
+        "Return_lag1": _fillna(_lag(ret, 1), 0.0),
+        "Return_lag2": _fillna(_lag(ret, 2), 0.0),
+        "Return_lag5": _fillna(_lag(ret, 5), 0.0),
+        "Price_position": price_position,
+    }
+
+
+FEATURE_SETS = {
+    "chart": (_chart, "full"),
+    "lstm": (_lstm, "partial"),
+}
+
+
+def compute(df, feature_set="chart", warmup=None):
+    """
+    `df` with the columns of `feature_set` added (replacing any already
+    there). `df` must be sorted by date with numeric OHLCV columns; warmup
+    is "full" or "partial", default the feature set's own.
+    """
+    build, default_warmup = FEATURE_SETS[feature_set]
+    warmup = warmup or default_warmup
+    if warmup not in WARMUPS:
+        raise ValueError(f"warmup must be one of {', '.join(WARMUPS)}")
+    # x/0 and 0/0 give inf / NaN, as they do in pandas
+    with np.errstate(divide="ignore", invalid="ignore"):
+        columns = build(_Bars(df, warmup))
+    features = pd.DataFrame(columns, index=df.index)
+    return pd.concat([df.drop(columns=list(columns), errors="ignore"), features], axis=1)
+
+
+def add_indicators(df):
+    """
+    Add the chart indicator columns used by the stock_data view
+    (SMA20/50, EMA20, Bollinger bands, RSI14, MACD, ATR14, OBV).
+    `df` must be sorted by date with float OHLCV columns.
+    """
+    return compute(df, "chart")
+
+
+def feature_frame(symbol, version, feature_set, load):
+    """
+    compute(load(), feature_set), cached per symbol, data version and
+    feature set; a new version (re-upload) is picked up on the next call.
+    """
+    key = f"features:{feature_set}:{symbol.upper()}:{version}"
+    df = cache.get(key)
+    if df is None:
+        df = load()
+        if len(df):
+            df = compute(df, feature_set)
+            cache.set(key, df, INDICATOR_CACHE_TIMEOUT)
+    return df
+
+
+def indicator_frame(store, symbol):
+    """
+    The "chart" features of store.read(symbol), cached per store and per
+    version of the symbol's data. The post-upload pipeline warms this for
+    uploaded and watched symbols.
+    """
+    version = f"{store.name}-{store.symbol_version(symbol)}"
+    return feature_frame(symbol, version, "chart", lambda: store.read(symbol))
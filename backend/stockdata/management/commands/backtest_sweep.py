@@ -0,0 +1,61 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stockdata.backtest import STRATEGIES, param_grid, rank_params, sweep
+from stockdata.panel import DATA_DIR, list_symbol_files
+
+
+class Command(BaseCommand):
+    help = "Run a backtest parameter sweep over every symbol file in a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--strategy", default="sma_cross", choices=sorted(STRATEGIES))
+        parser.add_argument("--symbols", default="", help="Comma separated symbols (default: all files)")
+        parser.add_argument("--grid", default="", help='JSON grid, e.g. \'{"fast": [10, 20], "slow": [50, 100]}\'')
+        parser.add_argument("--fee-bps", type=float, default=0.0)
+        parser.add_argument("--slippage-bps", type=float, default=0.0)
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--output", default="", help="Write per-symbol rows to this JSON file")
+
+    def handle(self, *args, **opts):
+        files = list_symbol_files(DATA_DIR)
+        if opts["symbols"]:
+            wanted = {s.strip().upper() for s in opts["symbols"].split(",") if s.strip()}
+            files = {s: p for s, p in files.items() if s in wanted}
+        if not files:
+            raise CommandError("No symbol files matched")
+
+        grid = None
+        if opts["grid"]:
+            try:
+                grid = json.loads(opts["grid"])
+            except ValueError as e:
+                raise CommandError(f"Invalid --grid: {e}")
+
+        combos = param_grid(opts["strategy"], grid)
+        self.stdout.write(f"{opts['strategy']}: {len(combos)} parameter sets x {len(files)} symbols")
+
+        started = time.perf_counter()
+        rows, errors = sweep(
+            files, opts["strategy"], grid,
+            fee_bps=opts["fee_bps"], slippage_bps=opts["slippage_bps"], workers=opts["workers"],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{len(rows)} backtests in {elapsed:.2f}s")
+
+        for symbol, err in sorted(errors.items()):
+            self.stderr.write(f"  {symbol}: {err}")
+
+        for r in rank_params(rows)[: opts["top"]]:
+            self.stdout.write(
+                f"  {json.dumps(r['params']):40s} sharpe={r['median_sharpe']:.2f} "
+                f"return={r['median_return']:.1%} dd={r['median_drawdown']:.1%} trades={r['mean_trades']:.0f}"
+            )
+
+        if opts["output"]:
+            with open(opts["output"], "w") as fh:
+                json.dump({"rows": rows, "errors": errors}, fh, indent=2)
+            self.stdout.write(f"Saved {opts['output']}")
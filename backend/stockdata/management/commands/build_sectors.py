@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from stockdata.sectors import refresh
+
+
+class Command(BaseCommand):
+    help = "Build the sector indices (data/sectors/) whose members or price files changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild every sector")
+
+    def handle(self, *args, **opts):
+        start = time.perf_counter()
+        changed = refresh(force=opts["force"])
+        if not opts["verbosity"]:
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(changed)} sector indices in {time.perf_counter() - start:.1f}s"
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from stockdata.drift import drift_summary
+
+
+class Command(BaseCommand):
+    help = "Live accuracy of the deployed models against their training-time hybrid accuracy."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flagged", action="store_true",
+                            help="Only print the flagged symbols, one per line (the retraining queue)")
+
+    def handle(self, *args, **opts):
+        rows = drift_summary(flagged_only=opts["flagged"])
+        if opts["flagged"]:
+            for row in rows:
+                self.stdout.write(row["symbol"])
+            return
+        if not opts["verbosity"]:
+            return
+        for row in rows:
+            line = (
+                f"{row['symbol']:<10} live={row['hybrid_accuracy']}% baseline={row['baseline_hybrid']}% "
+                f"direction={row['direction_accuracy']} mae={row['mae']} n={row['window']}/{row['resolved']}"
+            )
+            self.stdout.write(self.style.WARNING(line) if row["flagged"] else line)
+        flagged = sum(r["flagged"] for r in rows)
+        self.stdout.write(self.style.SUCCESS(f"{flagged} of {len(rows)} symbols flagged for retraining"))
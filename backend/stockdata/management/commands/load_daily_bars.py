@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stockdata.panel import DATA_DIR, list_symbol_files
+from stockdata.storage import ingest
+
+
+class Command(BaseCommand):
+    help = "Load the price CSVs into the DailyBar table (COPY on PostgreSQL, batched inserts elsewhere)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--symbols", default="", help="Comma separated symbols (default: all files)")
+        parser.add_argument("--workers", type=int, default=None, help="CSV parsing processes")
+        parser.add_argument("--batch-symbols", type=int, default=200, help="Symbols written per transaction")
+        parser.add_argument("--create-companies", action="store_true",
+                            help="Create bare Company rows for files without one instead of skipping them")
+
+    def handle(self, *args, **opts):
+        files = list_symbol_files(DATA_DIR)
+        if opts["symbols"]:
+            wanted = {s.strip().upper() for s in opts["symbols"].split(",") if s.strip()}
+            files = {s: p for s, p in files.items() if s in wanted}
+        if not files:
+            raise CommandError("No symbol files matched")
+
+        start = time.perf_counter()
+        result = ingest(files, workers=opts["workers"], batch_symbols=opts["batch_symbols"],
+                        create_companies=opts["create_companies"])
+        elapsed = time.perf_counter() - start
+
+        if not opts["verbosity"]:
+            return
+        if result["skipped"]:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {len(result['skipped'])} symbols (no Company row or no valid rows): "
+                + ", ".join(result["skipped"][:20]) + (" ..." if len(result["skipped"]) > 20 else "")
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {result['rows']} bars for {result['symbols']} symbols in {elapsed:.1f}s"
+        ))
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stockdata.models import PipelineRun
+from stockdata.panel import DATA_DIR, list_symbol_files
+from stockdata.pipeline import claim_next, enqueue, execute, run_summary
+
+
+class Command(BaseCommand):
+    help = "Run queued post-upload pipeline runs (ingest, indicators, forecasts, drift, alerts, snapshot, sectors, cache warm)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty instead of polling")
+        parser.add_argument("--poll", type=float, default=2.0, help="Seconds between queue checks")
+        parser.add_argument("--threads", type=int, default=None, help="Tasks run concurrently")
+        parser.add_argument("--enqueue", default="",
+                            help="Queue a run first: comma separated symbols, or 'all' for every price file")
+
+    def handle(self, *args, **opts):
+        if opts["enqueue"]:
+            files = list_symbol_files(DATA_DIR)
+            if opts["enqueue"].lower() == "all":
+                symbols = list(files)
+            else:
+                symbols = [s.strip().upper() for s in opts["enqueue"].split(",") if s.strip()]
+                unknown = [s for s in symbols if s not in files]
+                if unknown:
+                    raise CommandError(f"No price file for: {', '.join(unknown)}")
+            run = enqueue(symbols, trigger="manual")
+            self._log(opts, f"Queued run {run.id} for {len(symbols)} symbols")
+
+        while True:
+            run = claim_next()
+            if run is None:
+                if opts["once"]:
+                    return
+                time.sleep(opts["poll"])
+                continue
+            start = time.perf_counter()
+            run = execute(run, opts["threads"])
+            self._report(opts, run, time.perf_counter() - start)
+
+    def _log(self, opts, msg, style=None):
+        if opts["verbosity"]:
+            self.stdout.write((style or self.style.SUCCESS)(msg))
+
+    def _report(self, opts, run, elapsed):
+        summary = run_summary(run)
+        style = self.style.SUCCESS if run.status == PipelineRun.DONE else self.style.WARNING
+        self._log(opts, f"Run {run.id}: {run.status} in {elapsed:.1f}s", style)
+        if opts["verbosity"] < 2:
+            return
+        for name, stage in summary["stages"].items():
+            self.stdout.write(
+                f"  {name:<11} done={stage['done']} failed={stage['failed']} skipped={stage['skipped']} "
+                f"wall={stage['wall_ms']}ms total={stage['total_ms']}ms"
+            )
@@ -0,0 +1,40 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stockdata.sentiment import ANNOUNCEMENT_DIR, rescore_files, store_all
+
+
+class Command(BaseCommand):
+    help = "Re-score missing announcement sentiment and rebuild the stored daily sentiment series."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--symbols", default="", help="Comma separated symbols (default: all files)")
+        parser.add_argument("--rescore", action="store_true", help="Fill missing sentiment scores with the lexicon scorer")
+        parser.add_argument("--overwrite", action="store_true", help="With --rescore, re-score every headline")
+        parser.add_argument("--workers", type=int, default=None)
+
+    def handle(self, *args, **opts):
+        if not os.path.isdir(ANNOUNCEMENT_DIR):
+            raise CommandError(f"Announcement folder not found: {ANNOUNCEMENT_DIR}")
+        files = {
+            os.path.splitext(name)[0].upper(): os.path.join(ANNOUNCEMENT_DIR, name)
+            for name in os.listdir(ANNOUNCEMENT_DIR)
+            if name.lower().endswith(".csv")
+        }
+        if opts["symbols"]:
+            wanted = {s.strip().upper() for s in opts["symbols"].split(",") if s.strip()}
+            files = {s: p for s, p in files.items() if s in wanted}
+        if not files:
+            raise CommandError("No announcement files matched")
+
+        start = time.perf_counter()
+        if opts["rescore"]:
+            scored = rescore_files(files.values(), overwrite=opts["overwrite"], workers=opts["workers"])
+            self.stdout.write(f"Scored {sum(scored.values())} headlines in {sum(1 for n in scored.values() if n)} files")
+
+        store_all(sorted(files), workers=opts["workers"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored sentiment series for {len(files)} symbols in {time.perf_counter() - start:.1f}s"
+        ))
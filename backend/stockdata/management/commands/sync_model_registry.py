@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from stockdata.registry import DATA_DIR, OUTPUT_DIR, sync_registry
+
+
+class Command(BaseCommand):
+    help = "Rebuild the price file / model artifact registry from the data and outputs folders."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--data-dir", default=DATA_DIR)
+        parser.add_argument("--output-dir", default=OUTPUT_DIR)
+
+    def handle(self, *args, **opts):
+        start = time.perf_counter()
+        prices, models = sync_registry(opts["data_dir"], opts["output_dir"])
+        if not opts["verbosity"]:
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Registered {prices} price files and {models} models in {time.perf_counter() - start:.1f}s"
+        ))
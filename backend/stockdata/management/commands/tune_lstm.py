@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stockdata.forecast import tensorflow_available
+from stockdata.panel import DATA_DIR, list_symbol_files
+from stockdata.tuning import COMPLETE, history_path, search
+
+
+class Command(BaseCommand):
+    help = "Search LSTM hyperparameters for one symbol (resumes an interrupted search)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("symbol")
+        parser.add_argument("--trials", type=int, default=30)
+        parser.add_argument("--workers", type=int, default=None, help="Trial processes (default: cpus / threads)")
+        parser.add_argument("--threads", type=int, default=1, help="CPU threads per trial process")
+        parser.add_argument("--max-epochs", type=int, default=60)
+        parser.add_argument("--batch-size", type=int, default=32)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        if not tensorflow_available():
+            raise CommandError("tensorflow is required to train the trials")
+        symbol = opts["symbol"].upper()
+        data_path = list_symbol_files(DATA_DIR).get(symbol)
+        if data_path is None:
+            raise CommandError(f"No price file for {symbol}")
+
+        def report(record):
+            if opts["verbosity"] < 2:
+                return
+            loss = record.get("best_val_loss")
+            self.stdout.write(
+                f"trial {record['trial']:>3} {record['state']:<8} epochs={record['epochs']:<3} "
+                f"val_loss={loss if loss is None else f'{loss:.5f}'} {record['params']}"
+                + (f" {record['error']}" if record["error"] else "")
+            )
+
+        start = time.perf_counter()
+        history, best = search(
+            symbol, data_path, n_trials=opts["trials"], workers=opts["workers"], threads=opts["threads"],
+            max_epochs=opts["max_epochs"], batch_size=opts["batch_size"], seed=opts["seed"], on_trial=report,
+        )
+        if not opts["verbosity"]:
+            return
+        complete = sum(r["state"] == COMPLETE for r in history)
+        self.stdout.write(
+            f"{len(history)} trials ({complete} complete, {len(history) - complete} pruned/failed) "
+            f"in {time.perf_counter() - start:.1f}s, history in {history_path(symbol)}"
+        )
+        if best is None:
+            self.stdout.write(self.style.WARNING("No trial completed"))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Best: trial {best['trial']} val_loss={best['best_val_loss']:.5f} {best['params']}"
+            ))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stockdata.forecast import tensorflow_available
+from stockdata.panel import DATA_DIR, list_symbol_files
+from stockdata.walkforward import DEFAULT_FOLDS, DEFAULT_HORIZON, evaluate_symbols
+
+
+class Command(BaseCommand):
+    help = "Walk-forward evaluate the registered LSTM models and store per-fold metrics."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--symbols", default="", help="Comma separated symbols (default: every registered model)")
+        parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS)
+        parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON, help="Sessions per fold")
+        parser.add_argument("--workers", type=int, default=None, help="Evaluation processes")
+        parser.add_argument("--threads", type=int, default=1, help="CPU threads per process")
+
+    def handle(self, *args, **opts):
+        if not tensorflow_available():
+            raise CommandError("tensorflow is required to load the models")
+        symbols = [s.strip().upper() for s in opts["symbols"].split(",") if s.strip()] or None
+
+        start = time.perf_counter()
+        results = evaluate_symbols(symbols, list_symbol_files(DATA_DIR), opts["folds"], opts["horizon"],
+                                   workers=opts["workers"], threads=opts["threads"])
+        elapsed = time.perf_counter() - start
+
+        if not opts["verbosity"]:
+            return
+        for symbol, result in sorted(results.items()):
+            if isinstance(result, str):
+                self.stdout.write(self.style.WARNING(f"{symbol}: {result}"))
+            else:
+                mean = result["mean"]
+                self.stdout.write(
+                    f"{symbol}: {result['folds']} folds ({result['unseen_folds']} unseen) "
+                    f"hybrid={mean['hybrid_accuracy']:.3f} direction={mean['direction_accuracy']:.3f} "
+                    f"mae={mean['mae']:.2f} mape={mean['mape']:.2f}%"
+                )
+        ok = sum(not isinstance(r, str) for r in results.values())
+        self.stdout.write(self.style.SUCCESS(f"Evaluated {ok}/{len(results)} models in {elapsed:.1f}s"))
@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-19 13:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stockdata', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(db_index=True, max_length=32, unique=True)),
+                ('model_path', models.CharField(blank=True, max_length=1024, null=True)),
+                ('scaler_path', models.CharField(blank=True, max_length=1024, null=True)),
+                ('results_path', models.CharField(blank=True, max_length=1024, null=True)),
+                ('predictions_path', models.CharField(blank=True, max_length=1024, null=True)),
+                ('hybrid_accuracy', models.FloatField(blank=True, db_index=True, null=True)),
+                ('direction_accuracy', models.FloatField(blank=True, null=True)),
+                ('tolerance_accuracy', models.FloatField(blank=True, null=True)),
+                ('mae', models.FloatField(blank=True, null=True)),
+                ('rmse', models.FloatField(blank=True, null=True)),
+                ('results', models.JSONField(blank=True, null=True)),
+                ('data_hash', models.CharField(blank=True, max_length=64, null=True)),
+                ('trained_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['symbol'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(db_index=True, max_length=32, unique=True)),
+                ('path', models.CharField(max_length=1024)),
+                ('size', models.BigIntegerField(default=0)),
+                ('data_hash', models.CharField(blank=True, max_length=64, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['symbol'],
+            },
+        ),
+    ]
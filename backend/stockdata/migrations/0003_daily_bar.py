@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 13:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stockdata', '0002_model_registry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('open', models.FloatField()),
+                ('high', models.FloatField()),
+                ('low', models.FloatField()),
+                ('close', models.FloatField()),
+                ('volume', models.FloatField(blank=True, null=True)),
+                ('turnover', models.FloatField(blank=True, null=True)),
+                ('company', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='bars', to='stockdata.company')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='dailybar_date')],
+                'constraints': [models.UniqueConstraint(fields=('company', 'date'), name='dailybar_company_date')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-19 13:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stockdata', '0004_pipeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modelartifact',
+            name='evaluated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='modelartifact',
+            name='walkforward',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='modelartifact',
+            name='walkforward_hybrid',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2 on 2026-10-19 13:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stockdata', '0005_walkforward'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriftStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=32, unique=True)),
+                ('window', models.PositiveSmallIntegerField()),
+                ('resolved', models.PositiveIntegerField(default=0)),
+                ('recent', models.JSONField(default=list)),
+                ('sum_abs_error', models.FloatField(default=0.0)),
+                ('direction_hits', models.PositiveSmallIntegerField(default=0)),
+                ('hybrid_hits', models.PositiveSmallIntegerField(default=0)),
+                ('mae', models.FloatField(blank=True, null=True)),
+                ('direction_accuracy', models.FloatField(blank=True, null=True)),
+                ('hybrid_accuracy', models.FloatField(blank=True, null=True)),
+                ('baseline_hybrid', models.FloatField(blank=True, null=True)),
+                ('flagged', models.BooleanField(db_index=True, default=False)),
+                ('flagged_at', models.DateTimeField(blank=True, null=True)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['symbol'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ForecastLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=32)),
+                ('origin_date', models.DateField()),
+                ('last_close', models.FloatField()),
+                ('predicted_close', models.FloatField()),
+                ('model_version', models.CharField(blank=True, default='', max_length=64)),
+                ('source', models.CharField(default='live', max_length=16)),
+                ('served_at', models.DateTimeField(auto_now_add=True)),
+                ('actual_date', models.DateField(blank=True, null=True)),
+                ('actual_close', models.FloatField(blank=True, null=True)),
+                ('abs_error', models.FloatField(blank=True, null=True)),
+                ('direction_hit', models.BooleanField(blank=True, null=True)),
+                ('hybrid_hit', models.BooleanField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['symbol', 'origin_date'],
+                'constraints': [models.UniqueConstraint(fields=('symbol', 'origin_date'), name='forecastlog_symbol_origin')],
+            },
+        ),
+    ]
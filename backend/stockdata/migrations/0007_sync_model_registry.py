@@ -0,0 +1,14 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Used to fill PriceFile / ModelArtifact from disk with the live models.
+    # Kept as a no-op so databases that applied it stay consistent; the
+    # registry is now filled by the post_migrate handler in stockdata/signals.py
+    # or `manage.py sync_model_registry`.
+
+    dependencies = [
+        ('stockdata', '0006_forecast_drift'),
+    ]
+
+    operations = []
@@ -0,0 +1,297 @@
+# stockdata/modelpool.py
+"""
+Pool of loaded LSTM models (Keras model + scaler) for live forecasts.
+
+Loading a model takes seconds and ~100 of them do not fit in every worker,
+so the pool keeps as many as STOCKDATA_MODEL_POOL_MB allows:
+
+- a miss starts the load in a background loader thread; get() waits up to
+  its timeout and returns None when the model is still loading
+- over budget, the entry with the lowest priority is evicted:
+    lru  idle seconds / weight (evict the longest idle)
+    lfu  hits * weight (evict the least used)
+  where weight = 1 + log(1 + watchers) from WatchlistItem, so models of
+  watched symbols stay longer
+- a model is reloaded when its file changes (retraining)
+- preload() loads the most watched models synchronously; called before the
+  server forks (gunicorn --preload) the workers share the weight pages
+  copy-on-write instead of each loading its own copy
+
+stats() reports resident count and size, hit rate and load latency.
+"""
+import os
+import math
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import joblib
+import numpy as np
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+from django.db.models.functions import Upper
+
+from stockdata import forecast
+from stockdata.models import ModelArtifact
+from stockdata.registry import OUTPUT_DIR, output_path
+from watchlist.models import WatchlistItem
+
+POLICIES = ("lru", "lfu")
+MODEL_OVERHEAD_BYTES = 8 << 20    # graph / layer objects on top of the weights
+POPULARITY_TTL = 300              # seconds between watchlist count refreshes
+LATENCY_SAMPLES = 200
+
+
+class ModelNotFound(LookupError):
+    """The symbol has no registered model (or its files are gone)."""
+
+
+class Entry:
+    __slots__ = ("symbol", "model", "scaler", "config", "version", "nbytes",
+                 "hits", "last_used", "loaded_at", "load_ms")
+
+    def __init__(self, symbol, model, scaler, config, version, nbytes, load_ms):
+        self.symbol = symbol
+        self.model = model
+        self.scaler = scaler
+        self.config = config
+        self.version = version
+        self.nbytes = nbytes
+        self.load_ms = load_ms
+        self.hits = 0
+        self.loaded_at = self.last_used = time.time()
+
+
+def _spec(symbol):
+    """
+    (model path, scaler path, config, version) of the registered model.
+    """
+    artifact = (ModelArtifact.objects.filter(symbol=symbol)
+                .only("model_path", "scaler_path", "results").first())
+    if artifact is None or not artifact.model_path or not artifact.scaler_path:
+        raise ModelNotFound(symbol)
+    model_path = output_path(artifact.model_path, OUTPUT_DIR)
+    scaler_path = output_path(artifact.scaler_path, OUTPUT_DIR)
+    try:
+        st = os.stat(model_path)
+    except OSError:
+        raise ModelNotFound(symbol)
+    config = (artifact.results or {}).get("config") or {}
+    return model_path, scaler_path, config, f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def _load(symbol, spec):
+    model_path, scaler_path, config, version = spec
+    start = time.perf_counter()
+    model = forecast.load_model(model_path)
+    scaler = joblib.load(scaler_path)
+    load_ms = (time.perf_counter() - start) * 1000
+    nbytes = (sum(w.nbytes for w in model.get_weights()) + os.path.getsize(scaler_path)
+              + MODEL_OVERHEAD_BYTES)
+    return Entry(symbol, model, scaler, config, version, nbytes, load_ms)
+
+
+class ModelPool:
+    def __init__(self, budget_mb=1024, policy="lru", loaders=2):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(POLICIES)}")
+        self.budget = int(budget_mb * (1 << 20))
+        self.policy = policy
+        self.loaders = loaders
+        self._reset()
+        # loader threads and locks do not survive fork; give the child its own
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.loaders, thread_name_prefix="model-pool")
+        self._loading = {}
+        self._entries = getattr(self, "_entries", {})
+        self._popularity = ({}, 0.0)
+        self._counters = {"hits": 0, "misses": 0, "loads": 0, "load_errors": 0, "evictions": 0}
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def _reset_after_fork(self):
+        # keep the inherited (shared) entries, drop the parent's threads
+        self._reset()
+
+    # --- popularity --------------------------------------------------------
+
+    def _watchers(self):
+        counts, fetched = self._popularity
+        if time.time() - fetched > POPULARITY_TTL:
+            counts = dict(
+                WatchlistItem.objects.annotate(sym=Upper("symbol")).values("sym")
+                .annotate(n=Count("id")).values_list("sym", "n")
+            )
+            self._popularity = (counts, time.time())
+        return counts
+
+    def _priority(self, entry, watchers, now):
+        weight = 1 + math.log1p(watchers.get(entry.symbol, 0))
+        if self.policy == "lfu":
+            return entry.hits * weight, entry.last_used
+        return -(now - entry.last_used) / weight, entry.last_used
+
+    # --- loading / eviction ------------------------------------------------
+
+    def _admit(self, entry):
+        # called with the lock held
+        self._entries[entry.symbol] = entry
+        used = sum(e.nbytes for e in self._entries.values())
+        if used <= self.budget:
+            return
+        watchers, now = self._watchers(), time.time()
+        victims = sorted((e for e in self._entries.values() if e is not entry),
+                         key=lambda e: self._priority(e, watchers, now))
+        for victim in victims:
+            if used <= self.budget:
+                break
+            del self._entries[victim.symbol]
+            used -= victim.nbytes
+            self._counters["evictions"] += 1
+
+    def _load_task(self, symbol, spec):
+        try:
+            entry = _load(symbol, spec)
+            with self._lock:
+                self._counters["loads"] += 1
+                self._latencies.append(entry.load_ms)
+                self._admit(entry)
+            return entry
+        except Exception:
+            with self._lock:
+                self._counters["load_errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(symbol, None)
+            # the watchlist counts may have been read on this loader thread
+            connections.close_all()
+
+    def get(self, symbol, timeout=None):
+        """
+        Entry of `symbol`, loaded in the background on a miss. Waits up to
+        `timeout` seconds (None: until loaded, 0: not at all) and returns
+        None while the model is still loading. Raises ModelNotFound when the
+        symbol has no model, and the load error when loading failed.
+        """
+        symbol = symbol.upper()
+        spec = _spec(symbol)
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None and entry.version == spec[3]:
+                entry.hits += 1
+                entry.last_used = time.time()
+                self._counters["hits"] += 1
+                return entry
+            self._counters["misses"] += 1
+            future = self._loading.get(symbol)
+            if future is None:
+                future = self._executor.submit(self._load_task, symbol, spec)
+                self._loading[symbol] = future
+        try:
+            entry = future.result(timeout=timeout)
+        except TimeoutError:
+            return None
+        with self._lock:
+            entry.hits += 1
+            entry.last_used = time.time()
+        return entry
+
+    def preload(self, symbols):
+        """
+        Load `symbols` synchronously in this thread (no loader threads are
+        started, so it is safe before fork). Returns how many are resident.
+        """
+        for symbol in symbols:
+            symbol = symbol.upper()
+            try:
+                entry = _load(symbol, _spec(symbol))
+            except Exception:
+                self._counters["load_errors"] += 1
+                continue
+            with self._lock:
+                self._counters["loads"] += 1
+                self._latencies.append(entry.load_ms)
+                self._admit(entry)
+        return len(self._entries)
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol.upper(), None)
+
+    def stats(self):
+        with self._lock:
+            entries = list(self._entries.values())
+            counters = dict(self._counters)
+            latencies = np.array(self._latencies, dtype=float)
+            loading = sorted(self._loading)
+        watchers, now = self._watchers(), time.time()
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "policy": self.policy,
+            "budget_mb": round(self.budget / (1 << 20), 1),
+            "resident": len(entries),
+            "resident_mb": round(sum(e.nbytes for e in entries) / (1 << 20), 1),
+            "loading": loading,
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else None,
+            "load_ms": {
+                "mean": round(float(latencies.mean()), 1),
+                "p50": round(float(np.percentile(latencies, 50)), 1),
+                "p95": round(float(np.percentile(latencies, 95)), 1),
+                "max": round(float(latencies.max()), 1),
+            } if len(latencies) else None,
+            "models": [
+                {
+                    "symbol": e.symbol, "mb": round(e.nbytes / (1 << 20), 2), "hits": e.hits,
+                    "idle_s": round(now - e.last_used, 1), "watchers": watchers.get(e.symbol, 0),
+                    "load_ms": round(e.load_ms, 1),
+                }
+                for e in sorted(entries, key=lambda e: self._priority(e, watchers, now), reverse=True)
+            ],
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    The process-wide pool, configured from STOCKDATA_MODEL_POOL_* settings.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ModelPool(
+                budget_mb=getattr(settings, "STOCKDATA_MODEL_POOL_MB", 1024),
+                policy=getattr(settings, "STOCKDATA_MODEL_POOL_POLICY", "lru"),
+                loaders=getattr(settings, "STOCKDATA_MODEL_POOL_LOADERS", 2),
+            )
+        return _pool
+
+
+def preload(n=None):
+    """
+    Load the `n` (default STOCKDATA_MODEL_POOL_PRELOAD) most watched models
+    that have one. Does nothing when n is 0 or tensorflow is not installed.
+    """
+    n = getattr(settings, "STOCKDATA_MODEL_POOL_PRELOAD", 0) if n is None else n
+    if not n or not forecast.tensorflow_available():
+        return 0
+    try:
+        trained = set(ModelArtifact.objects.exclude(model_path=None).values_list("symbol", flat=True))
+        pool = get_pool()
+        ranked = sorted(trained, key=lambda s: (-pool._watchers().get(s, 0), s))
+        return pool.preload(ranked[:n])
+    finally:
+        # this runs in the master before workers fork; a connection left open
+        # here would be one socket shared by every worker
+        connections.close_all()
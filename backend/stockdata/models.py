@@ -18,3 +18,207 @@ class Company(models.Model):
 
     def __str__(self):
         return f"{self.symbol} — {self.full_name or ''}"
+
+
+class PriceFile(models.Model):
+    """
+    One row per price CSV in STOCKDATA_DATA_DIR, kept in sync by the upload
+    view and `manage.py sync_model_registry`.
+    """
+    symbol = models.CharField(max_length=32, unique=True, db_index=True)
+    path = models.CharField(max_length=1024)  # relative to STOCKDATA_DATA_DIR
+    size = models.BigIntegerField(default=0)
+    data_hash = models.CharField(max_length=64, blank=True, null=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["symbol"]
+
+    def __str__(self):
+        return f"{self.symbol} — {self.path}"
+
+
+class ModelArtifact(models.Model):
+    """
+    Model registry: one row per trained symbol under STOCKDATA_OUTPUT_DIR.
+    Paths are relative to STOCKDATA_OUTPUT_DIR; `results` holds the full
+    <SYMBOL>_results.json so readers don't have to open it.
+    """
+    symbol = models.CharField(max_length=32, unique=True, db_index=True)
+    model_path = models.CharField(max_length=1024, blank=True, null=True)
+    scaler_path = models.CharField(max_length=1024, blank=True, null=True)
+    results_path = models.CharField(max_length=1024, blank=True, null=True)
+    predictions_path = models.CharField(max_length=1024, blank=True, null=True)
+
+    hybrid_accuracy = models.FloatField(blank=True, null=True, db_index=True)
+    direction_accuracy = models.FloatField(blank=True, null=True)
+    tolerance_accuracy = models.FloatField(blank=True, null=True)
+    mae = models.FloatField(blank=True, null=True)
+    rmse = models.FloatField(blank=True, null=True)
+    results = models.JSONField(blank=True, null=True)
+
+    # walk-forward evaluation (stockdata.walkforward): summary + per-fold metrics,
+    # and the mean hybrid accuracy (percent) over folds the model did not train on
+    walkforward = models.JSONField(blank=True, null=True)
+    walkforward_hybrid = models.FloatField(blank=True, null=True, db_index=True)
+    evaluated_at = models.DateTimeField(blank=True, null=True)
+
+    data_hash = models.CharField(max_length=64, blank=True, null=True)
+    trained_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["symbol"]
+
+    def __str__(self):
+        return f"{self.symbol} — {self.hybrid_accuracy}"
+
+
+class DailyBar(models.Model):
+    """
+    One trading session of one company. Loaded from the price CSVs by
+    `manage.py load_daily_bars`; read through stockdata.storage.DBPriceStore.
+    """
+    # no separate FK index: the (company, date) constraint below leads with company
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="bars", db_index=False)
+    date = models.DateField()
+    open = models.FloatField()
+    high = models.FloatField()
+    low = models.FloatField()
+    close = models.FloatField()
+    volume = models.FloatField(blank=True, null=True)
+    turnover = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            # also the (company, date) index every per-symbol range read uses
+            models.UniqueConstraint(fields=["company", "date"], name="dailybar_company_date"),
+        ]
+        indexes = [
+            models.Index(fields=["date"], name="dailybar_date"),
+        ]
+
+    def __str__(self):
+        return f"{self.company_id} {self.date} {self.close}"
+
+
+class PipelineRun(models.Model):
+    """
+    One post-upload pipeline run (see stockdata.pipeline). Its tasks are
+    persisted, so a run interrupted by a crash resumes where it stopped.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(s, s) for s in (PENDING, RUNNING, DONE, FAILED)]
+
+    trigger = models.CharField(max_length=32, default="upload")
+    symbols = models.JSONField(default=list)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    # last sign of life of the worker running it; stale runs are picked up again
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"run {self.id} ({self.trigger}) — {self.status}"
+
+
+class PipelineTask(models.Model):
+    """
+    One stage of a PipelineRun, for one symbol or (symbol "") the whole run.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+    STATUS_CHOICES = [(s, s) for s in (PENDING, RUNNING, DONE, FAILED, SKIPPED)]
+
+    run = models.ForeignKey(PipelineRun, on_delete=models.CASCADE, related_name="tasks", db_index=False)
+    stage = models.CharField(max_length=32)
+    symbol = models.CharField(max_length=32, blank=True, default="")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    duration_ms = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(fields=["run", "stage", "symbol"], name="pipelinetask_run_stage_symbol"),
+        ]
+
+    def __str__(self):
+        return f"{self.run_id} {self.stage} {self.symbol or '*'} — {self.status}"
+
+
+class ForecastLog(models.Model):
+    """
+    A served next-day forecast (stockdata.drift), joined with the actual
+    close once the next session is ingested.
+    """
+    symbol = models.CharField(max_length=32)
+    origin_date = models.DateField()          # last session the forecast saw
+    last_close = models.FloatField()
+    predicted_close = models.FloatField()
+    model_version = models.CharField(max_length=64, blank=True, default="")
+    source = models.CharField(max_length=16, default="live")
+    served_at = models.DateTimeField(auto_now_add=True)
+
+    actual_date = models.DateField(blank=True, null=True)
+    actual_close = models.FloatField(blank=True, null=True)
+    abs_error = models.FloatField(blank=True, null=True)
+    direction_hit = models.BooleanField(blank=True, null=True)
+    hybrid_hit = models.BooleanField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["symbol", "origin_date"]
+        constraints = [
+            models.UniqueConstraint(fields=["symbol", "origin_date"], name="forecastlog_symbol_origin"),
+        ]
+
+    def __str__(self):
+        return f"{self.symbol} {self.origin_date} {self.predicted_close} / {self.actual_close}"
+
+
+class DriftStat(models.Model):
+    """
+    Live accuracy of one symbol's model over its last `window` resolved
+    forecasts. `recent` holds those forecasts' [abs_error, direction_hit,
+    hybrid_hit], so each new day updates the sums without a rescan.
+    """
+    symbol = models.CharField(max_length=32, unique=True)
+    window = models.PositiveSmallIntegerField()
+    resolved = models.PositiveIntegerField(default=0)
+    recent = models.JSONField(default=list)
+    sum_abs_error = models.FloatField(default=0.0)
+    direction_hits = models.PositiveSmallIntegerField(default=0)
+    hybrid_hits = models.PositiveSmallIntegerField(default=0)
+
+    mae = models.FloatField(blank=True, null=True)
+    direction_accuracy = models.FloatField(blank=True, null=True)
+    # percentages, like ModelArtifact.hybrid_accuracy (the training-time baseline)
+    hybrid_accuracy = models.FloatField(blank=True, null=True)
+    baseline_hybrid = models.FloatField(blank=True, null=True)
+    flagged = models.BooleanField(default=False, db_index=True)
+    flagged_at = models.DateTimeField(blank=True, null=True)
+    last_date = models.DateField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["symbol"]
+
+    def __str__(self):
+        return f"{self.symbol} — {self.hybrid_accuracy} (baseline {self.baseline_hybrid})"
@@ -0,0 +1,149 @@
+# stockdata/nepse.py
+"""
+NEPSE index series for nepse_data, parsed once into typed numpy arrays and
+cached per version (size / mtime) of data/nepse/nepse.csv.
+
+    s = get_series()
+    s.payload(start, end, interval)   # (body bytes, etag) of the response
+
+interval is "day" (the file's rows), "week" (Sunday-Saturday, NEPSE trades
+Sunday-Thursday) or "month"; a period row has the first open, highest high,
+lowest low, last close, summed turnover and the change against the close
+before the period, and is dated on its last session. Encoded responses are
+kept per (start, end, interval) until the file changes.
+"""
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stockdata.panel import DATA_DIR
+
+NEPSE_FILE = os.path.join("nepse", "nepse.csv")
+INTERVALS = ("day", "week", "month")
+MAX_PAYLOADS = 64         # encoded responses kept per file version
+
+
+def _encode(data):
+    body = json.dumps(data).encode("utf-8")
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def period_starts(dates, interval):
+    """
+    Index of the first session of every `interval` period in sorted `dates`
+    (datetime64[D]); every session is its own period for "day".
+    """
+    if interval == "day" or not len(dates):
+        return np.arange(len(dates))
+    if interval == "week":
+        # numpy weeks start on Thursday (the epoch); shift so they start on Sunday
+        keys = (dates - np.timedelta64(3, "D")).astype("datetime64[W]")
+    else:
+        keys = dates.astype("datetime64[M]")
+    return np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+
+
+class NepseSeries:
+    COLUMNS = ("Open", "High", "Low", "Close", "Change", "Per Change (%)", "Turnover")
+
+    def __init__(self, version, df):
+        self.version = version
+        df = df.sort_values("Date", kind="stable")
+        self.dates = df["Date"].to_numpy(dtype="datetime64[D]")
+        self.sn = df["S.N."].to_numpy(dtype=np.int64)
+        self.values = {c: df[c].to_numpy(dtype=np.float64) for c in self.COLUMNS}
+        self._payloads = OrderedDict()
+        self._lock = threading.Lock()
+
+    def window(self, start=None, end=None):
+        lo = np.searchsorted(self.dates, np.datetime64(start, "D")) if start else 0
+        hi = np.searchsorted(self.dates, np.datetime64(end, "D"), side="right") if end else len(self.dates)
+        return lo, hi
+
+    def rows(self, start=None, end=None, interval="day"):
+        """
+        Columns of the selected rows: {"Date": datetime64[D], "S.N.": int, <COLUMNS>: float}.
+        """
+        lo, hi = self.window(start, end)
+        dates = self.dates[lo:hi]
+        v = {c: a[lo:hi] for c, a in self.values.items()}
+        if interval == "day":
+            return {"S.N.": self.sn[lo:hi], **v, "Date": dates}
+
+        starts = period_starts(dates, interval)
+        if not len(starts):
+            return {"S.N.": self.sn[:0], **{c: a[:0] for c, a in v.items()}, "Date": dates}
+        ends = np.append(starts[1:], len(dates)) - 1
+        close = v["Close"][ends]
+        # close before each period, from its first session's change
+        prev = v["Close"][starts] - v["Change"][starts]
+        change = close - prev
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.round(change / prev * 100, 2)
+        return {
+            "S.N.": self.sn[lo:hi][ends],
+            "Open": v["Open"][starts],
+            "High": np.maximum.reduceat(v["High"], starts),
+            "Low": np.minimum.reduceat(v["Low"], starts),
+            "Close": close,
+            "Change": np.round(change, 2),
+            "Per Change (%)": pct,
+            "Turnover": np.round(np.add.reduceat(v["Turnover"], starts), 2),
+            "Date": dates[ends],
+        }
+
+    def payload(self, start=None, end=None, interval="day"):
+        key = (start, end, interval)
+        with self._lock:
+            hit = self._payloads.get(key)
+            if hit is not None:
+                self._payloads.move_to_end(key)
+                return hit
+
+        cols = self.rows(start, end, interval)
+        names = ["S.N.", *self.COLUMNS, "Date", "Volume (in millions)"]
+        lists = [cols["S.N."].tolist()]
+        for c in self.COLUMNS:
+            lists.append([None if x != x else x for x in cols[c].tolist()])
+        lists.append([f"{d}T00:00:00" for d in cols["Date"].astype(str)])
+        lists.append(np.round(cols["Turnover"] / 1_000_000, 2).tolist())
+        encoded = _encode({"data": [dict(zip(names, row)) for row in zip(*lists)]})
+
+        with self._lock:
+            self._payloads[key] = encoded
+            while len(self._payloads) > MAX_PAYLOADS:
+                self._payloads.popitem(last=False)
+        return encoded
+
+
+_lock = threading.Lock()
+_state = {"series": None}
+
+
+def get_series(data_dir=None):
+    """
+    The parsed series for the current file, or None when there is no file.
+    """
+    path = os.path.join(data_dir or DATA_DIR, NEPSE_FILE)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    version = f"{st.st_size}-{st.st_mtime_ns}"
+
+    series = _state["series"]
+    if series is not None and series.version == version:
+        return series
+    with _lock:
+        series = _state["series"]
+        if series is None or series.version != version:
+            df = pd.read_csv(path, thousands=",", float_precision="round_trip")
+            df["Date"] = pd.to_datetime(df["Date"])
+            series = NepseSeries(version, df)
+            _state["series"] = series
+    return series
@@ -0,0 +1,156 @@
+# stockdata/panel.py
+import os
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+DATA_DIR = str(getattr(settings, "STOCKDATA_DATA_DIR", os.path.join(os.path.dirname(__file__), "data")))
+
+_panel_lock = threading.Lock()
+_panel_cache = {}
+# (data_dir, columns) -> {path: (size, mtime_ns, dates, values)}: only the
+# float columns a panel needs, so a rebuild re-reads just the changed files
+_file_cache = {}
+
+
+def list_symbol_files(data_dir=None):
+    """
+    Return {SYMBOL: path} for every price CSV directly under the data folder.
+    Sub-folders (nepse/, announcement/, logos/) are skipped.
+    """
+    data_dir = data_dir or DATA_DIR
+    files = {}
+    with os.scandir(data_dir) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.lower().endswith(".csv"):
+                files[os.path.splitext(entry.name)[0].upper()] = entry.path
+    return files
+
+
+def data_version(data_dir=None):
+    """
+    Cheap fingerprint of the price files: name, size and mtime of every CSV.
+    Changes whenever a file is uploaded/replaced, so it can be used in cache keys.
+    """
+    data_dir = data_dir or DATA_DIR
+    h = hashlib.md5()
+    with os.scandir(data_dir) as it:
+        entries = sorted(
+            (e for e in it if e.is_file() and e.name.lower().endswith(".csv")),
+            key=lambda e: e.name,
+        )
+    for e in entries:
+        st = e.stat()
+        h.update(f"{e.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()[:16]
+
+
+def read_price_frame(path):
+    """
+    Read one symbol CSV into a clean, date-sorted frame with float OHLCV/Turnover.
+    Same cleaning rules as the stock_data view: rows without a valid date or
+    without finite OHLC values are dropped.
+    """
+    # thousands="," lets the C parser read "1,002.00" directly; only columns
+    # that still come back as text need the slow string cleanup
+    df = pd.read_csv(path, thousands=",")
+
+    for col in ["Open", "High", "Low", "Close", "Volume", "Turnover"]:
+        if col not in df.columns:
+            df[col] = np.nan
+        elif not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col].astype(str).str.replace(",", "", regex=False), errors="coerce")
+
+    if "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    else:
+        df["Date"] = pd.NaT
+
+    ohlc = df[["Open", "High", "Low", "Close"]].to_numpy(dtype=float)
+    mask = df["Date"].notna().to_numpy() & np.isfinite(ohlc).all(axis=1)
+    df = df[mask]
+
+    # duplicated dates happen in a few exports; keep the last row for each day
+    df = df.drop_duplicates(subset="Date", keep="last")
+    return df.sort_values("Date").reset_index(drop=True)
+
+
+def _read_columns(path, columns, cached):
+    st = os.stat(path)
+    hit = cached.get(path)
+    if hit is not None and hit[:2] == (st.st_size, st.st_mtime_ns):
+        return hit[2], hit[3]
+    df = read_price_frame(path)
+    dates, values = df["Date"].to_numpy(), df[columns].to_numpy(dtype=float)
+    cached[path] = (st.st_size, st.st_mtime_ns, dates, values)
+    return dates, values
+
+
+def _build_panel(files, columns, cached):
+    for path in set(cached) - set(files.values()):
+        del cached[path]
+    frames = {}
+    for symbol, path in files.items():
+        try:
+            dates, values = _read_columns(path, columns, cached)
+        except Exception:
+            continue
+        if not len(dates):
+            continue
+        frames[symbol] = (dates, values)
+
+    if not frames:
+        return {c: pd.DataFrame() for c in columns}
+
+    # outer-join every symbol on the union of trading days; days a symbol
+    # did not trade stay NaN (they are NOT forward filled here)
+    index = pd.DatetimeIndex(np.unique(np.concatenate([d for d, _ in frames.values()])), name="Date")
+    symbols = sorted(frames)
+
+    arrays = [np.full((len(index), len(symbols)), np.nan) for _ in columns]
+    for j, symbol in enumerate(symbols):
+        dates, values = frames[symbol]
+        rows = index.get_indexer(dates)
+        for k, arr in enumerate(arrays):
+            arr[rows, j] = values[:, k]
+    return {c: pd.DataFrame(arr, index=index, columns=symbols) for c, arr in zip(columns, arrays)}
+
+
+def load_panel(columns=("Close",), data_dir=None):
+    """
+    Aligned (dates x symbols) panels for the requested columns, built from all
+    symbol files. Cached in-process per data version so repeat calls are free.
+    """
+    data_dir = data_dir or DATA_DIR
+    columns = tuple(columns)
+    version = data_version(data_dir)
+    key = (data_dir, version, columns)
+
+    panel = _panel_cache.get(key)
+    if panel is not None:
+        return panel, version
+
+    with _panel_lock:
+        panel = _panel_cache.get(key)
+        if panel is None:
+            cached = _file_cache.setdefault((data_dir, columns), {})
+            panel = _build_panel(list_symbol_files(data_dir), list(columns), cached)
+            # keep only the current version around
+            for k in [k for k in _panel_cache if k[0] == data_dir and k[1] != version]:
+                del _panel_cache[k]
+            _panel_cache[key] = panel
+    return panel, version
+
+
+def daily_returns(close):
+    """
+    Simple returns per symbol computed over that symbol's own trading days,
+    then left on the shared date index (non-trading days stay NaN).
+    """
+    prev = close.ffill().shift(1).to_numpy(dtype=float)
+    cur = close.to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(np.isfinite(cur) & (prev != 0), cur / prev - 1.0, np.nan)
+    return pd.DataFrame(out, index=close.index, columns=close.columns)
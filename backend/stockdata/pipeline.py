@@ -0,0 +1,395 @@
+# stockdata/pipeline.py
+"""
+Post-upload pipeline: after price files are uploaded, do the cold-path work
+before users hit it.
+
+    ingest[sym] ──> indicators[sym] ─────────┐
+         │              └──> alerts[sym]     │
+         │  ├────> forecasts[sym] ───────────┼──> warm
+         │  └────> drift[sym]                │
+         ├───────> snapshot ─────────────────┘
+         └───────> sectors
+
+- ingest      re-read the file; load it into DailyBar when that store is active
+- indicators  fill the indicator_frame cache
+- forecasts   re-run the stored LSTM model on the new data (needs tensorflow)
+- drift       join logged forecasts with the new closes (stockdata.drift)
+- alerts      check the new bar against the price alert rules (watchlist.alerts)
+- snapshot    rebuild the top gainers/losers payload, market snapshot and breadth
+- sectors     rebuild the sector indices whose members changed
+- warm        indicator frames for the most watched symbols, company directory
+
+Runs and their tasks are rows (PipelineRun / PipelineTask), so no broker is
+needed and an interrupted run resumes from its unfinished tasks. A
+per-symbol stage waits for the same symbol's upstream tasks; a whole-run
+stage waits for every task of its upstream stages. Ready tasks run
+concurrently in a thread pool; failures only skip what depends on them.
+
+Runs are executed by `manage.py pipeline_worker`, or, with
+STOCKDATA_PIPELINE_WORKER = "thread", by a background thread of the web
+process that enqueued them (the in-process caches it warms are then the ones
+the views read).
+"""
+import time
+import threading
+import traceback
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count
+from django.db.models.functions import Upper
+from django.utils import timezone
+
+from stockdata.models import PipelineRun, PipelineTask
+from stockdata.panel import DATA_DIR, list_symbol_files, read_price_frame
+from stockdata.storage import get_price_store, ingest
+from stockdata.indicators import indicator_frame
+from stockdata.snapshot import TOP_MOVERS_KEY, top_movers, market_snapshot
+from stockdata.directory import get_directory
+from stockdata.breadth import get_breadth
+from stockdata import forecast, drift, sectors
+from watchlist.models import WatchlistItem
+from watchlist import alerts
+
+WARM_TOP = 20             # most watched symbols warmed after every run
+MAX_ATTEMPTS = 3          # a task that keeps taking its worker down is failed
+STALE_AFTER = 300         # seconds without heartbeat before a running run is retaken
+HEARTBEAT_EVERY = STALE_AFTER / 3
+TOP_MOVERS_TIMEOUT = 3600
+
+
+class SkipTask(Exception):
+    """Raised by a stage when there is nothing to do for this task."""
+
+
+Stage = namedtuple("Stage", "deps per_symbol func")
+
+
+def _data_path(symbol):
+    path = list_symbol_files(DATA_DIR).get(symbol)
+    if path is None:
+        raise SkipTask("no price file")
+    return path
+
+
+# one writer at a time: concurrent bulk loads just fight over locks (SQLite)
+_write_lock = threading.Lock()
+
+
+def _ingest(symbol):
+    path = _data_path(symbol)
+    if read_price_frame(path).empty:
+        raise ValueError("no valid OHLC rows")
+    if get_price_store().name == "db":
+        with _write_lock:
+            result = ingest({symbol: path}, workers=1)
+        if result["skipped"]:
+            raise SkipTask("no Company row")
+
+
+def _indicators(symbol):
+    store = get_price_store()
+    if not store.exists(symbol):
+        raise SkipTask("no data")
+    indicator_frame(store, symbol)
+
+
+def _forecasts(symbol):
+    if not forecast.tensorflow_available():
+        raise SkipTask("tensorflow is not installed")
+    prediction = forecast.refresh_prediction(symbol, _data_path(symbol))
+    if prediction is None:
+        raise SkipTask("no trained model")
+    drift.log_forecast(symbol, prediction, source="pipeline")
+
+
+def _drift(symbol):
+    frame = read_price_frame(_data_path(symbol))
+    with _write_lock:
+        resolved = drift.resolve(symbol, frame)
+    if not resolved:
+        raise SkipTask("no open forecasts")
+
+
+def _alerts(symbol):
+    store = get_price_store()
+    if symbol.upper() not in alerts.get_index().fields:
+        raise SkipTask("no alert rules")
+    if not store.exists(symbol):
+        raise SkipTask("no data")
+    frame = indicator_frame(store, symbol)
+    with _write_lock:
+        fired = alerts.evaluate(symbol, frame)
+    if not fired:
+        raise SkipTask("no alert fired")
+
+
+def _snapshot(symbol):
+    cache.set(TOP_MOVERS_KEY, top_movers(DATA_DIR), TOP_MOVERS_TIMEOUT)
+    market_snapshot()
+    get_breadth()
+
+
+def _sectors(symbol):
+    if not sectors.refresh():
+        raise SkipTask("no sector changed")
+
+
+def most_watched(n=WARM_TOP):
+    return list(
+        WatchlistItem.objects.annotate(sym=Upper("symbol")).values("sym")
+        .annotate(n=Count("id")).order_by("-n", "sym").values_list("sym", flat=True)[:n]
+    )
+
+
+def _warm(symbol):
+    store = get_price_store()
+    for s in most_watched():
+        if store.exists(s):
+            indicator_frame(store, s)
+    get_directory()
+
+
+STAGES = {
+    "ingest": Stage((), True, _ingest),
+    "indicators": Stage(("ingest",), True, _indicators),
+    "forecasts": Stage(("ingest",), True, _forecasts),
+    "drift": Stage(("ingest",), True, _drift),
+    "alerts": Stage(("indicators",), True, _alerts),
+    "snapshot": Stage(("ingest",), False, _snapshot),
+    "sectors": Stage(("ingest",), False, _sectors),
+    "warm": Stage(("indicators", "forecasts", "snapshot"), False, _warm),
+}
+
+
+def enqueue(symbols, trigger="upload"):
+    """
+    Create a run with one task per (stage, symbol). Returns the PipelineRun.
+    """
+    symbols = sorted({s.upper() for s in symbols})
+    with transaction.atomic():
+        run = PipelineRun.objects.create(trigger=trigger, symbols=symbols)
+        PipelineTask.objects.bulk_create([
+            PipelineTask(run=run, stage=name, symbol=s)
+            for name, stage in STAGES.items()
+            for s in (symbols if stage.per_symbol else [""])
+        ])
+    return run
+
+
+def _dep_state(task, tasks):
+    """
+    "ready", "blocked" (upstream unfinished) or "skip" (upstream failed/skipped).
+    """
+    for dep in STAGES[task.stage].deps:
+        if STAGES[dep].per_symbol and task.symbol:
+            upstream = [tasks[(dep, task.symbol)]]
+        else:
+            upstream = [t for (stage, _), t in tasks.items() if stage == dep]
+        if any(t.status in (PipelineTask.PENDING, PipelineTask.RUNNING) for t in upstream):
+            return "blocked"
+        # a whole-run stage still runs after some symbols failed
+        if task.symbol and any(t.status != PipelineTask.DONE for t in upstream):
+            return "skip"
+    return "ready"
+
+
+def _call(task):
+    start = time.perf_counter()
+    try:
+        STAGES[task.stage].func(task.symbol)
+        status, error = PipelineTask.DONE, ""
+    except SkipTask as exc:
+        status, error = PipelineTask.SKIPPED, str(exc)
+    except Exception:
+        status, error = PipelineTask.FAILED, traceback.format_exc(limit=5)
+    finally:
+        # this thread's connections; the pool thread may be reused for another task
+        connections.close_all()
+    return status, error, (time.perf_counter() - start) * 1000
+
+
+def _finish(task, status, error="", duration_ms=None):
+    task.status = status
+    task.error = error
+    task.duration_ms = duration_ms
+    task.finished_at = timezone.now()
+    task.save(update_fields=["status", "error", "duration_ms", "finished_at"])
+    PipelineRun.objects.filter(pk=task.run_id).update(heartbeat_at=task.finished_at)
+
+
+def execute(run, workers=None):
+    """
+    Run every unfinished task of `run`, respecting the stage graph.
+    """
+    workers = workers or getattr(settings, "STOCKDATA_PIPELINE_THREADS", 4)
+    tasks = {(t.stage, t.symbol): t for t in run.tasks.all()}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        while True:
+            for key, task in tasks.items():
+                if task.status != PipelineTask.PENDING:
+                    continue
+                state = _dep_state(task, tasks)
+                if state == "skip":
+                    _finish(task, PipelineTask.SKIPPED, "upstream task did not finish")
+                elif state == "ready":
+                    if task.attempts >= MAX_ATTEMPTS:
+                        _finish(task, PipelineTask.FAILED, f"gave up after {task.attempts} attempts")
+                        continue
+                    task.status = PipelineTask.RUNNING
+                    task.attempts += 1
+                    task.started_at = timezone.now()
+                    task.save(update_fields=["status", "attempts", "started_at"])
+                    running[pool.submit(_call, task)] = task
+            if not running:
+                break
+            # a long task must not make the run look dead to recover()
+            done, _ = wait(running, timeout=HEARTBEAT_EVERY, return_when=FIRST_COMPLETED)
+            PipelineRun.objects.filter(pk=run.pk).update(heartbeat_at=timezone.now())
+            for future in done:
+                _finish(running.pop(future), *future.result())
+
+    failed = [t for t in tasks.values() if t.status == PipelineTask.FAILED]
+    run.status = PipelineRun.FAILED if failed else PipelineRun.DONE
+    run.error = ", ".join(f"{t.stage}[{t.symbol or '*'}]" for t in failed)
+    run.finished_at = timezone.now()
+    run.save(update_fields=["status", "error", "finished_at"])
+    return run
+
+
+def recover():
+    """
+    Put runs whose worker died (no heartbeat for STALE_AFTER seconds) back in
+    the queue; their finished tasks are kept.
+    """
+    cutoff = timezone.now() - timezone.timedelta(seconds=STALE_AFTER)
+    stale = list(PipelineRun.objects.filter(status=PipelineRun.RUNNING, heartbeat_at__lt=cutoff)
+                 .values_list("id", flat=True))
+    if stale:
+        PipelineTask.objects.filter(run_id__in=stale, status=PipelineTask.RUNNING).update(status=PipelineTask.PENDING)
+        PipelineRun.objects.filter(id__in=stale, status=PipelineRun.RUNNING).update(status=PipelineRun.PENDING)
+    return len(stale)
+
+
+def claim_next():
+    """
+    Oldest pending run, marked running; None when the queue is empty.
+    The conditional update makes sure only one worker gets it.
+    """
+    recover()
+    for run in PipelineRun.objects.filter(status=PipelineRun.PENDING).order_by("id"):
+        now = timezone.now()
+        claimed = PipelineRun.objects.filter(pk=run.pk, status=PipelineRun.PENDING).update(
+            status=PipelineRun.RUNNING, started_at=run.started_at or now, heartbeat_at=now,
+        )
+        if claimed:
+            run.refresh_from_db()
+            return run
+    return None
+
+
+def drain(workers=None):
+    """
+    Execute queued runs until there are none left. Returns how many ran.
+    """
+    count = 0
+    while True:
+        run = claim_next()
+        if run is None:
+            return count
+        execute(run, workers)
+        count += 1
+
+
+_thread_lock = threading.Lock()
+_thread = {"worker": None, "kicked": False}
+
+
+def _thread_main():
+    try:
+        while True:
+            with _thread_lock:
+                _thread["kicked"] = False
+            drain()
+            with _thread_lock:
+                if not _thread["kicked"]:
+                    _thread["worker"] = None
+                    return
+    finally:
+        connections.close_all()
+
+
+def kick():
+    """
+    Make sure queued runs get executed. With STOCKDATA_PIPELINE_WORKER =
+    "thread" that is a background thread of this process; with "process" a
+    `manage.py pipeline_worker` picks them up on its next poll.
+    """
+    if getattr(settings, "STOCKDATA_PIPELINE_WORKER", "thread") != "thread":
+        return
+    # start once the upload's transaction (and the run rows) are committed;
+    # a rolled back transaction leaves no worker behind
+    transaction.on_commit(_start_thread)
+
+
+def _start_thread():
+    with _thread_lock:
+        _thread["kicked"] = True
+        worker = _thread["worker"]
+        if worker is not None and worker.is_alive():
+            return
+        worker = threading.Thread(target=_thread_main, name="stockdata-pipeline", daemon=True)
+        _thread["worker"] = worker
+        worker.start()
+
+
+def run_summary(run, with_tasks=False):
+    """
+    Run status plus per-stage task counts and durations: total_ms is the
+    summed task time, wall_ms first start to last finish.
+    """
+    tasks = list(run.tasks.all())
+    stages = {}
+    for name in STAGES:
+        group = [t for t in tasks if t.stage == name]
+        durations = [t.duration_ms for t in group if t.duration_ms is not None]
+        starts = [t.started_at for t in group if t.started_at]
+        ends = [t.finished_at for t in group if t.finished_at and t.started_at]
+        counts = {s: 0 for s, _ in PipelineTask.STATUS_CHOICES}
+        for t in group:
+            counts[t.status] += 1
+        stages[name] = {
+            **counts,
+            "total_ms": round(sum(durations), 1),
+            "max_ms": round(max(durations), 1) if durations else None,
+            "wall_ms": round((max(ends) - min(starts)).total_seconds() * 1000, 1) if starts and ends else None,
+        }
+
+    out = {
+        "id": run.id,
+        "trigger": run.trigger,
+        "status": run.status,
+        "symbols": run.symbols,
+        "error": run.error,
+        "created_at": run.created_at.isoformat(),
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+        "duration_ms": round((run.finished_at - run.started_at).total_seconds() * 1000, 1)
+        if run.started_at and run.finished_at else None,
+        "stages": stages,
+    }
+    if with_tasks:
+        out["tasks"] = [
+            {
+                "stage": t.stage, "symbol": t.symbol, "status": t.status, "attempts": t.attempts,
+                "duration_ms": round(t.duration_ms, 1) if t.duration_ms is not None else None,
+                "error": t.error,
+            }
+            for t in tasks
+        ]
+    return out
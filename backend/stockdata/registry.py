@@ -0,0 +1,198 @@
+# stockdata/registry.py
+"""
+Model registry: PriceFile / ModelArtifact rows mirror what is on disk under
+STOCKDATA_DATA_DIR and STOCKDATA_OUTPUT_DIR, so request handlers answer from
+indexed lookups instead of listing folders and parsing every results JSON.
+
+Rows are written when artifacts are produced (upload view, training notebook)
+and `manage.py sync_model_registry` rebuilds them from disk; the first
+migrate fills an empty registry (stockdata/signals.py).
+"""
+import os
+import json
+import hashlib
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from stockdata.models import PriceFile, ModelArtifact
+
+DATA_DIR = str(getattr(settings, "STOCKDATA_DATA_DIR", os.path.join(os.path.dirname(__file__), "data")))
+OUTPUT_DIR = str(getattr(settings, "STOCKDATA_OUTPUT_DIR", os.path.join(os.path.dirname(__file__), "outputs")))
+
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def register_price_file(symbol, path, data_hash=None, data_dir=None):
+    """
+    Record the price CSV for `symbol`. Pass `data_hash` when the caller has
+    already hashed the content while writing it.
+    """
+    data_dir = data_dir or DATA_DIR
+    obj, _ = PriceFile.objects.update_or_create(
+        symbol=symbol.upper(),
+        defaults={
+            "path": os.path.relpath(path, data_dir),
+            "size": os.path.getsize(path),
+            "data_hash": data_hash or file_hash(path),
+        },
+    )
+    return obj
+
+
+def _find_results_json(folder, dirname):
+    # the notebook writes <SYMBOL>_results.json; older runs used the folder
+    # name or a lower-cased symbol
+    for name in (f"{dirname.upper()}_results.json", f"{dirname}_results.json", f"{dirname.lower()}_results.json"):
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _hybrid_accuracy(data):
+    cls = data.get("classification")
+    if isinstance(cls, dict) and "hybrid_accuracy" in cls:
+        value = cls.get("hybrid_accuracy")
+    else:
+        value = next((data.get(k) for k in ("accuracy", "acc", "accuracy_score", "acc_score") if k in data), None)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    # stored as a percentage, like the dashboard always reported it
+    return round(value * 100.0 if value <= 1 else value, 2)
+
+
+def _float(d, key):
+    try:
+        return float(d.get(key))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _trained_at(data, fallback_path):
+    ts = data.get("timestamp")
+    if ts:
+        try:
+            dt = datetime.datetime.fromisoformat(ts)
+            # the notebook writes naive UTC timestamps
+            return dt if timezone.is_aware(dt) else dt.replace(tzinfo=datetime.timezone.utc)
+        except (TypeError, ValueError):
+            pass
+    if fallback_path:
+        return datetime.datetime.fromtimestamp(os.path.getmtime(fallback_path), tz=datetime.timezone.utc)
+    return None
+
+
+def scan_model_dir(folder, output_dir=None):
+    """
+    Read one outputs/<SYMBOL>/ folder into ModelArtifact field values.
+    """
+    output_dir = output_dir or OUTPUT_DIR
+    dirname = os.path.basename(os.path.normpath(folder))
+    symbol = dirname.upper()
+
+    def rel(name):
+        path = os.path.join(folder, name)
+        return os.path.relpath(path, output_dir) if os.path.exists(path) else None
+
+    results_path = _find_results_json(folder, dirname)
+    data = {}
+    if results_path:
+        try:
+            with open(results_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            data = {}
+    if not isinstance(data, dict):
+        data = {}
+
+    cls = data.get("classification") if isinstance(data.get("classification"), dict) else {}
+    reg = data.get("regression") if isinstance(data.get("regression"), dict) else {}
+
+    return symbol, {
+        "model_path": rel(f"{symbol}_model.keras"),
+        "scaler_path": rel(f"{symbol}_scaler.pkl"),
+        "results_path": os.path.relpath(results_path, output_dir) if results_path else None,
+        "predictions_path": rel(f"{symbol}_results_with_tol.csv"),
+        "hybrid_accuracy": _hybrid_accuracy(data),
+        "direction_accuracy": _float(cls, "direction_accuracy"),
+        "tolerance_accuracy": _float(cls, "tolerance_accuracy"),
+        "mae": _float(reg, "mae"),
+        "rmse": _float(reg, "rmse"),
+        "results": data or None,
+        "trained_at": _trained_at(data, results_path),
+    }
+
+
+def register_model(symbol, output_dir=None, data_path=None):
+    """
+    Record (or refresh) the artifacts of `symbol` after training wrote them.
+    `data_path` is the CSV the model was trained on; its hash is stored so a
+    stale model can be told apart from one trained on the current data.
+    """
+    output_dir = output_dir or OUTPUT_DIR
+    folder = os.path.join(output_dir, symbol.upper())
+    if not os.path.isdir(folder):
+        folder = os.path.join(output_dir, symbol)
+    symbol, values = scan_model_dir(folder, output_dir)
+
+    if data_path and os.path.exists(data_path):
+        values["data_hash"] = file_hash(data_path)
+    else:
+        price = PriceFile.objects.filter(symbol=symbol).values_list("data_hash", flat=True).first()
+        values["data_hash"] = price
+
+    obj, _ = ModelArtifact.objects.update_or_create(symbol=symbol, defaults=values)
+    return obj
+
+
+def sync_registry(data_dir=None, output_dir=None):
+    """
+    Rebuild both tables from disk: upsert what exists, delete rows whose
+    files are gone. Returns (price_files, models) counts.
+    """
+    data_dir = data_dir or DATA_DIR
+    output_dir = output_dir or OUTPUT_DIR
+
+    price_symbols = set()
+    if os.path.isdir(data_dir):
+        known = {p.symbol: p for p in PriceFile.objects.all()}
+        with os.scandir(data_dir) as it:
+            for entry in it:
+                if not (entry.is_file() and entry.name.lower().endswith(".csv")):
+                    continue
+                symbol = os.path.splitext(entry.name)[0].upper()
+                price_symbols.add(symbol)
+                cur = known.get(symbol)
+                # same size and not modified since it was recorded: skip re-hashing
+                st = entry.stat()
+                if (cur and cur.data_hash and cur.path == entry.name and cur.size == st.st_size
+                        and st.st_mtime <= cur.updated_at.timestamp()):
+                    continue
+                register_price_file(symbol, entry.path, data_dir=data_dir)
+    PriceFile.objects.exclude(symbol__in=price_symbols).delete()
+
+    model_symbols = set()
+    if os.path.isdir(output_dir):
+        with os.scandir(output_dir) as it:
+            for entry in sorted(it, key=lambda e: e.name):
+                if not entry.is_dir():
+                    continue
+                model_symbols.add(entry.name.upper())
+                register_model(entry.name, output_dir=output_dir)
+    ModelArtifact.objects.exclude(symbol__in=model_symbols).delete()
+
+    return len(price_symbols), len(model_symbols)
+
+
+def output_path(relpath, output_dir=None):
+    return os.path.join(output_dir or OUTPUT_DIR, relpath) if relpath else None
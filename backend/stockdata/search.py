@@ -0,0 +1,242 @@
+# stockdata/search.py
+"""
+In-process inverted index over announcement headlines.
+
+Every headline in data/announcement/<SYMBOL>.csv becomes a document. Doc ids
+are assigned newest-first, so each postings list is already sorted by date
+and a date range is one contiguous slice of doc ids.
+
+The index checks the folder at most every REFRESH_INTERVAL seconds and
+re-reads only files whose size/mtime changed; postings are then re-merged
+from the cached per-file tokens.
+"""
+import os
+import re
+import time
+import math
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+DATA_DIR = str(getattr(settings, "STOCKDATA_DATA_DIR", os.path.join(os.path.dirname(__file__), "data")))
+ANNOUNCEMENT_DIR = os.path.join(DATA_DIR, "announcement")
+
+REFRESH_INTERVAL = 5.0  # seconds between folder checks
+MAX_PAGE_SIZE = 100
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[./:][0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or the this to was were will with".split()
+)
+
+
+def _stem(token):
+    # enough to fold "dividends" -> "dividend", "shares" -> "share"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss") and not token[-2].isdigit():
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """
+    Lower-cased word tokens with stopwords dropped and plurals folded.
+    Fiscal years and ratios ("2080/81", "1:1") stay single tokens.
+    """
+    return [_stem(t) for t in _TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+def _read_file(path, symbol):
+    df = pd.read_csv(path)
+    if "headline" not in df.columns:
+        return None
+    dates = pd.to_datetime(df.get("date"), format="%b %d, %Y", errors="coerce")
+    headlines = df["headline"].fillna("").astype(str).tolist()
+    return {
+        "symbol": symbol,
+        "dates": dates.to_numpy(dtype="datetime64[D]"),
+        "headlines": headlines,
+        "links": df["link"].fillna("").astype(str).tolist() if "link" in df.columns else [""] * len(df),
+        "sentiment": pd.to_numeric(df["sentiment"], errors="coerce").to_numpy(dtype=float)
+        if "sentiment" in df.columns else np.full(len(df), np.nan),
+        "tokens": [Counter(tokenize(h)) for h in headlines],
+    }
+
+
+class AnnouncementIndex:
+    """
+    Immutable snapshot of the index. Document arrays are in doc-id order
+    (newest first); `postings[term]` is (doc_ids, term_freqs), both int32.
+    """
+
+    def __init__(self, files):
+        parts = [f for _, f in sorted(files.items()) if f is not None and len(f["headlines"])]
+        self.symbols = [f["symbol"] for f in parts]
+
+        if parts:
+            dates = np.concatenate([f["dates"] for f in parts])
+            sym_id = np.concatenate([np.full(len(f["headlines"]), i, dtype=np.int32) for i, f in enumerate(parts)])
+            sentiment = np.concatenate([f["sentiment"] for f in parts])
+            headlines = [h for f in parts for h in f["headlines"]]
+            links = [l for f in parts for l in f["links"]]
+            tokens = [t for f in parts for t in f["tokens"]]
+        else:
+            dates = np.array([], dtype="datetime64[D]")
+            sym_id = np.array([], dtype=np.int32)
+            sentiment = np.array([], dtype=float)
+            headlines, links, tokens = [], [], []
+
+        # newest first; undated rows sort last
+        day = dates.astype("int64")
+        day = np.where(np.isnat(dates), -(10 ** 9), day)
+        order = np.lexsort((sym_id, -day))
+
+        self.dates = dates[order]
+        self.day = day[order]
+        self.sym_id = sym_id[order]
+        self.sentiment = sentiment[order]
+        self.headlines = [headlines[i] for i in order]
+        self.links = [links[i] for i in order]
+
+        lists = {}
+        doc_len = np.zeros(len(order), dtype=np.int32)
+        for doc, i in enumerate(order):
+            counts = tokens[i]
+            doc_len[doc] = sum(counts.values())
+            for term, tf in counts.items():
+                entry = lists.get(term)
+                if entry is None:
+                    entry = lists[term] = ([], [])
+                entry[0].append(doc)
+                entry[1].append(tf)
+        self.postings = {
+            term: (np.asarray(ids, dtype=np.int32), np.asarray(tfs, dtype=np.int32))
+            for term, (ids, tfs) in lists.items()
+        }
+        self.doc_len = doc_len
+        self.avg_len = float(doc_len.mean()) if len(doc_len) else 0.0
+        self.size = len(order)
+
+    def _date_slice(self, date_from, date_to):
+        # day is descending: negate it for searchsorted
+        neg = -self.day
+        lo = 0 if date_to is None else int(np.searchsorted(neg, -date_to, side="left"))
+        hi = self.size if date_from is None else int(np.searchsorted(neg, -date_from, side="right"))
+        return lo, hi
+
+    def search(self, query="", symbols=None, date_from=None, date_to=None, sort="relevance",
+               page=1, page_size=20):
+        """
+        All query terms must match (AND). `symbols` is an iterable of symbols,
+        `date_from` / `date_to` are inclusive datetime64[D] / date strings.
+        Returns {"total", "page", "page_size", "hits": [...]}.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        lo, hi = self._date_slice(
+            None if date_from is None else np.datetime64(date_from, "D").astype("int64"),
+            None if date_to is None else np.datetime64(date_to, "D").astype("int64"),
+        )
+
+        if terms:
+            lists = [self.postings.get(t) for t in terms]
+            if any(p is None for p in lists):
+                docs = np.array([], dtype=np.int32)
+            else:
+                # intersect from the rarest term, restricted to the date slice
+                lists.sort(key=lambda p: len(p[0]))
+                first = lists[0][0]
+                docs = first[np.searchsorted(first, lo):np.searchsorted(first, hi)]
+                for ids, _ in lists[1:]:
+                    if not len(docs):
+                        break
+                    docs = np.intersect1d(docs, ids, assume_unique=True)
+        else:
+            docs = np.arange(lo, hi, dtype=np.int32)
+
+        if symbols:
+            wanted = [i for i, s in enumerate(self.symbols) if s in symbols]
+            docs = docs[np.isin(self.sym_id[docs], wanted)]
+
+        total = len(docs)
+        scores = None
+        if terms and total:
+            scores = np.zeros(total)
+            norm = K1 * (1 - B + B * self.doc_len[docs] / (self.avg_len or 1.0))
+            for t in terms:
+                ids, tfs = self.postings[t]
+                tf = tfs[np.searchsorted(ids, docs)]
+                idf = math.log(1 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+                scores += idf * tf * (K1 + 1) / (tf + norm)
+            if sort != "date":
+                # stable sort keeps newest-first among equal scores
+                rank = np.argsort(-scores, kind="stable")
+                docs, scores = docs[rank], scores[rank]
+
+        page_size = max(1, min(MAX_PAGE_SIZE, page_size))
+        page = max(1, page)
+        start = (page - 1) * page_size
+        hits = []
+        for k in range(start, min(start + page_size, total)):
+            d = int(docs[k])
+            hits.append({
+                "symbol": self.symbols[self.sym_id[d]],
+                "date": str(self.dates[d]) if not np.isnat(self.dates[d]) else None,
+                "headline": self.headlines[d],
+                "link": self.links[d],
+                "score": round(float(scores[k]), 4) if scores is not None else None,
+            })
+        return {"total": total, "page": page, "page_size": page_size, "hits": hits}
+
+
+_lock = threading.Lock()
+_state = {"dir": None, "stats": {}, "files": {}, "index": None, "checked_at": 0.0}
+
+
+def _scan(folder):
+    stats = {}
+    if os.path.isdir(folder):
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith(".csv"):
+                    st = entry.stat()
+                    stats[os.path.splitext(entry.name)[0].upper()] = (entry.path, st.st_mtime_ns, st.st_size)
+    return stats
+
+
+def get_index(folder=None, force=False):
+    """
+    Current index, refreshed incrementally when announcement files changed.
+    """
+    folder = folder or ANNOUNCEMENT_DIR
+    now = time.monotonic()
+    state = _state
+    if not force and state["dir"] == folder and state["index"] is not None and now - state["checked_at"] < REFRESH_INTERVAL:
+        return state["index"]
+
+    with _lock:
+        if state["dir"] != folder:
+            state.update(dir=folder, stats={}, files={}, index=None)
+        stats = _scan(folder)
+        changed = [s for s, st in stats.items() if state["stats"].get(s) != st]
+        removed = [s for s in state["stats"] if s not in stats]
+
+        if changed or removed or state["index"] is None:
+            files = dict(state["files"])
+            for s in removed:
+                files.pop(s, None)
+            for s in changed:
+                try:
+                    files[s] = _read_file(stats[s][0], s)
+                except Exception:
+                    files[s] = None
+            state["index"] = AnnouncementIndex(files)
+            state["files"] = files
+            state["stats"] = stats
+        state["checked_at"] = time.monotonic()
+        return state["index"]
@@ -0,0 +1,198 @@
+# stockdata/sectors.py
+"""
+Sector indices built from the member symbols' daily bars.
+
+Members are the companies of a Company.sector that have a price file. For
+every session, each member's open / high / low / close relative to its own
+previous close (so a member that skipped days contributes the move since
+its last session) is averaged with one of two weightings:
+
+- equal     every member that traded that day
+- turnover  each member's average turnover over the previous
+            TURNOVER_WINDOW sessions (known before the day); equal weights
+            on a day when none of the trading members has turnover
+
+and the index is chained from BASE_LEVEL. A new listing joins from its second
+session, when it first has a previous close. All sectors are computed at once
+on the shared (dates x symbols) panel with a (symbols x sectors) membership
+matrix.
+
+Results are written to data/sectors/<slug>-<method>.csv (the price file
+layout, plus a Members column) and recorded in data/sectors/index.json with a
+fingerprint of the members and their files; refresh() rewrites only the
+sectors whose fingerprint changed, so an upload touches the uploaded
+symbols' sectors. Only the pipeline's "sectors" stage and
+`manage.py build_sectors` write; readers see what was last built.
+"""
+import os
+import json
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+from django.utils.text import slugify
+
+from stockdata.models import Company
+from stockdata.panel import DATA_DIR, list_symbol_files, load_panel
+
+SECTOR_DIR = "sectors"
+METHODS = ("equal", "turnover")
+BASE_LEVEL = 1000.0
+TURNOVER_WINDOW = 20
+PRICE_COLUMNS = ("Open", "High", "Low", "Close")
+
+_lock = threading.Lock()
+
+
+def sector_dir(data_dir=None):
+    return os.path.join(data_dir or DATA_DIR, SECTOR_DIR)
+
+
+def sector_members(data_dir=None):
+    """
+    {sector: sorted member symbols} for the sectors that have price files.
+    """
+    files = list_symbol_files(data_dir)
+    members = {}
+    for symbol, sector in Company.objects.exclude(sector=None).exclude(sector="").values_list("symbol", "sector"):
+        symbol = (symbol or "").upper()
+        if symbol in files:
+            members.setdefault(sector, set()).add(symbol)
+    return {sector: sorted(symbols) for sector, symbols in sorted(members.items())}
+
+
+def _fingerprint(symbols, files):
+    h = hashlib.md5()
+    for symbol in symbols:
+        st = os.stat(files[symbol])
+        h.update(f"{symbol}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()[:16]
+
+
+def compute(panel, members, method):
+    """
+    {sector: DataFrame(Date, Open, High, Low, Close, Volume, Turnover, Members)}
+    for the sectors in `members` ({sector: symbols}).
+    """
+    close = panel["Close"]
+    symbols = list(close.columns)
+    sectors = list(members)
+    pos = {s: j for j, s in enumerate(symbols)}
+    member = np.zeros((len(symbols), len(sectors)))
+    for k, sector in enumerate(sectors):
+        member[[pos[s] for s in members[sector] if s in pos], k] = 1.0
+
+    prev = close.ffill().shift(1).to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel = {c: panel[c].to_numpy(dtype=float) / prev - 1 for c in PRICE_COLUMNS}
+    valid = np.isfinite(rel["Close"]) & (prev > 0)
+    for c in PRICE_COLUMNS:
+        valid &= np.isfinite(rel[c])
+
+    turnover = panel["Turnover"].to_numpy(dtype=float)
+    equal = valid.astype(float)
+    if method == "turnover":
+        trailing = (pd.DataFrame(turnover).shift(1).rolling(TURNOVER_WINDOW, min_periods=1).mean()
+                    .to_numpy())
+        weights = np.where(valid, np.nan_to_num(trailing, nan=0.0), 0.0)
+        wsum = weights @ member
+        # days on which no trading member has turnover fall back to equal weights
+        fallback = (wsum == 0) @ member.T > 0
+        weights = np.where(fallback, equal, weights)
+    else:
+        weights = equal
+    wsum = weights @ member
+    traded = equal @ member
+
+    out = {}
+    for k, sector in enumerate(sectors):
+        rows = np.flatnonzero(wsum[:, k] > 0)
+        if not len(rows):
+            continue
+        w = weights[rows] * member[:, k]
+        agg = {c: (np.where(w > 0, rel[c][rows], 0.0) * w).sum(axis=1) / wsum[rows, k] for c in PRICE_COLUMNS}
+        level = BASE_LEVEL * np.cumprod(1 + agg["Close"])
+        prev_level = np.concatenate([[BASE_LEVEL], level[:-1]])
+        cols = member[:, k] > 0
+        out[sector] = pd.DataFrame({
+            "Date": close.index[rows],
+            **{c: prev_level * (1 + agg[c]) for c in ("Open", "High", "Low")},
+            "Close": level,
+            "Volume": np.nansum(panel["Volume"].to_numpy(dtype=float)[rows][:, cols], axis=1),
+            "Turnover": np.nansum(turnover[rows][:, cols], axis=1),
+            "Members": traded[rows, k].astype(int),
+        })
+    return out
+
+
+def _write_csv(df, path):
+    tmp = f"{path}.tmp"
+    df.to_csv(tmp, index=False, date_format="%Y-%m-%d", float_format="%.4f")
+    os.replace(tmp, path)
+
+
+def read_manifest(data_dir=None):
+    path = os.path.join(sector_dir(data_dir), "index.json")
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def refresh(data_dir=None, force=False):
+    """
+    Rebuild the sector indices whose members or member files changed.
+    Returns the names of the sectors that were rewritten.
+    """
+    folder = sector_dir(data_dir)
+    with _lock:
+        os.makedirs(folder, exist_ok=True)
+        files = list_symbol_files(data_dir)
+        members = sector_members(data_dir)
+        manifest = read_manifest(data_dir)
+        fingerprints = {sector: _fingerprint(symbols, files) for sector, symbols in members.items()}
+        stale = {
+            sector: symbols for sector, symbols in members.items()
+            if force or (manifest.get(sector) or {}).get("fingerprint") != fingerprints[sector]
+        }
+        removed = [sector for sector in manifest if sector not in members]
+        if not stale and not removed:
+            return []
+
+        if stale:
+            panel, _ = load_panel(("Open", "High", "Low", "Close", "Volume", "Turnover"), data_dir)
+            for method in METHODS:
+                for sector, df in compute(panel, stale, method).items():
+                    _write_csv(df, os.path.join(folder, f"{slugify(sector)}-{method}.csv"))
+
+        for sector in removed:
+            for method in METHODS:
+                path = os.path.join(folder, f"{manifest[sector]['slug']}-{method}.csv")
+                if os.path.exists(path):
+                    os.remove(path)
+            del manifest[sector]
+        for sector in stale:
+            manifest[sector] = {
+                "slug": slugify(sector),
+                "members": members[sector],
+                "fingerprint": fingerprints[sector],
+            }
+
+        tmp = os.path.join(folder, "index.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=2)
+        os.replace(tmp, os.path.join(folder, "index.json"))
+    return sorted(stale) + sorted(removed)
+
+
+def sector_path(slug, method, data_dir=None):
+    """
+    (sector name, csv path) of a built index, or None.
+    """
+    for sector, entry in read_manifest(data_dir).items():
+        if entry.get("slug") == slug:
+            path = os.path.join(sector_dir(data_dir), f"{slug}-{method}.csv")
+            return (sector, path) if os.path.exists(path) else None
+    return None
@@ -0,0 +1,240 @@
+# stockdata/sentiment.py
+"""
+Announcement sentiment as time series.
+
+- Per-symbol daily aggregates (count / sum / mean of the `sentiment`
+  column) are written to data/sentiment/<SYMBOL>.csv by
+  `manage.py sentiment_pipeline`. Readers use the stored series while it is
+  newer than the announcement file and otherwise compute it in memory; they
+  never write.
+- Sector series sum the daily aggregates of the sector's symbols.
+- Rolling windows are calendar-day windows: the rolling mean is the mean
+  score of all announcements in the last `window` days.
+- score_headline() is a small keyword lexicon on the same -2..2 scale as
+  the scraped scores; rescore_files() fills missing scores in parallel.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from stockdata.panel import data_version
+from stockdata.search import tokenize
+
+DATA_DIR = str(getattr(settings, "STOCKDATA_DATA_DIR", os.path.join(os.path.dirname(__file__), "data")))
+ANNOUNCEMENT_DIR = os.path.join(DATA_DIR, "announcement")
+SENTIMENT_DIR = os.path.join(DATA_DIR, "sentiment")
+
+DEFAULT_WINDOW = 30  # calendar days
+
+# token prefix -> weight; a headline scores the clipped sum of its matches
+LEXICON = {
+    "bonu": 2.0, "dividend": 1.5, "right": 1.0, "auction": 0.5, "allot": 0.5,
+    "profit": 0.5, "growth": 0.5, "increas": 0.5, "merger": 0.5, "acqui": 0.5,
+    "suspend": -2.0, "halt": -2.0, "penal": -2.0, "fine": -1.0, "loss": -1.0,
+    "declin": -1.0, "decreas": -1.0, "postpon": -1.0, "correct": -1.0, "cancel": -1.0,
+    "defer": -0.5, "unclaim": 0.5, "uncollect": 0.5,
+}
+_NEGATIONS = {"no", "not", "without"}
+
+
+def score_headline(text):
+    """
+    Lexicon score in [-2, 2]. A negation right before a term flips it.
+    """
+    score = 0.0
+    prev = None
+    for token in tokenize(text):
+        for prefix, weight in LEXICON.items():
+            if token.startswith(prefix):
+                score += -weight if prev in _NEGATIONS else weight
+                break
+        prev = token
+    return float(np.clip(score, -2.0, 2.0))
+
+
+def _rescore_file(args):
+    path, overwrite = args
+    df = pd.read_csv(path)
+    if "headline" not in df.columns:
+        return path, 0
+    if "sentiment" not in df.columns:
+        df["sentiment"] = np.nan
+    current = pd.to_numeric(df["sentiment"], errors="coerce")
+    todo = np.ones(len(df), dtype=bool) if overwrite else current.isna().to_numpy()
+    if not todo.any():
+        return path, 0
+
+    current[todo] = [score_headline(h) for h in df.loc[todo, "headline"].fillna("")]
+    df["sentiment"] = current
+    tmp = f"{path}.tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return path, int(todo.sum())
+
+
+def rescore_files(paths, overwrite=False, workers=None):
+    """
+    Fill missing (or, with overwrite, all) sentiment scores in the given
+    announcement files, one file per task. Returns {path: rows_scored}.
+    """
+    tasks = [(p, overwrite) for p in paths]
+    if workers == 1 or len(tasks) <= 1:
+        return dict(map(_rescore_file, tasks))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return dict(ex.map(_rescore_file, tasks, chunksize=max(1, len(tasks) // 64)))
+
+
+def daily_sentiment(announcement_path):
+    """
+    Daily count / sum / mean of the scores in one announcement file,
+    indexed by calendar date. Rows without a date or score are skipped.
+    """
+    df = pd.read_csv(announcement_path)
+    dates = pd.to_datetime(df.get("date"), format="%b %d, %Y", errors="coerce")
+    scores = pd.to_numeric(df["sentiment"], errors="coerce") if "sentiment" in df.columns else pd.Series(np.nan, index=df.index)
+    ok = dates.notna() & scores.notna()
+    g = scores[ok].groupby(dates[ok].dt.normalize())
+    out = pd.DataFrame({"count": g.size(), "sum": g.sum()})
+    out.index.name = "date"
+    out["mean"] = out["sum"] / out["count"]
+    return out.sort_index()
+
+
+def _stored_path(symbol, sentiment_dir=None):
+    return os.path.join(sentiment_dir or SENTIMENT_DIR, f"{symbol.upper()}.csv")
+
+
+def store_symbol(symbol, announcement_dir=None, sentiment_dir=None):
+    """
+    Recompute and write data/sentiment/<SYMBOL>.csv. Returns the daily frame,
+    or None when the symbol has no announcement file.
+    """
+    src = os.path.join(announcement_dir or ANNOUNCEMENT_DIR, f"{symbol.upper()}.csv")
+    if not os.path.exists(src):
+        return None
+    daily = daily_sentiment(src)
+    dst = _stored_path(symbol, sentiment_dir)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = f"{dst}.tmp"
+    daily.to_csv(tmp, date_format="%Y-%m-%d")
+    os.replace(tmp, dst)
+    return daily
+
+
+def load_symbol(symbol, announcement_dir=None, sentiment_dir=None):
+    """
+    Daily series for `symbol`: the stored one, or computed from the
+    announcement file when that changed since the series was stored (or it
+    never was). None when there are no announcements.
+    """
+    src = os.path.join(announcement_dir or ANNOUNCEMENT_DIR, f"{symbol.upper()}.csv")
+    dst = _stored_path(symbol, sentiment_dir)
+    if not os.path.exists(src):
+        return None
+    if not os.path.exists(dst) or os.path.getmtime(dst) < os.path.getmtime(src):
+        return daily_sentiment(src)
+    return pd.read_csv(dst, index_col="date", parse_dates=["date"])
+
+
+def _store_task(args):
+    symbol, announcement_dir, sentiment_dir = args
+    store_symbol(symbol, announcement_dir, sentiment_dir)
+    return symbol
+
+
+def store_all(symbols, announcement_dir=None, sentiment_dir=None, workers=None):
+    tasks = [(s, announcement_dir, sentiment_dir) for s in symbols]
+    if workers == 1 or len(tasks) <= 1:
+        return list(map(_store_task, tasks))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(_store_task, tasks, chunksize=max(1, len(tasks) // 64)))
+
+
+def rolling(daily, window=DEFAULT_WINDOW, end=None):
+    """
+    Calendar-day series from the first announcement to `end` (default: the
+    last announcement) with count / sum / mean per day and the rolling count
+    and mean over `window` days.
+    """
+    if daily is None or daily.empty:
+        return pd.DataFrame(columns=["count", "sum", "mean", "rolling_count", "rolling_mean"], dtype=float)
+    last = daily.index.max() if end is None else max(daily.index.max(), pd.Timestamp(end))
+    days = pd.date_range(daily.index.min(), last, freq="D")
+    frame = daily[["count", "sum"]].reindex(days, fill_value=0)
+    r_count = frame["count"].rolling(window, min_periods=1).sum()
+    r_sum = frame["sum"].rolling(window, min_periods=1).sum()
+    frame["mean"] = daily["mean"].reindex(days)
+    frame["rolling_count"] = r_count
+    frame["rolling_mean"] = (r_sum / r_count).where(r_count > 0)
+    return frame
+
+
+def align_to(frame, dates):
+    """
+    Put a calendar-day series (from rolling(..., end=dates[-1])) on trading
+    dates: counts/sums of non-trading days roll into the next session,
+    rolling values are taken as of each session.
+    """
+    dates = pd.DatetimeIndex(dates)
+    if frame.empty or not len(dates):
+        return pd.DataFrame(index=dates, columns=["count", "mean", "rolling_count", "rolling_mean"], dtype=float)
+
+    # session i collects announcements dated (dates[i-1], dates[i]]
+    pos = dates.searchsorted(frame.index, side="left")
+    inside = pos < len(dates)
+    buckets = pd.DataFrame(
+        {"count": frame["count"].to_numpy()[inside], "sum": frame["sum"].to_numpy()[inside]},
+        index=pos[inside],
+    ).groupby(level=0).sum()
+    count = buckets["count"].reindex(range(len(dates)), fill_value=0).to_numpy(dtype=float)
+    total = buckets["sum"].reindex(range(len(dates)), fill_value=0).to_numpy(dtype=float)
+
+    asof = frame[["rolling_count", "rolling_mean"]].reindex(dates)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count > 0, total / count, np.nan)
+    return pd.DataFrame({
+        "count": count,
+        "mean": mean,
+        "rolling_count": asof["rolling_count"].fillna(0).to_numpy(),
+        "rolling_mean": asof["rolling_mean"].to_numpy(),
+    }, index=dates)
+
+
+_lock = threading.Lock()
+_sector_cache = {}
+
+
+def sector_daily(symbols, announcement_dir=None, sentiment_dir=None):
+    """
+    Summed daily counts / sums over `symbols`, cached per announcement
+    folder version and symbol set.
+    """
+    announcement_dir = announcement_dir or ANNOUNCEMENT_DIR
+    symbols = tuple(sorted({s.upper() for s in symbols}))
+    version = data_version(announcement_dir) if os.path.isdir(announcement_dir) else ""
+    key = (announcement_dir, version, symbols)
+
+    daily = _sector_cache.get(key)
+    if daily is not None:
+        return daily
+
+    frames = []
+    for s in symbols:
+        d = load_symbol(s, announcement_dir, sentiment_dir)
+        if d is not None and not d.empty:
+            frames.append(d[["count", "sum"]])
+    if frames:
+        daily = pd.concat(frames).groupby(level=0).sum().sort_index()
+        daily["mean"] = daily["sum"] / daily["count"]
+    else:
+        daily = pd.DataFrame(columns=["count", "sum", "mean"])
+
+    with _lock:
+        for k in [k for k in _sector_cache if k[0] == announcement_dir and k[1] != version]:
+            del _sector_cache[k]
+        _sector_cache[key] = daily
+    return daily
@@ -0,0 +1,50 @@
+# stockdata/signals.py
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from stockdata.models import Company, PriceFile, ModelArtifact
+
+# Token that changes on every Company write. It lives in the shared cache,
+# so every worker sees the change and drops its in-process company indexes.
+COMPANY_VERSION_KEY = "companies:version"
+
+
+def company_version():
+    version = cache.get(COMPANY_VERSION_KEY)
+    if version is None:
+        cache.add(COMPANY_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(COMPANY_VERSION_KEY)
+    return version
+
+
+def bump_company_version():
+    cache.set(COMPANY_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def company_changed(sender, instance, **kwargs):
+    from stockdata.directory import refresh
+
+    bump_company_version()
+    # write-through: republish the directory once the change is visible
+    transaction.on_commit(refresh)
+
+
+def fill_registry(sender, using, **kwargs):
+    """
+    post_migrate: fill an empty PriceFile / ModelArtifact registry from disk,
+    so the registry-backed views work right after the first migrate. A
+    registry that has rows is left to `manage.py sync_model_registry`.
+    """
+    from stockdata.registry import sync_registry
+
+    if PriceFile.objects.using(using).exists() or ModelArtifact.objects.using(using).exists():
+        return
+    prices, models = sync_registry()
+    if kwargs.get("verbosity", 1) >= 2:
+        print(f"  Registered {prices} price files and {models} models")
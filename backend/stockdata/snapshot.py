@@ -0,0 +1,266 @@
+# stockdata/snapshot.py
+import io
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from stockdata.panel import load_panel, daily_returns
+from stockdata.correlation import pairwise_moments
+from stockdata.backtest import TRADING_DAYS_PER_YEAR
+
+# calendar look-backs for the return columns
+HORIZONS = {
+    "return_1w": pd.DateOffset(weeks=1),
+    "return_1m": pd.DateOffset(months=1),
+    "return_1y": pd.DateOffset(years=1),
+}
+RISK_WINDOW = TRADING_DAYS_PER_YEAR  # sessions used for volatility / covariance
+
+# cache key of the top_gainers_losers payload (view and post-upload pipeline)
+TOP_MOVERS_KEY = "top_gainers_losers"
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_snapshots = {}
+
+
+def _build(panel):
+    close = panel["Close"]
+    symbols = list(close.columns)
+    if close.empty:
+        return {"as_of": None, "metrics": pd.DataFrame(), "returns": close}
+
+    arr = close.to_numpy(dtype=float)
+    valid = np.isfinite(arr)
+    t = len(arr)
+    cols = np.arange(arr.shape[1])
+
+    # last session each symbol traded, and its previous session's close
+    last_idx = t - 1 - np.argmax(valid[::-1], axis=0)
+    ff = close.ffill().to_numpy(dtype=float)
+    prev_ff = np.vstack([np.full((1, arr.shape[1]), np.nan), ff[:-1]])
+    last = arr[last_idx, cols]
+    prev = prev_ff[last_idx, cols]
+    has_data = valid.any(axis=0)
+    last[~has_data] = np.nan
+
+    dates = close.index
+    as_of = dates[-1]
+    out = {
+        "last_date": pd.Series(dates[last_idx], index=symbols).where(has_data),
+        "close": last,
+        "prev_close": prev,
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["change"] = last - prev
+        out["change_pct"] = (last - prev) / prev * 100
+
+        # close as of N calendar days before the latest market date (forward filled)
+        for name, offset in HORIZONS.items():
+            pos = dates.searchsorted(as_of - offset, side="right") - 1
+            base = ff[pos] if pos >= 0 else np.full(arr.shape[1], np.nan)
+            out[name] = (ff[-1] / base - 1) * 100
+
+    returns = daily_returns(close).iloc[-RISK_WINDOW:]
+    out["volatility"] = returns.std(ddof=1).to_numpy() * np.sqrt(TRADING_DAYS_PER_YEAR) * 100
+
+    metrics = pd.DataFrame(out, index=symbols)
+    return {"as_of": as_of, "metrics": metrics, "returns": returns}
+
+
+def market_snapshot():
+    """
+    Latest price / change / horizon returns / volatility for every symbol,
+    derived from the shared close panel and cached per data version.
+    """
+    panel, version = load_panel(("Close",))
+    snap = _snapshots.get(version)
+    if snap is None:
+        with _lock:
+            snap = _snapshots.get(version)
+            if snap is None:
+                snap = _build(panel)
+                _snapshots.clear()
+                _snapshots[version] = snap
+    return snap
+
+
+def _clean(v, digits=2):
+    if v is None or isinstance(v, float) and not np.isfinite(v):
+        return None
+    if isinstance(v, (float, np.floating)):
+        return round(float(v), digits)
+    return v
+
+
+def portfolio_summary(symbols):
+    """
+    Per-symbol metrics plus an equal-weight portfolio for `symbols`.
+    Portfolio risk is sqrt(w' C w) on the pairwise covariance of daily returns.
+    """
+    snap = market_snapshot()
+    metrics = snap["metrics"]
+    known = [s for s in symbols if s in metrics.index]
+    missing = [s for s in symbols if s not in metrics.index]
+
+    rows = {}
+    for s, r in metrics.loc[known].iterrows():
+        rows[s] = {
+            "last_date": r["last_date"].strftime("%Y-%m-%d") if pd.notna(r["last_date"]) else None,
+            "close": _clean(r["close"]),
+            "prev_close": _clean(r["prev_close"]),
+            "change": _clean(r["change"]),
+            "change_pct": _clean(r["change_pct"]),
+            "return_1w": _clean(r["return_1w"]),
+            "return_1m": _clean(r["return_1m"]),
+            "return_1y": _clean(r["return_1y"]),
+            "volatility": _clean(r["volatility"]),
+        }
+
+    portfolio = {"count": len(known), "missing": missing}
+    if known:
+        sub = metrics.loc[known]
+        for col in ("change_pct", "return_1w", "return_1m", "return_1y"):
+            portfolio[col] = _clean(sub[col].mean())  # equal weight, NaN skipped
+
+        _, cov, _ = pairwise_moments(snap["returns"][known].to_numpy())
+        ok = np.isfinite(np.diag(cov))
+        if ok.any():
+            c = np.nan_to_num(cov[np.ix_(ok, ok)])
+            w = np.full(ok.sum(), 1.0 / ok.sum())
+            var = float(w @ c @ w)
+            portfolio["volatility"] = _clean(np.sqrt(max(var, 0.0) * TRADING_DAYS_PER_YEAR) * 100)
+        else:
+            portfolio["volatility"] = None
+
+    return {
+        "as_of": snap["as_of"].strftime("%Y-%m-%d") if snap["as_of"] is not None else None,
+        "items": rows,
+        "portfolio": portfolio,
+    }
+
+
+EDGE_ROWS = 10        # data lines read from each end of a price file
+EDGE_BLOCK = 4096
+
+
+def _edge_lines(path, rows=EDGE_ROWS):
+    """
+    (header, first `rows` data lines, last `rows` data lines) of a CSV, read
+    from both ends of the file; None when the two ends meet, so the file is
+    small enough to read whole.
+    """
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        head = b""
+        while head.count(b"\n") <= rows and len(head) < size:
+            head += fh.read(EDGE_BLOCK)
+        lines = head.split(b"\n")
+        if len(lines) <= rows + 2:
+            return None
+        head_end = len(b"\n".join(lines[:rows + 1])) + 1
+
+        tail, pos = b"", size
+        while tail.rstrip(b"\r\n").count(b"\n") <= rows and pos > head_end:
+            step = min(EDGE_BLOCK, pos - head_end)
+            pos -= step
+            fh.seek(pos)
+            tail = fh.read(step) + tail
+        tail_lines = tail.rstrip(b"\r\n").split(b"\n")
+        if pos <= head_end and len(tail_lines) <= rows:
+            return None
+
+    decode = lambda b: b.decode("utf-8-sig").rstrip("\r")
+    return decode(lines[0]), [decode(b) for b in lines[1:rows + 1]], [decode(b) for b in tail_lines[-rows:]]
+
+
+def _latest_move(df):
+    """
+    Latest row by Date among rows with a parseable 'Percent Change', with
+    the change against the row before it; None without two such rows.
+    """
+    df['Percent Change'] = (
+        df['Percent Change']
+        .astype(str)
+        .str.replace('%', '', regex=False)
+        .str.replace(' ', '', regex=False)
+    )
+    df['Percent Change'] = pd.to_numeric(df['Percent Change'], errors='coerce')
+    df = df.dropna(subset=['Percent Change'])
+    if len(df) < 2:
+        return None
+
+    df = df.sort_values(by='Date', ascending=False)
+    latest_row = df.iloc[0]
+    previous_row = df.iloc[1]
+    return {
+        'symbol': latest_row['Symbol'],
+        'percent_change': float(latest_row['Percent Change']),
+        'close': float(latest_row['Close']),
+        'change': float(latest_row['Close']) - float(previous_row['Close']),
+    }
+
+
+def _file_move(path):
+    """
+    _latest_move of a price file from the rows at its newest end. Files are
+    date-sorted (newest first as exported, or oldest first); when the two
+    ends do not look sorted, or the newest end has fewer than two usable
+    rows, the whole file is read.
+    """
+    edges = _edge_lines(path)
+    if edges is not None:
+        header, head, tail = edges
+        first = pd.read_csv(io.StringIO("\n".join([header, *head])))
+        last = pd.read_csv(io.StringIO("\n".join([header, *tail])))
+        if 'Symbol' not in first.columns or 'Percent Change' not in first.columns:
+            return None
+        if 'Date' in first.columns:
+            a, b = first['Date'].astype(str), last['Date'].astype(str)
+            if a.is_monotonic_decreasing and b.is_monotonic_decreasing and a.iloc[-1] >= b.iloc[0]:
+                move = _latest_move(first)
+            elif a.is_monotonic_increasing and b.is_monotonic_increasing and a.iloc[-1] <= b.iloc[0]:
+                move = _latest_move(last)
+            else:
+                move = None
+            if move is not None:
+                return move
+
+    df = pd.read_csv(path)
+    if 'Symbol' not in df.columns or 'Percent Change' not in df.columns:
+        return None
+    return _latest_move(df)
+
+
+def top_movers(data_dir, n=5, workers=None):
+    """
+    Top `n` gainers and losers by the latest 'Percent Change' of every
+    price file, as served by the top_gainers_losers view. Files are read
+    from their newest end on a thread pool; a file that cannot be read is
+    logged and left out instead of failing the payload.
+    """
+    files = sorted(f for f in os.listdir(data_dir) if f.endswith(".csv"))
+    paths = [os.path.join(data_dir, f) for f in files]
+    workers = workers or min(len(paths), (os.cpu_count() or 1) * 2) or 1
+
+    def read(path):
+        try:
+            return _file_move(path), None
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="top-movers") as ex:
+        outcomes = list(ex.map(read, paths))
+
+    results = [move for move, _ in outcomes if move is not None]
+    for f, (_, error) in zip(files, outcomes):
+        if error is not None:
+            logger.warning("top_movers: skipped %s (%s)", f, error)
+
+    top_gainers = sorted(results, key=lambda x: x['percent_change'], reverse=True)[:n]
+    top_losers = sorted(results, key=lambda x: x['percent_change'])[:n]
+    return {'top_gainers': top_gainers, 'top_losers': top_losers}
@@ -0,0 +1,251 @@
+# stockdata/storage.py
+"""
+Price storage backends behind one interface, so the read views can run on
+either the CSV files or the DailyBar table:
+
+    store = get_price_store()            # settings.STOCKDATA_PRICE_STORE
+    if store.exists("NABIL"):
+        df = store.read("NABIL", start="2024-01-01")
+
+read() returns the same frame as panel.read_price_frame: one row per date,
+sorted, with Date and float Open/High/Low/Close/Volume/Turnover columns;
+iter_chunks() yields that frame in slices for streaming; symbol_version()
+changes whenever one symbol's bars do.
+
+ingest() loads CSVs into DailyBar: files are parsed in a process pool and
+written with COPY on PostgreSQL or batched executemany elsewhere (SQLite).
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max
+
+from stockdata.models import Company, DailyBar
+from stockdata.signals import bump_company_version
+from stockdata.panel import DATA_DIR, list_symbol_files, data_version, read_price_frame
+
+BAR_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume", "Turnover"]
+_DB_FIELDS = ["date", "open", "high", "low", "close", "volume", "turnover"]
+
+
+def _date_range(df, start, end):
+    if start is not None:
+        df = df[df["Date"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["Date"] <= pd.Timestamp(end)]
+    return df.reset_index(drop=True)
+
+
+class CSVPriceStore:
+    name = "csv"
+
+    def __init__(self, data_dir=None):
+        self.data_dir = str(data_dir or DATA_DIR)
+
+    def path(self, symbol):
+        return os.path.join(self.data_dir, f"{symbol.upper()}.csv")
+
+    def exists(self, symbol):
+        return os.path.exists(self.path(symbol))
+
+    def symbols(self):
+        return sorted(list_symbol_files(self.data_dir))
+
+    def read(self, symbol, start=None, end=None):
+        df = read_price_frame(self.path(symbol))
+        return _date_range(df[BAR_COLUMNS], start, end)
+
+    def iter_chunks(self, symbol, start=None, end=None, chunk_size=5000):
+        # a file has to be read whole to sort it; memory is bounded by one file
+        df = self.read(symbol, start, end)
+        for i in range(0, len(df), chunk_size):
+            yield df.iloc[i:i + chunk_size]
+
+    def version(self):
+        return data_version(self.data_dir)
+
+    def symbol_version(self, symbol):
+        st = os.stat(self.path(symbol))
+        return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+class DBPriceStore:
+    name = "db"
+
+    def _company_id(self, symbol):
+        return Company.objects.filter(symbol=symbol.upper()).values_list("id", flat=True).first()
+
+    def exists(self, symbol):
+        company_id = self._company_id(symbol)
+        return company_id is not None and DailyBar.objects.filter(company_id=company_id).exists()
+
+    def symbols(self):
+        return sorted(DailyBar.objects.values_list("company__symbol", flat=True).distinct())
+
+    def _rows(self, symbol, start, end):
+        qs = DailyBar.objects.filter(company_id=self._company_id(symbol))
+        if start is not None:
+            qs = qs.filter(date__gte=start)
+        if end is not None:
+            qs = qs.filter(date__lte=end)
+        return qs.order_by("date").values_list(*_DB_FIELDS)
+
+    @staticmethod
+    def _frame(rows):
+        df = pd.DataFrame.from_records(rows, columns=BAR_COLUMNS)
+        df["Date"] = pd.to_datetime(df["Date"])
+        for col in BAR_COLUMNS[1:]:
+            df[col] = df[col].astype(float)
+        return df
+
+    def read(self, symbol, start=None, end=None):
+        return self._frame(list(self._rows(symbol, start, end)))
+
+    def iter_chunks(self, symbol, start=None, end=None, chunk_size=5000):
+        # server-side cursor on PostgreSQL: only chunk_size rows in memory
+        rows = []
+        for row in self._rows(symbol, start, end).iterator(chunk_size=chunk_size):
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield self._frame(rows)
+                rows = []
+        if rows:
+            yield self._frame(rows)
+
+    def version(self):
+        agg = DailyBar.objects.aggregate(n=Count("id"), last=Max("id"))
+        return f"db-{agg['n']}-{agg['last']}"
+
+    def symbol_version(self, symbol):
+        # ingest replaces a symbol's rows, so new rows always get higher ids
+        agg = DailyBar.objects.filter(company__symbol=symbol.upper()).aggregate(n=Count("id"), last=Max("id"))
+        return f"db-{agg['n']}-{agg['last']}"
+
+
+STORES = {"csv": CSVPriceStore, "db": DBPriceStore}
+
+
+def get_price_store(name=None):
+    """
+    The configured store, or `name` when it is a known backend.
+    """
+    if name not in STORES:
+        name = getattr(settings, "STOCKDATA_PRICE_STORE", "csv")
+    return STORES[name]()
+
+
+# ---------------------------
+# Ingest
+# ---------------------------
+
+def _parse(args):
+    symbol, path = args
+    try:
+        df = read_price_frame(path)
+    except Exception:
+        return symbol, None
+    return symbol, df[BAR_COLUMNS]
+
+
+def _copy_rows(frames):
+    buf = io.StringIO()
+    for company_id, df in frames:
+        out = pd.DataFrame({"company_id": company_id, "date": df["Date"].dt.strftime("%Y-%m-%d")})
+        for col, field in zip(BAR_COLUMNS[1:], _DB_FIELDS[1:]):
+            out[field] = df[col].to_numpy()
+        # empty unquoted fields are NULL in COPY ... CSV
+        out.to_csv(buf, header=False, index=False, na_rep="")
+    buf.seek(0)
+
+    table = DailyBar._meta.db_table
+    columns = ", ".join(["company_id"] + _DB_FIELDS)
+    sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):  # psycopg2
+            raw.copy_expert(sql, buf)
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buf.getvalue())
+
+
+def _insert_rows(frames, batch_size):
+    # plain executemany rather than bulk_create: building and compiling
+    # model instances was ~80% of the load time on SQLite
+    table = DailyBar._meta.db_table
+    columns = ["company_id"] + _DB_FIELDS
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+    def rows():
+        for company_id, df in frames:
+            values = df[BAR_COLUMNS[1:]].astype(object).where(df[BAR_COLUMNS[1:]].notna(), None)
+            dates = df["Date"].dt.strftime("%Y-%m-%d")
+            for d, row in zip(dates, values.itertuples(index=False, name=None)):
+                yield (company_id, d) + row
+
+    with connection.cursor() as cursor:
+        it = rows()
+        while True:
+            chunk = [r for _, r in zip(range(batch_size), it)]
+            if not chunk:
+                break
+            cursor.executemany(sql, chunk)
+
+
+def _write(frames, batch_size):
+    # replace each symbol's history in one transaction per batch
+    with transaction.atomic():
+        DailyBar.objects.filter(company_id__in=[cid for cid, _ in frames]).delete()
+        if connection.vendor == "postgresql":
+            _copy_rows(frames)
+        else:
+            _insert_rows(frames, batch_size)
+
+
+def ingest(files=None, workers=None, batch_symbols=200, batch_size=2000, create_companies=False):
+    """
+    Load {SYMBOL: csv path} (default: every price file) into DailyBar,
+    replacing what was stored for those symbols.
+    Returns {"symbols", "rows", "skipped": [symbols without a Company or valid rows]}.
+    """
+    files = files if files is not None else list_symbol_files()
+    files = {s.upper(): p for s, p in files.items()}
+    if create_companies:
+        Company.objects.bulk_create([Company(symbol=s) for s in files], ignore_conflicts=True)
+        bump_company_version()  # bulk_create sends no post_save
+    company_ids = dict(Company.objects.filter(symbol__in=list(files)).values_list("symbol", "id"))
+    skipped = sorted(s for s in files if s not in company_ids)
+
+    tasks = [(s, files[s]) for s in sorted(files) if s in company_ids]
+    loaded = rows = 0
+    batch = []
+
+    def flush():
+        nonlocal loaded, rows
+        if batch:
+            _write(batch, batch_size)
+            loaded += len(batch)
+            rows += sum(len(df) for _, df in batch)
+            batch.clear()
+
+    def consume(results):
+        for symbol, df in results:
+            if df is None or df.empty:
+                skipped.append(symbol)
+                continue
+            batch.append((company_ids[symbol], df))
+            if len(batch) >= batch_symbols:
+                flush()
+
+    if workers == 1 or len(tasks) <= 1:
+        consume(map(_parse, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            consume(ex.map(_parse, tasks, chunksize=max(1, len(tasks) // 64)))
+    flush()
+
+    return {"symbols": loaded, "rows": rows, "skipped": sorted(skipped)}
@@ -0,0 +1,338 @@
+import json
+import time
+import threading
+import tracemalloc
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db.models.query import QuerySet
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from stockdata import dashboard, directory, pipeline
+from stockdata.autocomplete import CompanyIndex
+from stockdata.breadth import Breadth, COUNTS
+from stockdata.correlation import pairwise_moments
+from stockdata.models import Company, PipelineRun, PipelineTask
+from stockdata.storage import get_price_store
+from stockdata.views import _export_chunks
+
+
+class BreadthPayloadTests(SimpleTestCase):
+    def setUp(self):
+        dates = np.array(["2024-01-01", "2024-01-02", "2024-01-08"], dtype="datetime64[D]")
+        counts = {name: np.array([1, 2, 3], dtype=np.int64) for name in COUNTS}
+        turnover = np.array([[1.0, 3.0], [2.0, 2.0], [0.0, 0.0]])
+        self.breadth = Breadth("v", dates, counts, ["A", "B"], turnover)
+
+    def test_empty_range(self):
+        for start, end in (("2030-01-01", None), (None, "2000-01-01"), ("2024-01-03", "2024-01-02")):
+            for interval in ("day", "week", "month"):
+                body, _ = self.breadth.payload(start, end, interval)
+                data = json.loads(body)
+                self.assertEqual(data["dates"], [])
+                self.assertEqual(data["advancers"], [])
+                self.assertEqual(data["turnover_share"], {"A": [], "B": []})
+
+    def test_week_sums(self):
+        data = json.loads(self.breadth.payload(None, None, "week")[0])
+        self.assertEqual(data["dates"], ["2024-01-02", "2024-01-08"])
+        self.assertEqual(data["advancers"], [3, 3])
+        self.assertEqual(data["turnover_share"]["A"], [37.5, None])
+
+
+class PairwiseMomentsTests(SimpleTestCase):
+    def test_matches_pandas_pairwise_complete(self):
+        rng = np.random.default_rng(7)
+        x = rng.normal(0, 0.02, size=(300, 8))
+        x[:, 1] += x[:, 0]                              # correlated pair
+        x[rng.random(x.shape) < 0.3] = np.nan           # days a symbol did not trade
+        x[:260, 6] = np.nan                             # listed late: too few days
+        x[:, 7] = np.where(np.isnan(x[:, 7]), np.nan, 0.01)  # constant
+        frame = pd.DataFrame(x)
+        min_periods = 60
+
+        corr, cov, n = pairwise_moments(x)
+        low = n < min_periods
+        corr[low] = np.nan
+        cov[low] = np.nan
+
+        np.testing.assert_allclose(corr, frame.corr(min_periods=min_periods).to_numpy(), atol=1e-12)
+        np.testing.assert_allclose(cov, frame.cov(min_periods=min_periods).to_numpy(), rtol=1e-9, atol=1e-15)
+        self.assertTrue(np.isnan(corr[6]).all())
+
+
+class _FailingStore:
+    """Two good chunks for "OK", one chunk then an error for "BAD"."""
+
+    def iter_chunks(self, symbol, start=None, end=None):
+        chunk = pd.DataFrame({
+            "Date": pd.to_datetime(["2024-01-01"]), "Open": [1.0], "High": [1.0], "Low": [1.0],
+            "Close": [1.0], "Volume": [1.0], "Turnover": [1.0],
+        })
+        yield chunk
+        if symbol == "BAD":
+            raise ValueError("broken file")
+        yield chunk
+
+
+@override_settings(STOCKDATA_PRICE_STORE="csv")
+class ExportTests(SimpleTestCase):
+    def test_failed_symbol_is_reported(self):
+        with self.assertLogs("stockdata.views", "ERROR"):
+            lines = b"".join(_export_chunks(_FailingStore(), ["BAD", "OK"], None, None, "ndjson")).splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([r["symbol"] for r in records], ["BAD", "BAD", "OK", "OK"])
+        self.assertIn("error", records[1])
+
+        with self.assertLogs("stockdata.views", "ERROR"):
+            text = b"".join(_export_chunks(_FailingStore(), ["BAD", "OK"], None, None, "csv")).decode()
+        self.assertIn("# error: BAD:", text.splitlines()[2])
+
+    def _peak(self, symbols):
+        tracemalloc.start()
+        try:
+            response = Client().get(reverse("export_history"), {"symbols": ",".join(symbols)})
+            self.assertEqual(response.status_code, 200)
+            rows = sum(block.count(b"\n") for block in response.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return rows, peak
+
+    def test_peak_memory_is_flat_in_symbol_count(self):
+        symbols = get_price_store().symbols()
+        if len(symbols) < 20:
+            self.skipTest("needs at least 20 price files")
+        few, few_peak = self._peak(symbols[:5])
+        every, every_peak = self._peak(symbols)
+        self.assertGreater(every, few * 3)
+        # one symbol's chunk at a time: exporting every symbol may cost a
+        # larger file more, but not memory in proportion to the symbol count
+        self.assertLess(every_peak, few_peak * 2 + 4 * 1024 * 1024, (few_peak, every_peak))
+
+    def test_store_comes_from_settings_only(self):
+        symbols = get_price_store().symbols()
+        if not symbols:
+            self.skipTest("needs a price file")
+        url = reverse("price_history", args=[symbols[0]])
+        # the DailyBar table is empty here; ?store=db must not switch to it
+        self.assertEqual(Client().get(url, {"store": "db"}).status_code, 200)
+
+
+class PipelineTests(TestCase):
+    """
+    A small stage graph: "fetch" per symbol, "derive" after the same symbol's
+    fetch, "summary" once after every fetch. Stage functions record their calls.
+    """
+
+    def setUp(self):
+        self.calls = []
+        stages = {
+            "fetch": pipeline.Stage((), True, self._stage("fetch")),
+            "derive": pipeline.Stage(("fetch",), True, self._stage("derive")),
+            "summary": pipeline.Stage(("fetch",), False, self._stage("summary")),
+        }
+        patcher = mock.patch.dict(pipeline.STAGES, stages, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _stage(self, name):
+        def run(symbol):
+            self.calls.append((name, symbol))
+            if symbol == "BAD":
+                raise ValueError("broken file")
+        return run
+
+    def _statuses(self, run):
+        return {(t.stage, t.symbol): t.status for t in run.tasks.all()}
+
+    def test_failed_upstream_skips_dependents(self):
+        run = pipeline.execute(pipeline.enqueue(["ok", "bad"]), workers=2)
+        statuses = self._statuses(run)
+        self.assertEqual(statuses[("fetch", "BAD")], PipelineTask.FAILED)
+        self.assertEqual(statuses[("derive", "BAD")], PipelineTask.SKIPPED)
+        self.assertEqual(statuses[("derive", "OK")], PipelineTask.DONE)
+        # a whole-run stage still runs after some symbols failed
+        self.assertEqual(statuses[("summary", "")], PipelineTask.DONE)
+        self.assertNotIn(("derive", "BAD"), self.calls)
+        self.assertEqual(run.status, PipelineRun.FAILED)
+        self.assertEqual(run.error, "fetch[BAD]")
+
+    def test_task_gives_up_after_max_attempts(self):
+        run = pipeline.enqueue(["OK"])
+        run.tasks.filter(stage="fetch").update(attempts=pipeline.MAX_ATTEMPTS)
+        run = pipeline.execute(run)
+        task = run.tasks.get(stage="fetch")
+        self.assertEqual(task.status, PipelineTask.FAILED)
+        self.assertIn("gave up", task.error)
+        self.assertEqual(self._statuses(run)[("derive", "OK")], PipelineTask.SKIPPED)
+        self.assertNotIn(("fetch", "OK"), self.calls)
+
+    def test_stale_run_resumes_unfinished_tasks(self):
+        run = pipeline.enqueue(["OK"])
+        stale = timezone.now() - timezone.timedelta(seconds=pipeline.STALE_AFTER + 1)
+        PipelineRun.objects.filter(pk=run.pk).update(status=PipelineRun.RUNNING, heartbeat_at=stale)
+        run.tasks.filter(stage="fetch").update(status=PipelineTask.DONE, attempts=1)
+        run.tasks.filter(stage="derive").update(status=PipelineTask.RUNNING, attempts=1)
+
+        self.assertEqual(pipeline.recover(), 1)
+        claimed = pipeline.claim_next()
+        self.assertEqual(claimed.pk, run.pk)
+        run = pipeline.execute(claimed)
+
+        self.assertEqual(run.status, PipelineRun.DONE)
+        self.assertEqual(sorted(self.calls), [("derive", "OK"), ("summary", "")])
+        self.assertEqual(run.tasks.get(stage="derive").attempts, 2)
+
+    def test_live_run_is_not_recovered(self):
+        run = pipeline.enqueue(["OK"])
+        PipelineRun.objects.filter(pk=run.pk).update(status=PipelineRun.RUNNING, heartbeat_at=timezone.now())
+        self.assertEqual(pipeline.recover(), 0)
+        self.assertIsNone(pipeline.claim_next())
+
+    def test_heartbeat_while_a_task_runs(self):
+        beats = []
+        update = QuerySet.update
+
+        def record(qs, **kwargs):
+            if set(kwargs) == {"heartbeat_at"}:
+                beats.append(kwargs["heartbeat_at"])
+            return update(qs, **kwargs)
+
+        slow = pipeline.Stage((), True, lambda symbol: time.sleep(0.3))
+        with mock.patch.dict(pipeline.STAGES, {"fetch": slow}, clear=True):
+            run = pipeline.enqueue(["OK"])
+            with mock.patch.object(pipeline, "HEARTBEAT_EVERY", 0.05), \
+                    mock.patch.object(QuerySet, "update", autospec=True, side_effect=record):
+                pipeline.execute(run)
+        # one beat per wait() pass while the task sleeps, not only when it ends
+        self.assertGreater(len(beats), 2)
+
+
+class AutocompleteTests(SimpleTestCase):
+    def setUp(self):
+        companies = [
+            {"symbol": symbol, "full_name": name, "sector": "", "logo": ""}
+            for symbol, name in (
+                ("NABIL", "Nabil Bank Limited"),
+                ("NABBC", "Narayani Development Bank"),
+                ("NHPC", "Nabha Hydro Power"),
+                ("SBL", "Siddhartha Bank Limited"),
+                ("NICA", "NIC Asia Bank"),
+                ("STC", "Sonic Traders"),
+            )
+        ]
+        self.index = CompanyIndex(companies, {"NABBC": 5, "NABIL": 2, "SBL": 1})
+
+    def symbols(self, query, limit=10):
+        return [r["symbol"] for r in self.index.search(query, limit)]
+
+    def test_exact_symbol_then_symbol_prefix_then_name_prefix(self):
+        self.assertEqual(self.symbols("nabil"), ["NABIL"])
+        # symbol prefixes by watchers (NABBC 5, NABIL 2), then the name hit
+        self.assertEqual(self.symbols("nab"), ["NABBC", "NABIL", "NHPC"])
+        self.assertEqual(self.symbols("nab", limit=1), ["NABBC"])
+
+    def test_substrings_only_come_in_as_fuzzy_fallback(self):
+        # "nic" is a prefix of NICA / "NIC", so "Sonic" is not considered
+        self.assertEqual(self.symbols("nic"), ["NICA"])
+        # no key starts with "ydro": the one-letter-off "hydro" is a fuzzy hit
+        results = self.index.search("ydro")
+        self.assertEqual([(r["symbol"], r["fuzzy"]) for r in results], [("NHPC", True)])
+        self.assertEqual([(r["symbol"], r["fuzzy"]) for r in self.index.search("hydro")], [("NHPC", False)])
+
+    def test_every_word_has_to_match(self):
+        self.assertEqual(self.symbols("bank lim"), ["NABIL", "SBL"])
+        self.assertEqual(self.symbols("nic bank"), ["NICA"])
+        self.assertEqual(self.symbols("hydro bank"), [])
+
+    def test_case_is_folded(self):
+        for query in ("NaBiL", "NABIL", "  nabil "):
+            self.assertEqual(self.symbols(query), ["NABIL"])
+        self.assertEqual(self.symbols("SIDDHARTHA"), self.symbols("siddhartha"))
+
+    def test_one_typo_is_a_fuzzy_hit(self):
+        results = self.index.search("nabli")
+        self.assertEqual([r["symbol"] for r in results], ["NABIL"])
+        self.assertTrue(results[0]["fuzzy"])
+        self.assertFalse(self.index.search("nabil")[0]["fuzzy"])
+
+
+class DirectoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            Company.objects.create(symbol="NABIL", full_name="Nabil Bank Limited", sector="Commercial Banks")
+        self.client = Client()
+
+    def test_unchanged_list_is_a_304(self):
+        first = self.client.get(reverse("list_companies"))
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([c["symbol"] for c in first.json()], ["NABIL"])
+        again = self.client.get(reverse("list_companies"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+    def test_company_info_etag(self):
+        url = reverse("company_info", args=["nabil"])
+        first = self.client.get(url)
+        self.assertEqual(first.json()["full_name"], "Nabil Bank Limited")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+        self.assertEqual(self.client.get(reverse("company_info", args=["NOPE"])).status_code, 404)
+
+    def test_company_write_invalidates(self):
+        url = reverse("company_info", args=["NABIL"])
+        etag = self.client.get(url)["ETag"]
+        list_etag = self.client.get(reverse("list_companies"))["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            company = Company.objects.get(symbol="NABIL")
+            company.full_name = "Nabil Bank"
+            company.save()
+            Company.objects.create(symbol="SBL", full_name="Siddhartha Bank Limited")
+
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()["full_name"], "Nabil Bank")
+        listing = self.client.get(reverse("list_companies"), HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(listing.status_code, 200)
+        self.assertEqual([c["symbol"] for c in listing.json()], ["NABIL", "SBL"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Company.objects.get(symbol="SBL").delete()
+        self.assertEqual(self.client.get(reverse("company_info", args=["SBL"])).status_code, 404)
+
+    def test_other_workers_see_the_change_without_a_query(self):
+        self.client.get(reverse("list_companies"))
+        with self.captureOnCommitCallbacks(execute=True):
+            Company.objects.create(symbol="SBL", full_name="Siddhartha Bank Limited")
+        # a worker that still holds the old snapshot picks up the shared one
+        directory._state["directory"] = None
+        with self.assertNumQueries(0):
+            listing = directory.get_directory()
+        self.assertIn("SBL", listing.records)
+
+
+class DashboardComposeTests(SimpleTestCase):
+    def test_pending_part_is_built_once(self):
+        calls = []
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return b"1", '"one"'
+
+        try:
+            for _ in range(5):
+                body, _ = dashboard.compose({"slow": (slow, ())}, timeout=0.01)
+                self.assertEqual(json.loads(body)["pending"], ["slow"])
+            self.assertEqual(len(calls), 1)
+        finally:
+            release.set()
+        body, _ = dashboard.compose({"slow": (slow, ())}, timeout=5)
+        self.assertEqual(json.loads(body)["slow"], 1)
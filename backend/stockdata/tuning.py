@@ -0,0 +1,319 @@
+# stockdata/tuning.py
+"""
+Hyperparameter search for the lstm.ipynb architecture, per symbol.
+
+- Trial 0 is the notebook's configuration; later trials are drawn from
+  SPACE with a generator seeded by (seed, trial), so a resumed search
+  proposes the same trials again.
+- Trials run in a process pool; each process caps its CPU threads
+  (forecast.limit_threads) so `workers * threads` stays within the machine.
+- Preprocessing runs once: the scaled feature matrix and the train / val
+  sequence arrays of every sequence length are saved as .npy files under
+  outputs/<SYMBOL>/tuning/<data hash>/ and memory-mapped by the trials.
+- Median pruning: from WARMUP_EPOCHS on, a trial stops when its best
+  val_loss so far is worse than the median best-so-far of the finished
+  trials at the same epoch (once MIN_PRUNE_TRIALS of them got that far).
+- Every finished trial is appended to outputs/<SYMBOL>/<SYMBOL>_tuning.jsonl;
+  a search started again on the same data skips the trials recorded there.
+  The best configuration is written to <SYMBOL>_tuning_best.json.
+
+The test split (last TEST_PCT of rows) is never used by the search.
+"""
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from stockdata import forecast
+from stockdata.registry import OUTPUT_DIR, file_hash
+
+TEST_PCT = 0.10
+VAL_WITHIN_TRAIN_PCT = 0.10
+
+WARMUP_EPOCHS = 5
+MIN_PRUNE_TRIALS = 3
+
+COMPLETE, PRUNED, FAILED = "complete", "pruned", "failed"
+
+# the notebook's hard-coded configuration
+DEFAULT_PARAMS = {
+    "seq_len": 60,
+    "units1": 84,
+    "units2": 42,
+    "dropout": 0.3,
+    "recurrent_dropout": 0.2,
+    "l2": 0.001,
+    "learning_rate": 0.001,
+}
+
+SPACE = {
+    "seq_len": ("choice", [30, 45, 60, 90]),
+    "units1": ("choice", [32, 64, 84, 128]),
+    "units2": ("choice", [16, 32, 42, 64]),
+    "dropout": ("uniform", 0.1, 0.4),
+    "recurrent_dropout": ("uniform", 0.0, 0.3),
+    "l2": ("loguniform", 1e-4, 1e-2),
+    "learning_rate": ("loguniform", 3e-4, 3e-3),
+}
+
+
+def sample_params(trial, seed=42):
+    if trial == 0:
+        return dict(DEFAULT_PARAMS)
+    rng = np.random.default_rng([seed, trial])
+    params = {}
+    for name, (kind, *args) in SPACE.items():
+        if kind == "choice":
+            params[name] = args[0][int(rng.integers(len(args[0])))]
+        elif kind == "uniform":
+            params[name] = round(float(rng.uniform(*args)), 4)
+        else:
+            params[name] = float(f"{np.exp(rng.uniform(np.log(args[0]), np.log(args[1]))):.3g}")
+    return params
+
+
+# ---------------------------
+# Prepared arrays
+# ---------------------------
+
+def _fit_scaler(train_rows):
+    from sklearn.preprocessing import RobustScaler
+    return RobustScaler().fit(train_rows)
+
+
+def _save(path, arr):
+    tmp = f"{path}.tmp.npy"
+    np.save(tmp, arr)
+    os.replace(tmp, path)
+
+
+def prepare(symbol, data_path, seq_lens, cache_dir):
+    """
+    Write the scaled features and the train / val sequences for each of
+    `seq_lens` to `cache_dir`, skipping what is already there. Splits and
+    scaling follow the notebook (scaler fit on the train rows only).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    meta = None
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+    missing = [L for L in seq_lens if meta is None or L not in meta["seq_lens"]]
+    if not missing:
+        return meta
+
+    if meta is None:
+        df = forecast.training_features(symbol, data_path)
+        df = df[forecast.FEATURES + ["Date"]].dropna().reset_index(drop=True)
+        n = len(df)
+        test_start = int(n * (1 - TEST_PCT))
+        train_end = int(test_start * (1 - VAL_WITHIN_TRAIN_PCT))
+        raw = df[forecast.FEATURES].to_numpy(dtype=np.float32)
+        scaled = _fit_scaler(raw[:train_end]).transform(raw).astype(np.float32)
+        _save(os.path.join(cache_dir, "scaled.npy"), scaled)
+        meta = {"n": n, "train_end": train_end, "test_start": test_start,
+                "features": forecast.FEATURES, "seq_lens": []}
+    else:
+        scaled = np.load(os.path.join(cache_dir, "scaled.npy"))
+
+    close_idx = meta["features"].index("Close")
+    n, train_end, test_start = meta["n"], meta["train_end"], meta["test_start"]
+    for L in missing:
+        if train_end <= L:
+            raise ValueError(f"Not enough rows for seq_len {L}")
+        # window k holds rows k..k+L-1 and predicts row k+L
+        X = sliding_window_view(scaled, L, axis=0)[:n - L].transpose(0, 2, 1)
+        target = np.arange(L, n)
+        y = scaled[L:, close_idx]
+        for split, mask in (("train", target < train_end),
+                            ("val", (target >= train_end) & (target < test_start))):
+            _save(os.path.join(cache_dir, f"seq{L}_X_{split}.npy"), np.ascontiguousarray(X[mask]))
+            _save(os.path.join(cache_dir, f"seq{L}_y_{split}.npy"), np.ascontiguousarray(y[mask]))
+        meta["seq_lens"] = sorted(set(meta["seq_lens"]) | {L})
+
+    tmp = f"{meta_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, meta_path)
+    return meta
+
+
+# ---------------------------
+# Trials (run in the pool processes)
+# ---------------------------
+
+def should_prune(best_so_far, epoch, curves):
+    """
+    Median rule: `best_so_far` is this trial's lowest val_loss up to `epoch`
+    (0-based); `curves` are val_loss lists of finished trials.
+    """
+    if epoch + 1 < WARMUP_EPOCHS:
+        return False
+    others = [min(c[:epoch + 1]) for c in curves if len(c) > epoch]
+    if len(others) < MIN_PRUNE_TRIALS:
+        return False
+    return best_so_far > float(np.median(others))
+
+
+def build_model(params, n_features):
+    import tensorflow as tf
+    from tensorflow.keras import regularizers
+    from tensorflow.keras.layers import LSTM, Dense, Dropout
+
+    ScratchLSTM = forecast.custom_objects()["ScratchLSTM"]
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(params["seq_len"], n_features)),
+        ScratchLSTM(params["units1"], return_sequences=True, recurrent_dropout=params["recurrent_dropout"],
+                    kernel_regularizer=regularizers.l2(params["l2"])),
+        Dropout(params["dropout"]),
+        LSTM(params["units2"], recurrent_dropout=params["recurrent_dropout"],
+             kernel_regularizer=regularizers.l2(params["l2"])),
+        Dropout(params["dropout"]),
+        Dense(1),
+    ])
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=params["learning_rate"], clipnorm=1.0),
+                  loss="mse")
+    return model
+
+
+def _run_trial(args):
+    trial, params, cache_dir, max_epochs, batch_size, curves, seed = args
+    start = time.perf_counter()
+    record = {"trial": trial, "params": params, "state": FAILED, "curve": [], "error": ""}
+    try:
+        import tensorflow as tf
+
+        tf.keras.utils.set_random_seed(seed + trial)
+        L = params["seq_len"]
+
+        def load(name):
+            return np.load(os.path.join(cache_dir, f"seq{L}_{name}.npy"), mmap_mode="r")
+
+        X_train, y_train, X_val, y_val = load("X_train"), load("y_train"), load("X_val"), load("y_val")
+        curve = record["curve"]
+
+        class Pruning(tf.keras.callbacks.Callback):
+            pruned = False
+
+            def on_epoch_end(self, epoch, logs=None):
+                curve.append(float(logs["val_loss"]))
+                if should_prune(min(curve), epoch, curves):
+                    self.pruned = True
+                    self.model.stop_training = True
+
+        pruning = Pruning()
+        model = build_model(params, X_train.shape[2])
+        model.fit(
+            X_train, y_train, validation_data=(X_val, y_val),
+            epochs=max_epochs, batch_size=batch_size, shuffle=False, verbose=0,
+            callbacks=[
+                pruning,
+                tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=15, restore_best_weights=True),
+                tf.keras.callbacks.ReduceLROnPlateau(monitor="val_loss", factor=0.5, patience=7, min_lr=1e-7),
+            ],
+        )
+        record["state"] = PRUNED if pruning.pruned else COMPLETE
+    except Exception as exc:
+        record["error"] = f"{type(exc).__name__}: {exc}"
+
+    if record["curve"]:
+        record["best_val_loss"] = min(record["curve"])
+        record["best_epoch"] = int(np.argmin(record["curve"]))
+    record["epochs"] = len(record["curve"])
+    record["seconds"] = round(time.perf_counter() - start, 2)
+    return record
+
+
+# ---------------------------
+# Search
+# ---------------------------
+
+def history_path(symbol, output_dir=None):
+    return os.path.join(output_dir or OUTPUT_DIR, symbol.upper(), f"{symbol.upper()}_tuning.jsonl")
+
+
+def read_history(path):
+    records = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # torn last line of an interrupted search
+    return records
+
+
+def best_trial(history):
+    complete = [r for r in history if r["state"] == COMPLETE and r.get("best_val_loss") is not None]
+    return min(complete, key=lambda r: r["best_val_loss"]) if complete else None
+
+
+def search(symbol, data_path, n_trials=30, workers=None, threads=1, max_epochs=60, batch_size=32,
+           seed=42, output_dir=None, on_trial=None):
+    """
+    Run (or resume) the search for `symbol`. `on_trial(record)` is called
+    as trials finish. Returns (history, best record or None).
+    """
+    symbol = symbol.upper()
+    folder = os.path.join(output_dir or OUTPUT_DIR, symbol)
+    path = history_path(symbol, output_dir)
+    data_hash = file_hash(data_path)
+
+    # trials recorded for other data are not comparable
+    history = [r for r in read_history(path) if r.get("data_hash") == data_hash]
+    recorded = {r["trial"] for r in history}
+    todo = [i for i in range(n_trials) if i not in recorded]
+    params = {i: sample_params(i, seed) for i in todo}
+
+    if todo:
+        cache_dir = os.path.join(folder, "tuning", data_hash[:16])
+        prepare(symbol, data_path, sorted({p["seq_len"] for p in params.values()}), cache_dir)
+        curves = [r["curve"] for r in history if r["state"] in (COMPLETE, PRUNED)]
+        workers = workers or max(1, (os.cpu_count() or 1) // max(1, threads))
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=forecast.limit_threads, initargs=(threads,)) as ex:
+            queue = iter(todo)
+            running = {}
+
+            def submit_next():
+                trial = next(queue, None)
+                if trial is not None:
+                    args = (trial, params[trial], cache_dir, max_epochs, batch_size, list(curves), seed)
+                    running[ex.submit(_run_trial, args)] = trial
+
+            for _ in range(workers):
+                submit_next()
+            with open(path, "a+", encoding="utf-8") as fh:
+                # terminate a torn last line so the next record starts clean
+                size = fh.tell()
+                if size:
+                    fh.seek(size - 1)
+                    if fh.read(1) != "\n":
+                        fh.write("\n")
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        running.pop(future)
+                        record = future.result()
+                        record["data_hash"] = data_hash
+                        fh.write(json.dumps(record) + "\n")
+                        fh.flush()
+                        history.append(record)
+                        if record["state"] in (COMPLETE, PRUNED):
+                            curves.append(record["curve"])
+                        if on_trial:
+                            on_trial(record)
+                        submit_next()
+
+    best = best_trial(history)
+    if best is not None:
+        tmp = os.path.join(folder, f"{symbol}_tuning_best.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"symbol": symbol, "data_hash": data_hash, **best}, fh, indent=2)
+        os.replace(tmp, os.path.join(folder, f"{symbol}_tuning_best.json"))
+    return history, best
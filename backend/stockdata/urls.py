@@ -15,23 +15,41 @@ urlpatterns = [
 
     # Company routes
     path("api/companies/", views.list_companies, name="list_companies"),
+    path("api/companies/search/", views.company_search, name="company_search"),
     path("api/info/<str:symbol>/", views.company_info, name="company_info"),
     path("api/history/<str:symbol>/", views.price_history, name="price_history"),
+    path("api/export/", views.export_history, name="export_history"),
+    path("api/announcement/search/", views.announcement_search, name="announcement_search"),
     path("api/announcement/<str:symbol>/", views.announcement, name="announcement"),
     path("api/prediction/<str:symbol>/", views.stock_prediction , name="prediction_info"),
+    path("api/forecast/<str:symbol>/", views.live_forecast, name="live_forecast"),
 
     # Nepse & top gainers/losers
     path('api/nepse/', views.nepse_data, name='nepse_data'),
+    path('api/nepse/breadth/', views.nepse_breadth, name='nepse_breadth'),
+    path('api/sectors/', views.sector_list, name='sector_list'),
+    path('api/sectors/<str:slug>/', views.sector_index, name='sector_index'),
     path('api/company/top/', views.top_gainers_losers, name='top_gainers_losers'),
+    path('api/dashboard/', views.dashboard, name='dashboard'),
+
+    # Analytics
+    path('api/correlation/', views.return_correlation, name='return_correlation'),
+    path('api/correlation/sectors/', views.sector_heatmap, name='sector_heatmap'),
+    path('api/backtest/<str:symbol>/', views.backtest, name='backtest'),
+    path('api/sentiment/', views.sector_sentiment, name='sector_sentiment'),
+    path('api/sentiment/<str:symbol>/', views.sentiment_series, name='sentiment_series'),
 
     # File upload
     path("api/upload-stock-files/", views.upload_stock_files, name="upload-stock-files"),
+    path("api/admin/pipeline/", views.pipeline_status, name="pipeline_status"),
+    path("api/admin/models/", views.model_pool_stats, name="model_pool_stats"),
+    path("api/admin/drift/", views.drift_status, name="drift_status"),
 
     # Generic stock route (must be last)
     path("api/<str:symbol>/", views.stock_data, name="stock_data"),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-urlpatterns += static('/outputs/', document_root=settings.BASE_DIR / 'stockdata' / 'outputs')
+urlpatterns += static('/outputs/', document_root=settings.STOCKDATA_OUTPUT_DIR)
 
 
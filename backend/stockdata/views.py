@@ -1,49 +1,64 @@
 # views.py
 import os,joblib, base64
+import logging
+import hashlib
 import numbers
 import numpy as np
 import pandas as pd
 import json
-from django.http import JsonResponse, Http404
+import datetime
+from django.http import JsonResponse, Http404, StreamingHttpResponse, HttpResponse, HttpResponseNotModified
 import math
 from django.core.cache import cache
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
-from stockdata.models import Company 
+from stockdata.models import Company, PriceFile, ModelArtifact, PipelineRun
+from django.db.models.functions import Coalesce, Upper
 from users.models import User
 from rest_framework.decorators import api_view, permission_classes,authentication_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from users.authentication import CustomJWTAuthentication
 from django.views.decorators.http import require_http_methods
+from backend.instrumentation import span
+from stockdata.indicators import indicator_frame, feature_frame
+from stockdata.panel import read_price_frame, list_symbol_files
+from stockdata.registry import register_price_file, output_path
+from stockdata.search import get_index
+from stockdata.autocomplete import autocomplete
+from stockdata.directory import get_directory
+from stockdata.storage import get_price_store
+from stockdata import pipeline, forecast
+from stockdata.modelpool import ModelNotFound, get_pool as get_model_pool
+from stockdata.drift import log_forecast, drift_summary
+from stockdata.nepse import INTERVALS as NEPSE_INTERVALS, get_series as get_nepse_series
+from stockdata.breadth import get_breadth
+from stockdata.sectors import METHODS as SECTOR_METHODS, read_manifest as sector_manifest, sector_path
+from stockdata.sentiment import (
+    ANNOUNCEMENT_DIR, DEFAULT_WINDOW as SENTIMENT_WINDOW, load_symbol as load_sentiment,
+    rolling as sentiment_rolling, align_to as align_sentiment, sector_daily as sector_sentiment_daily,
+)
+from stockdata.backtest import STRATEGIES, run_backtest, param_error as backtest_param_error
+from stockdata.snapshot import TOP_MOVERS_KEY, top_movers
+from stockdata import dashboard as dashboard_parts
+from watchlist.models import WatchlistItem
+from stockdata.correlation import (
+    correlation_matrix, sector_correlation, matrix_to_list, DEFAULT_WINDOW, DEFAULT_MIN_PERIODS,
+)
+
+logger = logging.getLogger(__name__)
 
 CACHE_TIMEOUT = 3600 
 DEBUG = False
 
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
-COMPANIES_FILE = os.path.join(os.path.dirname(__file__), "data", "company_info.json")
-OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "outputs")
-DATA_FOLDER = os.path.join(settings.BASE_DIR, 'stockdata', 'data')
+DATA_DIR = str(getattr(settings, "STOCKDATA_DATA_DIR", os.path.join(os.path.dirname(__file__), "data")))
+COMPANIES_FILE = os.path.join(DATA_DIR, "company_info.json")
+OUTPUT_DIR = str(getattr(settings, "STOCKDATA_OUTPUT_DIR", os.path.join(os.path.dirname(__file__), "outputs")))
+DATA_FOLDER = DATA_DIR
 
 
 
-def _to_safe_float_series(series):
-    """
-    Remove commas, coerce to numeric. Returns a pandas Series of floats with NaN for invalid entries.
-    """
-    return pd.to_numeric(series.astype(str).str.replace(",", "", regex=False), errors="coerce")
-
-def _finite_ohlc_mask(df, cols):
-    """
-    Return boolean mask where all given cols are finite numbers (not NaN/Inf).
-    """
-    mask = pd.Series(True, index=df.index)
-    for c in cols:
-        # ensure numeric dtype first (should already be numeric after _to_safe_float_series)
-        mask &= df[c].notna() & np.isfinite(df[c].astype(float))
-    return mask
-
 def _py_safe(v):
     # None
     if v is None:
@@ -85,67 +100,26 @@ def _py_safe(v):
 def stock_data(request, symbol):
    
     symbol = symbol.upper()
-    file_path = os.path.join(DATA_DIR, f"{symbol}.csv")
+    store = get_price_store()
 
-    if not os.path.exists(file_path):
+    if not store.exists(symbol):
         raise Http404(f"Data for {symbol} not found")
 
-    # Read CSV
-    df = pd.read_csv(file_path)
-
-    for col in ["Open", "High", "Low", "Close", "Volume", "Turnover"]:
-        if col in df.columns:
-            df[col] = _to_safe_float_series(df[col])
-        else:
-            df[col] = np.nan
-
-    # Parse Date safely
-    if "Date" in df.columns:
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    else:
-        df["Date"] = pd.NaT
-
-    df = df[df["Date"].notna()].copy()
-
-    ohlc_cols = ["Open", "High", "Low", "Close"]
-    df = df[_finite_ohlc_mask(df, ohlc_cols)].copy()
-
-  
-    df = df.sort_values("Date").reset_index(drop=True)
+    # Cleaned, date-sorted bars from the CSV file or the DailyBar table,
+    # with indicators; cached until the symbol's data changes
+    with span(f"indicators_{store.name}"):
+        df = indicator_frame(store, symbol)
 
     if df.shape[0] == 0:
         raise Http404(f"No valid OHLC rows for {symbol} after cleaning")
+    return _chart_response(request, symbol, df)
 
-    df["SMA20"] = df["Close"].rolling(window=20, min_periods=20).mean()
-    df["SMA50"] = df["Close"].rolling(window=50, min_periods=50).mean()
-    df["EMA20"] = df["Close"].ewm(span=20, adjust=False).mean()
-
-    df["BB_Mid"] = df["Close"].rolling(window=20, min_periods=20).mean()
-    df["BB_Upper"] = df["BB_Mid"] + 2 * df["Close"].rolling(window=20, min_periods=20).std()
-    df["BB_Lower"] = df["BB_Mid"] - 2 * df["Close"].rolling(window=20, min_periods=20).std()
-
-    delta = df["Close"].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14, min_periods=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14, min_periods=14).mean()
-    rs = gain / loss
-    df["RSI14"] = 100 - (100 / (1 + rs))
-
-    exp1 = df["Close"].ewm(span=12, adjust=False).mean()
-    exp2 = df["Close"].ewm(span=26, adjust=False).mean()
-    df["MACD"] = exp1 - exp2
-    df["MACD_Signal"] = df["MACD"].ewm(span=9, adjust=False).mean()
-
-    df["H-L"] = df["High"] - df["Low"]
-    df["H-PC"] = (df["High"] - df["Close"].shift(1)).abs()
-    df["L-PC"] = (df["Low"] - df["Close"].shift(1)).abs()
-    df["TR"] = df[["H-L", "H-PC", "L-PC"]].max(axis=1)
-    df["ATR14"] = df["TR"].rolling(window=14, min_periods=14).mean()
-
-    if "Volume" in df.columns:
-        df["OBV"] = (df["Volume"] * ((df["Close"] > df["Close"].shift(1)) * 2 - 1)).cumsum()
-    else:
-        df["OBV"] = np.nan
 
+def _chart_response(request, symbol, df):
+    """
+    stock_data payload (latest bar, chart series and indicators) of a
+    date-sorted frame with the "chart" indicator columns.
+    """
     # ---------------------------
     # Optional limit param for performance
     # ---------------------------
@@ -166,85 +140,86 @@ def stock_data(request, symbol):
     # Convert to JSON-safe records and aligned lists
     # ---------------------------
     # Iterate rows to ensure perfect alignment between dates and numeric arrays
-    df_to_return = df_to_return.reset_index(drop=True)  # ensure fresh indexing
-    records = df_to_return.to_dict(orient="records")
-
-    # prepare aligned lists
-    dates = []
-    open_list = []
-    high_list = []
-    low_list = []
-    close_list = []
-    volume_list = []
-    sma20_list = []
-    sma50_list = []
-    ema20_list = []
-    bb_upper_list = []
-    bb_lower_list = []
-    rsi14_list = []
-    macd_list = []
-    macd_signal_list = []
-    atr14_list = []
-    obv_list = []
-    turnover_list = []
-
-    for r in records:
-        # Date (Timestamp -> YYYY-MM-DD, else string, else None)
-        d = r.get("Date")
-        if isinstance(d, pd.Timestamp):
-            dates.append(d.strftime("%Y-%m-%d"))
-        elif d is None:
-            dates.append(None)
-        else:
-            try:
-                dates.append(str(d))
-            except Exception:
+    with span("serialize"):
+        df_to_return = df_to_return.reset_index(drop=True)  # ensure fresh indexing
+        records = df_to_return.to_dict(orient="records")
+
+        # prepare aligned lists
+        dates = []
+        open_list = []
+        high_list = []
+        low_list = []
+        close_list = []
+        volume_list = []
+        sma20_list = []
+        sma50_list = []
+        ema20_list = []
+        bb_upper_list = []
+        bb_lower_list = []
+        rsi14_list = []
+        macd_list = []
+        macd_signal_list = []
+        atr14_list = []
+        obv_list = []
+        turnover_list = []
+
+        for r in records:
+            # Date (Timestamp -> YYYY-MM-DD, else string, else None)
+            d = r.get("Date")
+            if isinstance(d, pd.Timestamp):
+                dates.append(d.strftime("%Y-%m-%d"))
+            elif d is None:
                 dates.append(None)
-
-        open_list.append(_py_safe(r.get("Open")))
-        high_list.append(_py_safe(r.get("High")))
-        low_list.append(_py_safe(r.get("Low")))
-        close_list.append(_py_safe(r.get("Close")))
-        volume_list.append(_py_safe(r.get("Volume")))
-        turnover_list.append(_py_safe(r.get("Turnover")))
-        sma20_list.append(_py_safe(r.get("SMA20")))
-        sma50_list.append(_py_safe(r.get("SMA50")))
-        ema20_list.append(_py_safe(r.get("EMA20")))
-        bb_upper_list.append(_py_safe(r.get("BB_Upper")))
-        bb_lower_list.append(_py_safe(r.get("BB_Lower")))
-        rsi14_list.append(_py_safe(r.get("RSI14")))
-        macd_list.append(_py_safe(r.get("MACD")))
-        macd_signal_list.append(_py_safe(r.get("MACD_Signal")))
-        atr14_list.append(_py_safe(r.get("ATR14")))
-        obv_list.append(_py_safe(r.get("OBV")))
-        last_idx = len(dates) - 1
-        prev_idx = last_idx - 1 if last_idx >= 1 else None
-
-        latest_open = open_list[last_idx] if last_idx >= 0 else None
-        latest_high = high_list[last_idx] if last_idx >= 0 else None
-        latest_low = low_list[last_idx] if last_idx >= 0 else None
-        latest_close = close_list[last_idx] if last_idx >= 0 else None
-        latest_volume = volume_list[last_idx] if last_idx >= 0 else None
-        latest_turnover = None
-        # if you added turnover_list above:
-        if 'turnover_list' in locals() and len(turnover_list) > last_idx:
-            latest_turnover = turnover_list[last_idx]
-
-        prev_close = close_list[prev_idx] if prev_idx is not None else None
-
-        # Percentage changes (guard div by zero / None)
-        def pct_change(value, base):
-            try:
-                if value is None or base is None:
-                    return None
-                if base == 0:
+            else:
+                try:
+                    dates.append(str(d))
+                except Exception:
+                    dates.append(None)
+
+            open_list.append(_py_safe(r.get("Open")))
+            high_list.append(_py_safe(r.get("High")))
+            low_list.append(_py_safe(r.get("Low")))
+            close_list.append(_py_safe(r.get("Close")))
+            volume_list.append(_py_safe(r.get("Volume")))
+            turnover_list.append(_py_safe(r.get("Turnover")))
+            sma20_list.append(_py_safe(r.get("SMA20")))
+            sma50_list.append(_py_safe(r.get("SMA50")))
+            ema20_list.append(_py_safe(r.get("EMA20")))
+            bb_upper_list.append(_py_safe(r.get("BB_Upper")))
+            bb_lower_list.append(_py_safe(r.get("BB_Lower")))
+            rsi14_list.append(_py_safe(r.get("RSI14")))
+            macd_list.append(_py_safe(r.get("MACD")))
+            macd_signal_list.append(_py_safe(r.get("MACD_Signal")))
+            atr14_list.append(_py_safe(r.get("ATR14")))
+            obv_list.append(_py_safe(r.get("OBV")))
+            last_idx = len(dates) - 1
+            prev_idx = last_idx - 1 if last_idx >= 1 else None
+
+            latest_open = open_list[last_idx] if last_idx >= 0 else None
+            latest_high = high_list[last_idx] if last_idx >= 0 else None
+            latest_low = low_list[last_idx] if last_idx >= 0 else None
+            latest_close = close_list[last_idx] if last_idx >= 0 else None
+            latest_volume = volume_list[last_idx] if last_idx >= 0 else None
+            latest_turnover = None
+            # if you added turnover_list above:
+            if 'turnover_list' in locals() and len(turnover_list) > last_idx:
+                latest_turnover = turnover_list[last_idx]
+
+            prev_close = close_list[prev_idx] if prev_idx is not None else None
+
+            # Percentage changes (guard div by zero / None)
+            def pct_change(value, base):
+                try:
+                    if value is None or base is None:
+                        return None
+                    if base == 0:
+                        return None
+                    return round(((value - base) / base) * 100, 2)
+                except Exception:
                     return None
-                return round(((value - base) / base) * 100, 2)
-            except Exception:
-                return None
 
-        high_change_pct = pct_change(latest_high, prev_close)
-        low_change_pct = pct_change(latest_low, prev_close)
+            high_change_pct = pct_change(latest_high, prev_close)
+            low_change_pct = pct_change(latest_low, prev_close)
 
     response = {
         "symbol": symbol,
@@ -283,35 +258,60 @@ def stock_data(request, symbol):
         # quick sanity check printed to server log
         print("DEBUG: returning chart lengths:", {k: len(v) for k, v in response["chart"].items()})
 
-    return JsonResponse(response, safe=False)
+    with span("encode"):
+        resp = JsonResponse(response, safe=False)
+    return resp
+
+
+def _cached_json(request, body, etag):
+    """
+    Pre-encoded JSON with an ETag; 304 when the client already has it.
+    """
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    return response
+
+
+def _int_param(request, name, default):
+    try:
+        return int(request.GET.get(name, default))
+    except (TypeError, ValueError):
+        return default
 
 
 def list_companies(request):
-    
     try:
-        qs = Company.objects.all().order_by("symbol")
+        with span("directory"):
+            body, etag = get_directory().public
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+    return _cached_json(request, body, etag)
 
-    companies = [
-        {
-            "symbol": c.symbol,
-            "full_name": c.full_name,
-            "sector": c.sector,
-            "logo": c.logo,
-        }
-        for c in qs
-    ]
-    return JsonResponse(companies, safe=False)
+
+def company_search(request):
+    """
+    Typeahead over symbols and company names, most watched first.
+    Query params: q (required), limit (default 10, max 50).
+    """
+    q = request.GET.get("q", "").strip()
+    if not q:
+        return JsonResponse([], safe=False)
+    with span("autocomplete"):
+        results = autocomplete(q, _int_param(request, "limit", 10))
+    return JsonResponse(results, safe=False)
 
 
 def price_history(request, symbol):
-    file_path = os.path.join(DATA_DIR, f"{symbol.upper()}.csv")
-    if not os.path.exists(file_path):
+    store = get_price_store()
+    if not store.exists(symbol):
         return JsonResponse({"error": "File not found"}, status=404)
 
     try:
-        df = pd.read_csv(file_path)
+        with span(f"load_{store.name}"):
+            df = store.read(symbol)
 
         # --- Normalize column names ---
         df.columns = [c.strip().replace(" ", "_").lower() for c in df.columns]
@@ -397,110 +397,241 @@ def price_history(request, symbol):
             cleaned.append(new_rec)
 
         # Return proper JSON (Django JsonResponse sets application/json)
-        return JsonResponse(cleaned, safe=False)
+        with span("encode"):
+            resp = JsonResponse(cleaned, safe=False)
+        return resp
 
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
+EXPORT_COLUMNS = ["symbol", "date", "open", "high", "low", "close", "volume", "turnover"]
+
+
+def _export_chunks(store, symbols, start, end, fmt):
+    """
+    Yield encoded NDJSON / CSV blocks one chunk at a time, so a request holds
+    at most one symbol's chunk in memory no matter how many symbols it covers.
+    """
+    if fmt == "csv":
+        yield (",".join(EXPORT_COLUMNS) + "\n").encode()
+    for symbol in symbols:
+        try:
+            chunks = store.iter_chunks(symbol, start, end)
+            for chunk in chunks:
+                out = pd.DataFrame({
+                    "symbol": symbol,
+                    "date": chunk["Date"].dt.strftime("%Y-%m-%d"),
+                    "open": chunk["Open"], "high": chunk["High"], "low": chunk["Low"],
+                    "close": chunk["Close"], "volume": chunk["Volume"], "turnover": chunk["Turnover"],
+                })
+                if fmt == "csv":
+                    yield out.to_csv(header=False, index=False).encode()
+                else:
+                    text = out.to_json(orient="records", lines=True, double_precision=6)
+                    yield (text if text.endswith("\n") else text + "\n").encode()
+        except Exception:
+            # a broken file should not cut the whole export short, but the
+            # client has to know this symbol's rows may be incomplete
+            logger.exception("export_history: %s failed", symbol)
+            if fmt == "csv":
+                yield f"# error: {symbol}: export failed, rows may be incomplete\n".encode()
+            else:
+                yield (json.dumps({"symbol": symbol, "error": "export failed, rows may be incomplete"}) + "\n").encode()
+
+
+def export_history(request):
+    """
+    Stream daily bars for many symbols.
+    Query params:
+    - symbols=NABIL,SBL,... or sector=Commercial Banks (default: every symbol)
+    - from / to: YYYY-MM-DD, inclusive
+    - format=ndjson (default) or csv
+    Rows come per symbol in ascending date order. A symbol that fails
+    partway is followed by an error record ({"symbol", "error"} in NDJSON,
+    a "# error:" line in CSV).
+    """
+    store = get_price_store()
+    fmt = request.GET.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return JsonResponse({"error": "format must be ndjson or csv"}, status=400)
+
+    try:
+        start = pd.Timestamp(request.GET["from"]).date() if request.GET.get("from") else None
+        end = pd.Timestamp(request.GET["to"]).date() if request.GET.get("to") else None
+    except ValueError:
+        return JsonResponse({"error": "from / to must be YYYY-MM-DD"}, status=400)
+
+    available = store.symbols()
+    if request.GET.get("symbols"):
+        wanted = [s.strip().upper() for s in request.GET["symbols"].split(",") if s.strip()]
+    elif request.GET.get("sector"):
+        wanted = sorted(
+            (s or "").upper()
+            for s in Company.objects.filter(sector__iexact=request.GET["sector"]).values_list("symbol", flat=True)
+        )
+    else:
+        wanted = available
+    known = set(available)
+    symbols = [s for s in dict.fromkeys(wanted) if s in known]
+    if not symbols:
+        return JsonResponse({"error": "No matching symbols"}, status=404)
+
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    response = StreamingHttpResponse(_export_chunks(store, symbols, start, end, fmt), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="history.{fmt}"'
+    response["X-Export-Symbols"] = str(len(symbols))
+    return response
+
+
 def company_info(request, symbol):
     symbol = (symbol or "").strip()
     if not symbol:
         raise Http404("Company not found")
 
     try:
-        company = Company.objects.get(symbol__iexact=symbol)
-    except Company.DoesNotExist:
-        raise Http404("Company not found")
+        with span("directory"):
+            record = get_directory().record(symbol)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+    if record is None:
+        raise Http404("Company not found")
+    return _cached_json(request, *record)
 
-    result = {
-        "symbol": company.symbol,
-        "full_name": company.full_name,
-        "sector": company.sector,
-        "logo": company.logo,
-    }
-    return JsonResponse(result, safe=False)
 
 
+def _series_params(request):
+    """
+    (from, to, interval) query params of the NEPSE series endpoints;
+    ValueError when a date or the interval is invalid.
+    """
+    bounds = []
+    for name in ("from", "to"):
+        value = request.GET.get(name) or None
+        if value is not None:
+            try:
+                value = datetime.date.fromisoformat(value).isoformat()
+            except ValueError:
+                raise ValueError(f"'{name}' must be a YYYY-MM-DD date")
+        bounds.append(value)
+    interval = request.GET.get("interval") or "day"
+    if interval not in NEPSE_INTERVALS:
+        raise ValueError(f"'interval' must be one of {', '.join(NEPSE_INTERVALS)}")
+    return bounds[0], bounds[1], interval
+
 
 def nepse_data(request):
+    """
+    NEPSE index rows, oldest first.
+    Query params: from / to (YYYY-MM-DD), interval (day, week, month).
+    """
+    try:
+        start, end, interval = _series_params(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    csv_path = os.path.join(base_dir, 'data', 'nepse', 'nepse.csv')
-    if not os.path.exists(csv_path):
+    with span("nepse_series"):
+        series = get_nepse_series()
+    if series is None:
         return JsonResponse({"error": "NEPSE CSV file not found"}, status=404)
+    return _cached_json(request, *series.payload(start, end, interval))
 
-    df = pd.read_csv(csv_path)
 
-    numeric_cols = ['Open', 'High', 'Low', 'Close', 'Change', 'Per Change (%)', 'Turnover']
-    for col in numeric_cols:
-        df[col] = df[col].astype(str).str.replace(',', '').astype(float)
+def nepse_breadth(request):
+    """
+    Market breadth (advancers / decliners, new highs / lows, turnover share
+    by sector) from all symbol files.
+    Query params: from / to (YYYY-MM-DD), interval (day, week, month).
+    """
+    try:
+        start, end, interval = _series_params(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-    df['Volume (in millions)'] = (df['Turnover'] / 1_000_000).round(2)
+    with span("breadth"):
+        breadth = get_breadth()
+    return _cached_json(request, *breadth.payload(start, end, interval))
 
-    df['Date'] = pd.to_datetime(df['Date'])
-    df = df.sort_values('Date', ascending=True)
 
-    data = df.to_dict(orient='records')
+def sector_list(request):
+    """
+    Sectors with a built index and their member symbols; empty until the
+    pipeline or `manage.py build_sectors` has built them.
+    """
+    manifest = sector_manifest()
+    return JsonResponse({"sectors": [
+        {"name": name, "slug": entry["slug"], "members": entry["members"]}
+        for name, entry in manifest.items()
+    ]})
 
-    return JsonResponse({'data': data}, safe=False)
 
+def sector_index(request, slug):
+    """
+    Sector index in the stock_data payload shape (latest bar, chart series,
+    indicators). Query params: method (equal, turnover), limit.
+    """
+    method = request.GET.get("method") or "equal"
+    if method not in SECTOR_METHODS:
+        return JsonResponse({"error": f"'method' must be one of {', '.join(SECTOR_METHODS)}"}, status=400)
+    found = sector_path(slug, method)
+    if found is None:
+        raise Http404(f"No index for sector {slug}")
+    name, path = found
+
+    st = os.stat(path)
+    with span("indicators_sector"):
+        df = feature_frame(f"sector:{slug}-{method}", f"{st.st_size}-{st.st_mtime_ns}", "chart",
+                           lambda: read_price_frame(path))
+    if df.shape[0] == 0:
+        raise Http404(f"No rows for sector {slug}")
+    return _chart_response(request, name, df)
 
 
 def top_gainers_losers(request):
-    cached_data = cache.get("top_gainers_losers")
+    cached_data = cache.get(TOP_MOVERS_KEY)
     if cached_data:
         return JsonResponse(cached_data)
 
-    results = []
-
-    for file in os.listdir(DATA_DIR):
-        if file.endswith(".csv"):
-            path = os.path.join(DATA_DIR, file)
-            df = pd.read_csv(path)
+    with span("csv"):
+        data = top_movers(DATA_DIR)
+    cache.set(TOP_MOVERS_KEY, data, CACHE_TIMEOUT)  # Save to cache
+    return JsonResponse(data)
 
-            if 'Symbol' not in df.columns or 'Percent Change' not in df.columns:
-                continue
 
-            df['Percent Change'] = (
-                df['Percent Change']
-                .astype(str)
-                .str.replace('%', '', regex=False)
-                .str.replace(' ', '', regex=False)
-            )
-            df['Percent Change'] = pd.to_numeric(df['Percent Change'], errors='coerce')
-            df = df.dropna(subset=['Percent Change'])
-            if df.empty:
-                continue
-
-            df = df.sort_values(by='Date', ascending=False)
-            if len(df) < 2:
-                continue
-
-            latest_row = df.iloc[0]
-            previous_row = df.iloc[1]
-            actual_change = float(latest_row['Close']) - float(previous_row['Close'])
-
-            results.append({
-                'symbol': latest_row['Symbol'],
-                'percent_change': float(latest_row['Percent Change']),
-                'close': float(latest_row['Close']),
-                'change': actual_change
-            })
-
-    top_gainers = sorted(results, key=lambda x: x['percent_change'], reverse=True)[:5]
-    top_losers = sorted(results, key=lambda x: x['percent_change'])[:5]
-
-    data = {'top_gainers': top_gainers, 'top_losers': top_losers}
-    cache.set("top_gainers_losers", data, CACHE_TIMEOUT)  # Save to cache
-    return JsonResponse(data)
+@api_view(['GET'])
+@authentication_classes([CustomJWTAuthentication])
+@permission_classes([AllowAny])
+def dashboard(request):
+    """
+    NEPSE tail, top movers and (signed in) the watchlist summary with stored
+    predictions in one response; see stockdata/dashboard.py for partial
+    responses and the ETag.
+    """
+    watchlist = None
+    if request.user and request.user.is_authenticated:
+        items = tuple(
+            (symbol.upper(), added_at)
+            for symbol, added_at in WatchlistItem.objects.filter(user=request.user)
+            .order_by('-added_at').values_list('symbol', 'added_at')
+        )
+        predictions = dict(
+            ModelArtifact.objects.filter(symbol__in=[s for s, _ in items])
+            .values_list("symbol", "results__next_prediction")
+        )
+        # polls with the same watchlist share one build
+        watchlist = (dashboard_parts.watchlist_part, (items, predictions), items)
+
+    with span("dashboard"):
+        body, etag = dashboard_parts.compose({
+            "nepse": (dashboard_parts.nepse_part, ()),
+            "movers": (dashboard_parts.movers_part, ()),
+            "watchlist": watchlist,
+        })
+    return _cached_json(request, body, etag)
 
 
 def announcement(request, symbol):
     try:
-        base_dir = os.path.dirname(__file__)              
-        file_path = os.path.join(base_dir, "data", "announcement", f"{symbol.upper()}.csv")
+        file_path = os.path.join(DATA_DIR, "announcement", f"{symbol.upper()}.csv")
 
         if not os.path.exists(file_path):
             return JsonResponse({"error": f"No announcement file found for {symbol}"}, status=404)
@@ -521,20 +652,286 @@ def announcement(request, symbol):
         return JsonResponse({"error": str(e)}, status=500)
 
 
-def stock_prediction(request, symbol):
-    symbol_upper = symbol.upper()
-    json_path = os.path.join(OUTPUT_DIR, symbol_upper, f"{symbol_upper}_results.json")
-    csv_path = os.path.join(OUTPUT_DIR, symbol_upper, f"{symbol_upper}_results_with_tol.csv")
+def announcement_search(request):
+    """
+    Full-text search over every symbol's announcement headlines.
+    Query params:
+    - q: search terms (all must match); empty lists everything in range
+    - symbols=NABIL,SBL,... and from / to (YYYY-MM-DD, inclusive) filters
+    - sort=relevance (default) or date
+    - page (default 1), page_size (default 20, max 100)
+    """
+    symbols = None
+    if request.GET.get("symbols"):
+        symbols = {s.strip().upper() for s in request.GET["symbols"].split(",") if s.strip()}
 
+    try:
+        date_from = np.datetime64(request.GET["from"], "D") if request.GET.get("from") else None
+        date_to = np.datetime64(request.GET["to"], "D") if request.GET.get("to") else None
+    except ValueError:
+        return JsonResponse({"error": "from / to must be YYYY-MM-DD"}, status=400)
 
-    if not os.path.exists(json_path) or not os.path.exists(csv_path):
-        raise Http404("Prediction data not found.")
+    try:
+        with span("index"):
+            index = get_index()
+        with span("search"):
+            result = index.search(
+                request.GET.get("q", ""),
+                symbols=symbols,
+                date_from=date_from,
+                date_to=date_to,
+                sort=request.GET.get("sort", "relevance"),
+                page=_int_param(request, "page", 1),
+                page_size=_int_param(request, "page_size", 20),
+            )
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+    result["query"] = request.GET.get("q", "")
+    return JsonResponse(result)
+
+
+def _series_payload(frame, digits=4):
+    return {
+        "dates": [d.strftime("%Y-%m-%d") for d in frame.index],
+        "count": [int(v) for v in frame["count"].fillna(0)],
+        "mean": [_py_safe(round(v, digits)) if pd.notna(v) else None for v in frame["mean"]],
+        "rolling_count": [int(v) for v in frame["rolling_count"].fillna(0)],
+        "rolling_mean": [_py_safe(round(v, digits)) if pd.notna(v) else None for v in frame["rolling_mean"]],
+    }
+
+
+def sentiment_series(request, symbol):
+    """
+    Announcement sentiment for one symbol.
+    Query params:
+    - window: rolling window in calendar days (default 30)
+    - align=price (default): one point per date of the stock_data chart, so
+      it can be overlaid directly; align=calendar: one point per day
+    """
+    symbol = symbol.upper()
+    window = max(1, _int_param(request, "window", SENTIMENT_WINDOW))
+    align = request.GET.get("align", "price")
+
+    ann_path = os.path.join(ANNOUNCEMENT_DIR, f"{symbol}.csv")
+    price_path = os.path.join(DATA_DIR, f"{symbol}.csv")
+    if not os.path.exists(ann_path):
+        return JsonResponse({"error": f"No announcement file found for {symbol}"}, status=404)
+    if align == "price" and not os.path.exists(price_path):
+        return JsonResponse({"error": f"No price file found for {symbol}"}, status=404)
+
+    stamps = [os.stat(ann_path).st_mtime_ns]
+    if align == "price":
+        stamps.append(os.stat(price_path).st_mtime_ns)
+    cache_key = f"sentiment:{symbol}:{window}:{align}:{'-'.join(map(str, stamps))}"
+    data = cache.get(cache_key)
+    if data is None:
+        try:
+            with span("series"):
+                daily = load_sentiment(symbol)
+                if align == "price":
+                    dates = read_price_frame(price_path)["Date"]
+                    frame = align_sentiment(sentiment_rolling(daily, window, end=dates.max() if len(dates) else None), dates)
+                else:
+                    frame = sentiment_rolling(daily, window)
+            data = {"symbol": symbol, "window": window, "align": align, "chart": _series_payload(frame)}
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=500)
+        cache.set(cache_key, data, CACHE_TIMEOUT)
+    return JsonResponse(data)
+
+
+def sector_sentiment(request):
+    """
+    Daily and rolling announcement sentiment summed over a sector's symbols.
+    Query params: sector (required), window (default 30), from / to (YYYY-MM-DD).
+    """
+    sector = request.GET.get("sector", "").strip()
+    if not sector:
+        return JsonResponse({"error": "sector is required"}, status=400)
+    window = max(1, _int_param(request, "window", SENTIMENT_WINDOW))
+
+    symbols = [
+        (s or "").upper()
+        for s in Company.objects.filter(sector__iexact=sector).values_list("symbol", flat=True)
+    ]
+    if not symbols:
+        return JsonResponse({"error": f"Unknown sector {sector}"}, status=404)
+
+    try:
+        with span("series"):
+            frame = sentiment_rolling(sector_sentiment_daily(symbols), window)
+            if request.GET.get("from"):
+                frame = frame[frame.index >= pd.Timestamp(request.GET["from"])]
+            if request.GET.get("to"):
+                frame = frame[frame.index <= pd.Timestamp(request.GET["to"])]
+    except ValueError:
+        return JsonResponse({"error": "from / to must be YYYY-MM-DD"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+    return JsonResponse({
+        "sector": sector,
+        "symbols": sorted(symbols),
+        "window": window,
+        "chart": _series_payload(frame),
+    })
+
+
+def return_correlation(request):
+    """
+    Pairwise return correlation over the last `window` trading days.
+    Query params:
+    - window (default 250, 0 = full history), min_periods (default 60)
+    - symbols=NABIL,SBL,...  or  sector=Commercial Banks  to pick a subset
+    - cov=1 to include the covariance matrix
+    """
+    window = max(0, _int_param(request, "window", DEFAULT_WINDOW))
+    min_periods = max(2, _int_param(request, "min_periods", DEFAULT_MIN_PERIODS))
+
+    try:
+        result = correlation_matrix(window, min_periods)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+    symbols = result["symbols"]
+    wanted = None
+    if request.GET.get("symbols"):
+        wanted = {s.strip().upper() for s in request.GET["symbols"].split(",") if s.strip()}
+    elif request.GET.get("sector"):
+        wanted = {
+            (s or "").upper()
+            for s in Company.objects.filter(sector__iexact=request.GET["sector"]).values_list("symbol", flat=True)
+        }
+
+    if wanted is not None:
+        idx = [i for i, s in enumerate(symbols) if s in wanted]
+    else:
+        idx = list(range(len(symbols)))
+
+    ix = np.ix_(idx, idx)
+    data = {
+        "window": result["window"],
+        "min_periods": result["min_periods"],
+        "start": result["start"],
+        "end": result["end"],
+        "symbols": [symbols[i] for i in idx],
+        "correlation": matrix_to_list(result["corr"][ix]),
+    }
+    if request.GET.get("cov") in ("1", "true", "yes"):
+        data["covariance"] = matrix_to_list(result["cov"][ix], digits=8)
+    return JsonResponse(data)
+
+
+def sector_heatmap(request):
+    """
+    Sector heatmap: average pairwise correlation within/between Company.sector groups.
+    """
+    window = max(0, _int_param(request, "window", DEFAULT_WINDOW))
+    min_periods = max(2, _int_param(request, "min_periods", DEFAULT_MIN_PERIODS))
+
+    try:
+        result = correlation_matrix(window, min_periods)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+    sector_of = {
+        (sym or "").upper(): sector
+        for sym, sector in Company.objects.values_list("symbol", "sector")
+    }
+    grouped = sector_correlation(result["corr"], result["symbols"], sector_of)
+
+    return JsonResponse({
+        "window": result["window"],
+        "start": result["start"],
+        "end": result["end"],
+        "sectors": grouped["sectors"],
+        "sizes": grouped["sizes"],
+        "matrix": matrix_to_list(grouped["matrix"]),
+    })
+
+
+def backtest(request, symbol):
+    """
+    Backtest a simple rule on one symbol.
+    Query params: strategy=sma_cross|rsi|macd, the strategy's own params
+    (e.g. fast=20&slow=50, lower=30&upper=70), fee_bps, slippage_bps.
+    """
+    symbol = symbol.upper()
+    store = get_price_store()
+    if not store.exists(symbol):
+        raise Http404(f"Data for {symbol} not found")
+
+    strategy = request.GET.get("strategy", "sma_cross")
+    if strategy not in STRATEGIES:
+        return JsonResponse({"error": f"Unknown strategy '{strategy}'", "strategies": list(STRATEGIES)}, status=400)
+
+    params = {}
+    for name, default in STRATEGIES[strategy]["defaults"].items():
+        try:
+            params[name] = int(request.GET.get(name, default))
+        except ValueError:
+            return JsonResponse({"error": f"'{name}' must be an integer"}, status=400)
+    error = backtest_param_error(params)
+    if error:
+        return JsonResponse({"error": error}, status=400)
+    try:
+        fee_bps = float(request.GET.get("fee_bps", 0))
+        slippage_bps = float(request.GET.get("slippage_bps", 0))
+    except ValueError:
+        return JsonResponse({"error": "fee_bps and slippage_bps must be numbers"}, status=400)
+    if not (math.isfinite(fee_bps) and math.isfinite(slippage_bps)) or fee_bps < 0 or slippage_bps < 0:
+        return JsonResponse({"error": "fee_bps and slippage_bps must be finite and not negative"}, status=400)
+
+    df = indicator_frame(store, symbol)
+    if df.shape[0] < 2:
+        raise Http404(f"No valid OHLC rows for {symbol} after cleaning")
+
+    stats, result = run_backtest(df, strategy, params, fee_bps, slippage_bps)
+
+    dates = df["Date"].dt.strftime("%Y-%m-%d").tolist()
+    close = df["Close"].to_numpy(dtype=float)
+    t = result["trades"]
+    trades = [
+        {
+            "entry_date": dates[e],
+            "exit_date": dates[x],
+            "entry_price": float(close[e]),
+            "exit_price": float(close[x]),
+            "return": round(float(r), 6),
+            "bars": int(b),
+            "open": bool(o),
+        }
+        for e, x, r, b, o in zip(t["entry_idx"], t["exit_idx"], t["return"], t["bars"], t["open"])
+    ]
+
+    return JsonResponse({
+        "symbol": symbol,
+        "strategy": strategy,
+        "params": params,
+        "fee_bps": fee_bps,
+        "slippage_bps": slippage_bps,
+        "stats": stats,
+        "chart": {
+            "dates": dates,
+            "close": close.tolist(),
+            "equity": np.round(result["equity"], 6).tolist(),
+            "drawdown": np.round(result["drawdown"], 6).tolist(),
+            "position": result["position"].astype(int).tolist(),
+        },
+        "trades": trades,
+    })
 
-    with open(json_path, 'r') as f:
-        data = json.load(f)
+
+def stock_prediction(request, symbol):
+    symbol_upper = symbol.upper()
+    artifact = ModelArtifact.objects.filter(symbol=symbol_upper).only("results", "predictions_path").first()
+    if artifact is None or not artifact.results or not artifact.predictions_path:
+        raise Http404("Prediction data not found.")
+    data = artifact.results
 
     try:
-        df = pd.read_csv(csv_path)
+        df = pd.read_csv(output_path(artifact.predictions_path, OUTPUT_DIR))
     except Exception as e:
         raise Http404(f"Error reading CSV: {e}")
 
@@ -566,6 +963,81 @@ def stock_prediction(request, symbol):
     return JsonResponse(response_data, safe=False)
 
 
+LIVE_FORECAST_WAIT = 2.0   # seconds a request waits for a model that is loading
+
+
+def live_forecast(request, symbol):
+    """
+    Next-day forecast of the pooled model on the current price file.
+    While the model loads (or without tensorflow) the forecast stored at
+    training time is returned with "source": "stored". Served forecasts are
+    logged for the drift monitor (stockdata/drift.py).
+    """
+    symbol = symbol.upper()
+    artifact = ModelArtifact.objects.filter(symbol=symbol).only("results").first()
+    if artifact is None:
+        return JsonResponse({"error": "No model for this symbol"}, status=404)
+
+    def stored(**extra):
+        prediction = (artifact.results or {}).get("next_prediction")
+        log_forecast(symbol, prediction, source="stored")
+        return JsonResponse({"symbol": symbol, "source": "stored", "forecast": prediction, **extra})
+
+    data_path = list_symbol_files(DATA_DIR).get(symbol)
+    if data_path is None or not forecast.tensorflow_available():
+        return stored()
+    try:
+        with span("model_pool"):
+            entry = get_model_pool().get(symbol, timeout=LIVE_FORECAST_WAIT)
+    except ModelNotFound:
+        return JsonResponse({"error": "No model for this symbol"}, status=404)
+    except Exception as e:
+        return stored(error=f"Model failed to load: {e}")
+    if entry is None:
+        return stored(loading=True)
+
+    st = os.stat(data_path)
+    key = f"forecast:{symbol}:{entry.version}:{st.st_size}-{st.st_mtime_ns}"
+    prediction = cache.get(key)
+    if prediction is None:
+        with span("predict"):
+            prediction = forecast.next_day_prediction(
+                entry.model, entry.scaler, forecast.training_features(symbol, data_path),
+                seq_len=int(entry.config.get("seq_len") or forecast.SEQ_LEN),
+                features=entry.config.get("features") or forecast.FEATURES,
+            )
+        cache.set(key, prediction, CACHE_TIMEOUT)
+    log_forecast(symbol, prediction, model_version=entry.version)
+    return JsonResponse({"symbol": symbol, "source": "live", "forecast": prediction})
+
+
+@api_view(['GET'])
+@authentication_classes([CustomJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def model_pool_stats(request):
+    """
+    Models resident in this worker's pool, hit rate and load latency.
+    """
+    if not getattr(request.user, 'is_admin', False):
+        return JsonResponse({"success": False, "message": "Forbidden - admin only"}, status=403)
+    return JsonResponse(get_model_pool().stats())
+
+
+@api_view(['GET'])
+@authentication_classes([CustomJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def drift_status(request):
+    """
+    Live accuracy of each symbol's model against its training-time hybrid
+    accuracy; flagged symbols (due for retraining) first.
+    Query params: flagged=1 for flagged symbols only.
+    """
+    if not getattr(request.user, 'is_admin', False):
+        return JsonResponse({"success": False, "message": "Forbidden - admin only"}, status=403)
+    flagged_only = request.GET.get("flagged") in ("1", "true")
+    return JsonResponse({"symbols": drift_summary(flagged_only)})
+
+
 @api_view(['POST'])
 @authentication_classes([CustomJWTAuthentication])
 @permission_classes([IsAuthenticated])
@@ -579,17 +1051,53 @@ def upload_stock_files(request):
 
     try:
         os.makedirs(DATA_FOLDER, exist_ok=True)
+        uploaded = {}
         for key in request.FILES:
             file = request.FILES[key]
             safe_name = os.path.basename(file.name)
             path = os.path.join(DATA_FOLDER, safe_name)
+            digest = hashlib.sha256()
             with open(path, "wb+") as f:
                 for chunk in file.chunks():
                     f.write(chunk)
+                    digest.update(chunk)
+            if safe_name.lower().endswith(".csv"):
+                register_price_file(os.path.splitext(safe_name)[0], path, digest.hexdigest(), DATA_FOLDER)
+                uploaded[os.path.splitext(safe_name)[0].upper()] = path
     except Exception as exc:
         return JsonResponse({"success": False, "message": f"File save error: {str(exc)}"}, status=500)
 
-    return JsonResponse({"success": True, "message": "Files uploaded successfully"}, status=200)
+    # DailyBar load, indicators, forecasts and cache warming happen in the
+    # post-upload pipeline rather than in this request
+    run_id = None
+    if uploaded:
+        run_id = pipeline.enqueue(uploaded).id
+        pipeline.kick()
+
+    return JsonResponse({"success": True, "message": "Files uploaded successfully", "pipeline_run": run_id}, status=200)
+
+
+@api_view(['GET'])
+@authentication_classes([CustomJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def pipeline_status(request):
+    """
+    Latest post-upload pipeline runs with per-stage durations.
+    Query params: limit (default 10), run (one run, with its tasks).
+    """
+    if not getattr(request.user, 'is_admin', False):
+        return JsonResponse({"success": False, "message": "Forbidden - admin only"}, status=403)
+
+    run_id = request.GET.get("run")
+    if run_id:
+        run = PipelineRun.objects.filter(pk=run_id).first() if run_id.isdigit() else None
+        if run is None:
+            return JsonResponse({"error": "Run not found"}, status=404)
+        return JsonResponse(pipeline.run_summary(run, with_tasks=True))
+
+    limit = max(1, min(100, _int_param(request, "limit", 10)))
+    runs = PipelineRun.objects.prefetch_related("tasks")[:limit]
+    return JsonResponse({"runs": [pipeline.run_summary(r) for r in runs]})
 
 
 
@@ -598,41 +1106,29 @@ def companies_without_stock_files(request):
     # if not getattr(user, 'is_admin', False):
     #     return JsonResponse({"success": False, "message": "Forbidden - admin only"}, status=403)
 
-    # All files in stockdata/data
-    try:
-        os.makedirs(DATA_FOLDER, exist_ok=True)
-        existing_files = {
-            os.path.splitext(fname)[0].upper()
-            for fname in os.listdir(DATA_FOLDER)
-            if fname.lower().endswith(".csv")
-        }
-    except Exception as exc:
-        return JsonResponse({"success": False, "message": f"File read error: {str(exc)}"}, status=500)
-
-    # Get companies that DO NOT have a CSV file
-    missing_companies = []
-    for c in Company.objects.all():
-        symbol = (c.symbol or "").upper()
-        if symbol and symbol not in existing_files:
-            missing_companies.append({
-                "full_name": c.full_name,
-                "sector": c.sector,
-                "symbol": symbol,
-                "logo": c.logo
-            })
+    # Companies that DO NOT have a CSV file, per the price file registry
+    companies = (
+        Company.objects.annotate(symbol_upper=Upper("symbol"))
+        .exclude(symbol_upper__in=PriceFile.objects.values("symbol"))
+        .exclude(symbol="")
+        .values("full_name", "sector", "symbol_upper", "logo")
+    )
+    missing_companies = [
+        {"full_name": c["full_name"], "sector": c["sector"], "symbol": c["symbol_upper"], "logo": c["logo"]}
+        for c in companies
+    ]
 
     return JsonResponse({
         "success": True,
         "companies_missing_files": missing_companies
     }, status=200)
 
+
 # --- LIST ALL COMPANIES ---
 @require_http_methods(["GET"])
 def list_companies_admin(request):
-    companies = Company.objects.all().values(
-        "id", "symbol", "full_name", "sector", "logo", "metadata"
-    )
-    return JsonResponse(list(companies), safe=False)
+    body, etag = get_directory().admin
+    return _cached_json(request, body, etag)
 
 
 # --- CREATE NEW COMPANY ---
@@ -697,141 +1193,47 @@ def admin_dashboard_stats(request):
     - min_accuracy / max_accuracy (floats or null)
     - trained_companies_list: [{name,symbol,sector,logo}]
     - to_train_companies_list: [{name,symbol,sector,logo}]
+
+    Everything comes from the Company table and the model registry
+    (`manage.py sync_model_registry`), no folder listing or JSON parsing.
+    Accuracies are walk-forward hybrid accuracies where `manage.py
+    walkforward_eval` has run.
     """
-    # 1) total companies from DB
     try:
-        companies_qs = Company.objects.all()
-        total_companies = companies_qs.count()
+        with span("db"):
+            companies = list(Company.objects.values_list("symbol", "full_name", "sector", "logo"))
+            trained_symbols = set(ModelArtifact.objects.values_list("symbol", flat=True))
+            # walk-forward accuracy when the model has been evaluated, else the single-split one
+            ranked = ModelArtifact.objects.annotate(
+                accuracy=Coalesce("walkforward_hybrid", "hybrid_accuracy")
+            ).filter(accuracy__isnull=False)
+            lowest = ranked.order_by("accuracy", "symbol").values_list("symbol", "accuracy").first()
+            highest = ranked.order_by("-accuracy", "symbol").values_list("symbol", "accuracy").first()
     except Exception as e:
         return JsonResponse({"detail": f"DB error: {str(e)}"}, status=500)
 
-    # 2) outputs root resolution (same logic as before)
-    outputs_root = globals().get("OUTPUT_DIR") or getattr(settings, "STOCKDATA_OUTPUT_DIR", None)
-    if not outputs_root:
-        outputs_root = os.path.join(os.path.dirname(__file__), "outputs")
-
-    if not os.path.isdir(outputs_root):
-        return JsonResponse({"detail": f"Output directory not found: {outputs_root}"}, status=500)
+    total_companies = len(companies)
+    company_map = {(symbol or "").upper(): (symbol, name, sector, logo) for symbol, name, sector, logo in companies}
 
-    # 3) list direct subdirectories (AHL, ADBL, CITY, ...)
-    try:
-        entries = os.listdir(outputs_root)
-        subdirs = [d for d in entries if os.path.isdir(os.path.join(outputs_root, d))]
-    except Exception as e:
-        return JsonResponse({"detail": f"Unable to read outputs directory: {str(e)}"}, status=500)
-
-    # Build set of trained symbols (normalized uppercase)
-    trained_symbols = {str(d).upper() for d in subdirs}
-
-    # 4) map companies by symbol for quick lookup (normalize uppercase)
-    company_map = {}
-    for c in companies_qs:
-        symbol = (getattr(c, "symbol", "") or "").upper()
-        company_map[symbol] = c
-
-    # 5) construct trained_companies_list (try to attach DB info if exists)
     trained_companies_list = []
     for sym in sorted(trained_symbols):
         c = company_map.get(sym)
         if c:
-            # logo URL: use build_absolute_uri if ImageField provides .url; fallback to empty string
-            logo_url = ""
-            try:
-                if getattr(c, "logo", None):
-                    # If logo has .url (ImageField)
-                    logo_url = request.build_absolute_uri(c.logo.url)
-            except Exception:
-                # maybe logo is a plain string field
-                logo_val = getattr(c, "logo", None)
-                if isinstance(logo_val, str):
-                    logo_url = logo_val
-            trained_companies_list.append({
-                "name": getattr(c, "full_name", None),
-                "symbol": getattr(c, "symbol", sym),
-                "sector": getattr(c, "sector", None),
-                "logo": logo_url or "",
-            })
+            symbol, name, sector, logo = c
+            trained_companies_list.append({"name": name, "symbol": symbol, "sector": sector, "logo": logo or ""})
         else:
             # symbol exists in outputs but no DB entry
-            trained_companies_list.append({
-                "name": None,
-                "symbol": sym,
-                "sector": None,
-                "logo": "",
-            })
-
-    # 6) construct to_train list (companies in DB not present in trained_symbols)
-    to_train_companies_list = []
-    for c in companies_qs:
-        sym = (getattr(c, "symbol", "") or "").upper()
-        if sym not in trained_symbols:
-            logo_url = ""
-            try:
-                if getattr(c, "logo", None):
-                    logo_url = request.build_absolute_uri(c.logo.url)
-            except Exception:
-                logo_val = getattr(c, "logo", None)
-                if isinstance(logo_val, str):
-                    logo_url = logo_val
-            to_train_companies_list.append({
-                "name": getattr(c, "full_name", None),
-                "symbol": getattr(c, "symbol", None),
-                "sector": getattr(c, "sector", None),
-                "logo": logo_url or "",
-            })
-
-    trained_companies = len(trained_companies_list)
-
-    # 7) same accuracy extraction logic as you already had
-    # 7) same accuracy extraction logic, but now track symbol for min/max
-    accuracy_records = []  # list of tuples: (symbol, accuracy)
-    for sub in subdirs:
-        symbol_dirname = str(sub)
-        symbol_upper = symbol_dirname.upper()
-        result_json = os.path.join(outputs_root, symbol_dirname, f"{symbol_upper}_results.json")
-        if not os.path.exists(result_json):
-            alt1 = os.path.join(outputs_root, symbol_dirname, f"{symbol_dirname}_results.json")
-            if os.path.exists(alt1):
-                result_json = alt1
-            else:
-                alt2 = os.path.join(outputs_root, symbol_dirname, f"{symbol_upper.lower()}_results.json")
-                if os.path.exists(alt2):
-                    result_json = alt2
-                else:
-                    continue
-        try:
-            with open(result_json, "r", encoding="utf-8") as fh:
-                data = json.load(fh)
-        except Exception:
-            continue
-        acc_value = None
-        if isinstance(data, dict):
-            cls = data.get("classification")
-            if isinstance(cls, dict) and "hybrid_accuracy" in cls:
-                acc_value = cls.get("hybrid_accuracy")
-            else:
-                for k in ("accuracy", "acc", "accuracy_score", "acc_score"):
-                    if k in data:
-                        acc_value = data.get(k)
-                        break
-        if acc_value is None:
-            continue
-        try:
-            accf = float(acc_value)
-            if accf <= 1:
-                accf = accf * 100.0
-            accuracy_records.append((symbol_upper, round(accf, 2)))
-        except Exception:
-            continue
-
-    # Compute min/max with corresponding symbol
-    if accuracy_records:
-        min_symbol, min_accuracy = min(accuracy_records, key=lambda x: x[1])
-        max_symbol, max_accuracy = max(accuracy_records, key=lambda x: x[1])
-    else:
-        min_symbol = max_symbol = min_accuracy = max_accuracy = None
+            trained_companies_list.append({"name": None, "symbol": sym, "sector": None, "logo": ""})
 
+    to_train_companies_list = [
+        {"name": name, "symbol": symbol, "sector": sector, "logo": logo or ""}
+        for symbol, name, sector, logo in companies
+        if (symbol or "").upper() not in trained_symbols
+    ]
 
+    trained_companies = len(trained_companies_list)
+    min_symbol, min_accuracy = lowest or (None, None)
+    max_symbol, max_accuracy = highest or (None, None)
     to_train = max(0, total_companies - trained_companies)
 
     return JsonResponse({
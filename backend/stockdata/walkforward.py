@@ -0,0 +1,216 @@
+# stockdata/walkforward.py
+"""
+Walk-forward evaluation of the trained LSTM models.
+
+Instead of the notebook's single last-10% split, the last `folds * horizon`
+sessions are cut into `folds` consecutive windows (rolling origins). Every
+target in those windows is predicted in one batched model.predict call, and
+the metrics are computed on (folds, horizon) arrays:
+
+- MAE / RMSE / MAPE
+- tolerance accuracy: |error| / actual within the notebook's threshold,
+  where the volatility-scaled threshold uses only returns known at the
+  fold's origin (the notebook uses the last VOL_LOOKBACK days of the file)
+- direction accuracy (UP = change >= 0, binary as in the notebook)
+- hybrid accuracy: direction right or within tolerance
+
+Folds whose targets fall in the data the model was trained/validated on are
+flagged `seen` and left out of the summary when unseen folds exist.
+Results go to outputs/<SYMBOL>/<SYMBOL>_walkforward.csv and the
+ModelArtifact row (walkforward, walkforward_hybrid).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+from numpy.lib.stride_tricks import sliding_window_view
+
+from stockdata import forecast
+from stockdata.models import ModelArtifact
+from stockdata.registry import OUTPUT_DIR, output_path
+
+DEFAULT_FOLDS = 12
+DEFAULT_HORIZON = 20      # sessions per fold (about a trading month)
+
+METRICS = ["mae", "rmse", "mape", "tolerance_accuracy", "direction_accuracy", "hybrid_accuracy"]
+
+
+def tolerance_thresholds(close, origins, tol_config):
+    """
+    Percent threshold per fold (None for an absolute threshold), from the
+    returns before each origin when the threshold is volatility-scaled.
+    """
+    if not tol_config.get("use_percent_threshold", True):
+        return None
+    if not tol_config.get("use_volatility_scale", True):
+        return np.full(len(origins), float(tol_config.get("pct_threshold", 0.04)))
+    lookback = int(tol_config.get("vol_lookback", 200))
+    vol = pd.Series(close).pct_change().rolling(lookback, min_periods=2).std().to_numpy()
+    # vol[o - 1] covers returns up to the session before the origin
+    threshold = vol[np.asarray(origins) - 1] * float(tol_config.get("vol_multiplier", 1.0))
+    return np.maximum(1e-6, np.nan_to_num(threshold, nan=float(tol_config.get("pct_threshold", 0.04))))
+
+
+def fold_metrics(actual, pred, prev_close, threshold_pct=None, abs_threshold=5.0):
+    """
+    Metrics per fold from (folds, horizon) arrays; threshold_pct is (folds,)
+    or None to use abs_threshold. Returns {metric: (folds,) array}.
+    """
+    err = pred - actual
+    abs_err = np.abs(err)
+    pct_err = abs_err / (np.abs(actual) + 1e-9)
+
+    if threshold_pct is not None:
+        within = pct_err <= threshold_pct[:, None]
+    else:
+        within = abs_err <= abs_threshold
+    direction = (actual - prev_close >= 0) == (pred - prev_close >= 0)
+
+    return {
+        "mae": abs_err.mean(axis=1),
+        "rmse": np.sqrt((err ** 2).mean(axis=1)),
+        "mape": pct_err.mean(axis=1) * 100,
+        "tolerance_accuracy": within.mean(axis=1),
+        "direction_accuracy": direction.mean(axis=1),
+        "hybrid_accuracy": (direction | within).mean(axis=1),
+    }
+
+
+def evaluate(model, scaler, df, config, folds=DEFAULT_FOLDS, horizon=DEFAULT_HORIZON,
+             trained_until=None, batch_size=256):
+    """
+    Walk-forward metrics of one model on `df` (a training_features frame).
+    `trained_until` is the last date the model could have trained on.
+    Returns (per-fold DataFrame, summary dict).
+    """
+    seq_len = int(config.get("seq_len") or forecast.SEQ_LEN)
+    features = [f for f in (config.get("features") or forecast.FEATURES) if f in df.columns]
+    df = df[features + ["Date"]].dropna().reset_index(drop=True)
+
+    n = len(df)
+    folds = min(folds, (n - seq_len) // horizon)
+    if folds < 1:
+        raise ValueError(f"Need more than {seq_len + horizon} rows, have {n}")
+    first = n - folds * horizon
+    origins = first + horizon * np.arange(folds)
+
+    # one window per target row first..n-1, predicted in one batch
+    scaled = scaler.transform(df[features].to_numpy(dtype=np.float32)).astype(np.float32)
+    windows = sliding_window_view(scaled, seq_len, axis=0)[first - seq_len:n - seq_len]
+    pred_scaled = np.asarray(model.predict(windows.transpose(0, 2, 1), batch_size=batch_size, verbose=0)).reshape(-1)
+
+    close_idx = features.index("Close")
+    inv = np.zeros((len(pred_scaled), len(features)), dtype=np.float32)
+    inv[:, close_idx] = pred_scaled
+    pred = scaler.inverse_transform(inv)[:, close_idx].astype(float).reshape(folds, horizon)
+
+    close = df["Close"].to_numpy(dtype=float)
+    actual = close[first:n].reshape(folds, horizon)
+    prev_close = close[first - 1:n - 1].reshape(folds, horizon)
+
+    tol = config.get("tolerance_correctness") or {}
+    threshold = tolerance_thresholds(close, origins, tol)
+    metrics = fold_metrics(actual, pred, prev_close, threshold, float(tol.get("abs_threshold", 5.0)))
+
+    # the notebook trained/validated on everything before its test split
+    dates = df["Date"].to_numpy()
+    if trained_until is not None:
+        n_trained = int((dates <= np.datetime64(pd.Timestamp(trained_until).tz_localize(None))).sum())
+        test_start = int(n_trained * (1 - float(config.get("test_pct", 0.1))))
+    else:
+        test_start = 0
+    seen = origins < test_start
+
+    per_fold = pd.DataFrame({
+        "fold": np.arange(folds),
+        "start_date": pd.to_datetime(dates[origins]).strftime("%Y-%m-%d"),
+        "end_date": pd.to_datetime(dates[origins + horizon - 1]).strftime("%Y-%m-%d"),
+        "seen": seen,
+        "threshold_pct": threshold * 100 if threshold is not None else np.nan,
+        **metrics,
+    })
+
+    scored = per_fold[~per_fold["seen"]] if (~seen).any() else per_fold
+    summary = {
+        "folds": folds,
+        "horizon": horizon,
+        "unseen_folds": int((~seen).sum()),
+        "first_date": per_fold["start_date"].iloc[0],
+        "last_date": per_fold["end_date"].iloc[-1],
+        "mean": {m: float(scored[m].mean()) for m in METRICS},
+        "std": {m: float(scored[m].std(ddof=0)) for m in METRICS},
+    }
+    return per_fold, summary
+
+
+def _evaluate_task(args):
+    symbol, data_path, model_path, scaler_path, config, trained_until, folds, horizon = args
+    try:
+        model = forecast.load_model(model_path)
+        scaler = joblib.load(scaler_path)
+        per_fold, summary = evaluate(model, scaler, forecast.training_features(symbol, data_path), config,
+                                     folds, horizon, trained_until)
+        return symbol, per_fold, summary, None
+    except Exception as exc:
+        return symbol, None, None, f"{type(exc).__name__}: {exc}"
+
+
+def _store(artifact, per_fold, summary, output_dir):
+    folder = os.path.dirname(output_path(artifact.model_path, output_dir))
+    path = os.path.join(folder, f"{artifact.symbol}_walkforward.csv")
+    tmp = f"{path}.tmp"
+    per_fold.to_csv(tmp, index=False, float_format="%.6g")
+    os.replace(tmp, path)
+
+    records = per_fold.replace({np.nan: None}).to_dict(orient="records")
+    ModelArtifact.objects.filter(pk=artifact.pk).update(
+        walkforward={"summary": summary, "folds": records},
+        # a percentage, like ModelArtifact.hybrid_accuracy
+        walkforward_hybrid=round(summary["mean"]["hybrid_accuracy"] * 100.0, 2),
+        evaluated_at=timezone.now(),
+    )
+
+
+def evaluate_symbols(symbols=None, data_files=None, folds=DEFAULT_FOLDS, horizon=DEFAULT_HORIZON,
+                     workers=None, threads=1, output_dir=None):
+    """
+    Walk-forward evaluate the registered models of `symbols` (default: all)
+    in a process pool, `threads` CPU threads per process, and store results.
+    `data_files` is {SYMBOL: csv path}. Returns {symbol: summary or error str}.
+    """
+    output_dir = output_dir or OUTPUT_DIR
+    qs = ModelArtifact.objects.exclude(model_path=None).exclude(scaler_path=None)
+    if symbols:
+        qs = qs.filter(symbol__in=[s.upper() for s in symbols])
+    artifacts = {a.symbol: a for a in qs}
+
+    out = {}
+    tasks = []
+    for symbol, a in sorted(artifacts.items()):
+        data_path = (data_files or {}).get(symbol)
+        if not data_path:
+            out[symbol] = "no price file"
+            continue
+        results = a.results or {}
+        tasks.append((
+            symbol, data_path, output_path(a.model_path, output_dir), output_path(a.scaler_path, output_dir),
+            results.get("config") or {}, results.get("timestamp") or a.trained_at, folds, horizon,
+        ))
+    if not tasks:
+        return out
+
+    def consume(results):
+        for symbol, per_fold, summary, error in results:
+            out[symbol] = error or summary
+            if error is None:
+                _store(artifacts[symbol], per_fold, summary, output_dir)
+
+    if workers == 1 or len(tasks) == 1:
+        consume(map(_evaluate_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=forecast.limit_threads, initargs=(threads,)) as ex:
+            consume(ex.map(_evaluate_task, tasks))
+    return out
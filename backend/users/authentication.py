@@ -1,9 +1,42 @@
 # users/authentication.py
+import time
+
 from django.conf import settings
+from django.core.cache import caches
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 from users.models import User
 
+# Cached users carry every field except the password hash; it stays deferred,
+# so reading it (or saving the instance) goes back to the database.
+CACHED_FIELDS = [f.attname for f in User._meta.concrete_fields if f.attname != "password"]
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def user_changed_key(user_id):
+    return f"auth:user:{user_id}:changed"
+
+
+def _cache():
+    return caches[getattr(settings, "AUTH_USER_CACHE_ALIAS", "default")]
+
+
+def invalidate_user(user_id):
+    cache = _cache()
+    cache.delete(user_cache_key(user_id))
+    # access tokens issued before now no longer vouch for the user's claims;
+    # the mark can go once every such token has expired
+    cache.set(user_changed_key(user_id), time.time(), int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()) + 1)
+
+
+def _from_values(values):
+    return User.from_db("default", CACHED_FIELDS, values)
+
+
 class CustomJWTAuthentication(JWTAuthentication):
     # Use the configured USER_ID_CLAIM from SIMPLE_JWT if present, otherwise default to 'user_id'
     user_id_claim = settings.SIMPLE_JWT.get('USER_ID_CLAIM', 'user_id')
@@ -11,15 +44,43 @@ class CustomJWTAuthentication(JWTAuthentication):
     def get_user(self, validated_token):
         """
         Look up the user using our custom users.User model and the claim name defined above.
+
+        Resolution order:
+        1. JWT_TRUST_USER_CLAIMS: build the user from the token's `username` /
+           `is_admin` claims, no lookup at all, unless the user was saved or
+           deleted after the token was issued.
+        2. The user cache (AUTH_USER_CACHE_TIMEOUT seconds, cleared on save/delete).
+        3. The database.
         """
         try:
             user_id = validated_token[self.user_id_claim]
         except KeyError:
             raise InvalidToken("Token contained no recognizable user identification")
 
-        try:
-            user = User.objects.get(pk=user_id)
-        except User.DoesNotExist:
-            raise AuthenticationFailed("User not found", code="user_not_found")
+        cache = _cache()
+        if getattr(settings, "JWT_TRUST_USER_CLAIMS", False):
+            username = validated_token.get("username")
+            is_admin = validated_token.get("is_admin")
+            changed = cache.get(user_changed_key(user_id))
+            if (username is not None and is_admin is not None
+                    and (changed is None or validated_token.get("iat", 0) > changed)):
+                return User.from_db("default", ["id", "username", "is_admin"], [user_id, username, bool(is_admin)])
 
+        timeout = getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 0)
+        if not timeout:
+            return self._get_from_db(user_id)
+
+        key = user_cache_key(user_id)
+        values = cache.get(key)
+        if values is not None:
+            return _from_values(values)
+
+        user = self._get_from_db(user_id)
+        cache.set(key, [getattr(user, name) for name in CACHED_FIELDS], timeout)
         return user
+
+    def _get_from_db(self, user_id):
+        try:
+            return User.objects.only(*CACHED_FIELDS).get(pk=user_id)
+        except (User.DoesNotExist, ValueError, TypeError):
+            raise AuthenticationFailed("User not found", code="user_not_found")
@@ -0,0 +1,13 @@
+# users/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from users.authentication import invalidate_user
+from users.models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    # an admin flag or username change must not survive in the auth cache
+    invalidate_user(instance.pk)
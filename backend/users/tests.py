@@ -1,3 +1,81 @@
-from django.test import TestCase
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
 
-# Create your tests here.
+from users.authentication import CustomJWTAuthentication, user_cache_key
+from users.models import User
+from users.tokens import CustomRefreshToken
+
+
+@override_settings(AUTH_USER_CACHE_TIMEOUT=60, JWT_TRUST_USER_CLAIMS=False)
+class CachedUserTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="cached", email="c@example.com",
+                                        password=make_password("old"), is_admin=True)
+        cache.clear()
+        self.token = CustomRefreshToken.for_user(self.user).access_token
+        self.auth = CustomJWTAuthentication()
+
+    def test_second_request_is_served_from_cache(self):
+        with self.assertNumQueries(1):
+            self.auth.get_user(self.token)
+        with self.assertNumQueries(0):
+            user = self.auth.get_user(self.token)
+        self.assertEqual(user.username, "cached")
+
+    def test_password_change_drops_the_cached_user(self):
+        self.auth.get_user(self.token)
+        self.user.password = make_password("new")
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        with self.assertNumQueries(1):
+            self.auth.get_user(self.token)
+
+    def test_role_change_applies_at_once(self):
+        self.assertTrue(self.auth.get_user(self.token).is_admin)
+        self.user.is_admin = False
+        self.user.save()
+        self.assertFalse(self.auth.get_user(self.token).is_admin)
+
+    def test_deleted_user_is_rejected(self):
+        self.auth.get_user(self.token)
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+
+
+@override_settings(AUTH_USER_CACHE_TIMEOUT=60, JWT_TRUST_USER_CLAIMS=True)
+class TrustedClaimsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="trusted", email="t@example.com",
+                                        password=make_password("pw"), is_admin=True)
+        # the user was created well before the token was issued
+        cache.clear()
+        self.token = CustomRefreshToken.for_user(self.user).access_token
+        self.auth = CustomJWTAuthentication()
+
+    def test_claims_need_no_lookup(self):
+        with self.assertNumQueries(0):
+            user = self.auth.get_user(self.token)
+        self.assertEqual((user.pk, user.username, user.is_admin), (self.user.pk, "trusted", True))
+
+    def test_demotion_is_not_skipped(self):
+        self.user.is_admin = False
+        self.user.save()
+        with self.assertNumQueries(1):
+            user = self.auth.get_user(self.token)
+        self.assertFalse(user.is_admin)
+
+    def test_deletion_is_not_skipped(self):
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+
+    def test_token_issued_after_the_change_is_trusted_again(self):
+        self.user.is_admin = False
+        self.user.save()
+        token = CustomRefreshToken.for_user(self.user).access_token
+        token["iat"] += 1  # issued in a later second than the change
+        with self.assertNumQueries(0):
+            self.assertFalse(self.auth.get_user(token).is_admin)
@@ -6,4 +6,8 @@ class CustomRefreshToken(RefreshToken):
         token = super().for_user(user)
         # Force user_id to be an integer
         token['user_id'] = int(user.pk)
-        return token
\ No newline at end of file
+        # Carried into the access token; CustomJWTAuthentication can trust
+        # these instead of loading the user (settings.JWT_TRUST_USER_CLAIMS)
+        token['username'] = user.username
+        token['is_admin'] = bool(user.is_admin)
+        return token
@@ -10,6 +10,7 @@ from django.http import JsonResponse
 import json
 import base64
 from .serializers import UserSerializer, RegisterSerializer
+from backend.instrumentation import span
 
 def get_tokens_for_user(user):
     refresh = CustomRefreshToken.for_user(user)
@@ -23,7 +24,8 @@ def get_tokens_for_user(user):
 def signup(request):
     serializer = RegisterSerializer(data=request.data)
     if serializer.is_valid():
-        user = serializer.save()
+        with span('password_hash'):
+            user = serializer.save()
         tokens = get_tokens_for_user(user)
         return Response({
             'message': 'User registered successfully',
@@ -49,7 +51,9 @@ def login(request):
     except User.DoesNotExist:
         return Response({'error': 'Invalid username or password'}, status=status.HTTP_401_UNAUTHORIZED)
 
-    if not check_password(password, user.password):
+    with span('password_check'):
+        password_ok = check_password(password, user.password)
+    if not password_ok:
         return Response({'error': 'Invalid username or password'}, status=status.HTTP_401_UNAUTHORIZED)
 
     tokens = get_tokens_for_user(user)
@@ -0,0 +1,169 @@
+# watchlist/alerts.py
+"""
+Price alerts, evaluated right after each ingest (the pipeline's "alerts"
+stage) and delivered to an inbox of AlertEvent rows.
+
+A rule fires when its field crosses the threshold between a symbol's
+previous and latest bar: "close above 520" fires on the bar that takes the
+close from <= 520 to > 520 and stays quiet while it remains above. Without a
+previous value (a new listing, RSI still warming up) the latest value alone
+decides.
+
+Active rules are indexed per (symbol, field, direction) as sorted threshold
+arrays, blank-symbol rules expanded to their owner's watched symbols. A bar
+moving from `prev` to `value` fires exactly the "above" thresholds in
+[prev, value) and the "below" thresholds in (value, prev], two binary
+searches per array, so a bar costs O(log n + fired) however many rules
+there are. The index is rebuilt when alerts_version() changes.
+"""
+import threading
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from watchlist.models import WatchlistItem, AlertRule, AlertEvent
+from watchlist.signals import alerts_version
+
+UPDATE_BATCH = 1000
+
+
+def field_values(frame, field):
+    """
+    (previous, latest) value of an AlertRule field in a date-sorted frame
+    with the "chart" indicator columns; NaN when unknown.
+    """
+    if field == "close":
+        values = frame["Close"]
+    elif field == "change_pct":
+        values = frame["Close"].pct_change(fill_method=None) * 100
+    elif field == "volume":
+        values = frame["Volume"]
+    else:
+        values = frame["RSI14"]
+    tail = values.to_numpy(dtype=float)[-2:]
+    if len(tail) < 2:
+        return np.nan, float(tail[-1]) if len(tail) else np.nan
+    return float(tail[0]), float(tail[1])
+
+
+class AlertIndex:
+    def __init__(self, version, rows):
+        """
+        rows: (rule id, user id, symbol, field, direction, threshold) of the
+        active rules, symbols already expanded.
+        """
+        self.version = version
+        groups = {}
+        for rule_id, user_id, symbol, field, direction, threshold in rows:
+            groups.setdefault((symbol, field, direction), []).append((threshold, rule_id, user_id))
+
+        self.groups = {}
+        self.fields = {}
+        for (symbol, field, direction), entries in groups.items():
+            entries.sort()
+            self.groups[(symbol, field, direction)] = (
+                np.array([e[0] for e in entries], dtype=float),
+                np.array([e[1] for e in entries], dtype=np.int64),
+                np.array([e[2] for e in entries], dtype=np.int64),
+            )
+            self.fields.setdefault(symbol, set()).add(field)
+
+    def __len__(self):
+        return sum(len(g[0]) for g in self.groups.values())
+
+    def match(self, symbol, field, prev, value):
+        """
+        (rule ids, user ids) of the rules crossed by a move from prev to value.
+        """
+        matched = []
+        above = self.groups.get((symbol, field, "above"))
+        if above is not None:
+            lo = np.searchsorted(above[0], prev, side="left") if prev == prev else 0
+            hi = np.searchsorted(above[0], value, side="left")
+            if hi > lo:
+                matched.append((above[1][lo:hi], above[2][lo:hi]))
+        below = self.groups.get((symbol, field, "below"))
+        if below is not None:
+            lo = np.searchsorted(below[0], value, side="right")
+            hi = np.searchsorted(below[0], prev, side="right") if prev == prev else len(below[0])
+            if hi > lo:
+                matched.append((below[1][lo:hi], below[2][lo:hi]))
+        if not matched:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate([m[0] for m in matched]), np.concatenate([m[1] for m in matched])
+
+
+def _index_rows():
+    rules = AlertRule.objects.filter(active=True).values_list(
+        "id", "user_id", "symbol", "field", "direction", "threshold",
+    ).iterator(chunk_size=10000)
+    wildcard = []
+    for rule_id, user_id, symbol, field, direction, threshold in rules:
+        if symbol:
+            yield rule_id, user_id, symbol.upper(), field, direction, threshold
+        else:
+            wildcard.append((rule_id, user_id, field, direction, threshold))
+    if not wildcard:
+        return
+
+    watched = {}
+    items = WatchlistItem.objects.filter(user_id__in={w[1] for w in wildcard}).values_list("user_id", "symbol")
+    for user_id, symbol in items.iterator(chunk_size=10000):
+        watched.setdefault(user_id, set()).add(symbol.upper())
+    for rule_id, user_id, field, direction, threshold in wildcard:
+        for symbol in watched.get(user_id, ()):
+            yield rule_id, user_id, symbol, field, direction, threshold
+
+
+_lock = threading.Lock()
+_state = {"index": None}
+
+
+def get_index():
+    version = alerts_version()
+    index = _state["index"]
+    if index is not None and index.version == version:
+        return index
+    with _lock:
+        index = _state["index"]
+        if index is None or index.version != version:
+            index = AlertIndex(version, _index_rows())
+            _state["index"] = index
+    return index
+
+
+def evaluate(symbol, frame):
+    """
+    Check the latest bar of `frame` (date-sorted, "chart" indicator columns)
+    against the symbol's rules and add an inbox event for each rule that
+    fires. Returns the number of rules that fired.
+    """
+    symbol = symbol.upper()
+    index = get_index()
+    fields = index.fields.get(symbol)
+    if not fields or frame.empty:
+        return 0
+
+    bar_date = frame["Date"].iloc[-1].date()
+    events = []
+    for field in sorted(fields):
+        prev, value = field_values(frame, field)
+        if value != value:
+            continue
+        rule_ids, user_ids = index.match(symbol, field, prev, value)
+        events.extend(
+            AlertEvent(user_id=int(u), rule_id=int(r), symbol=symbol, bar_date=bar_date,
+                       value=value, previous=prev if prev == prev else None)
+            for r, u in zip(rule_ids, user_ids)
+        )
+    if not events:
+        return 0
+
+    fired = sorted({e.rule_id for e in events})
+    now = timezone.now()
+    with transaction.atomic():
+        AlertEvent.objects.bulk_create(events, ignore_conflicts=True, batch_size=UPDATE_BATCH)
+        for i in range(0, len(fired), UPDATE_BATCH):
+            AlertRule.objects.filter(id__in=fired[i:i + UPDATE_BATCH]).update(last_triggered_at=now)
+    return len(events)
@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-19 13:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_rename_date_joined_user_created_at_and_more'),
+        ('watchlist', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(blank=True, default='', max_length=32)),
+                ('field', models.CharField(choices=[('close', 'close'), ('change_pct', 'change_pct'), ('volume', 'volume'), ('rsi14', 'rsi14')], default='close', max_length=16)),
+                ('direction', models.CharField(choices=[('above', 'above'), ('below', 'below')], max_length=8)),
+                ('threshold', models.FloatField()),
+                ('active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_triggered_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alert_rules', to='users.user')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AlertEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=32)),
+                ('bar_date', models.DateField()),
+                ('value', models.FloatField()),
+                ('previous', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alert_events', to='users.user')),
+                ('rule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='watchlist.alertrule')),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['user', 'id'], name='alertevent_user_id')],
+                'constraints': [models.UniqueConstraint(fields=('rule', 'symbol', 'bar_date'), name='alertevent_rule_symbol_bar')],
+            },
+        ),
+    ]
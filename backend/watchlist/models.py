@@ -13,3 +13,52 @@ class WatchlistItem(models.Model):
 
     def __str__(self):
         return f"{self.user} — {self.symbol}"
+
+
+class AlertRule(models.Model):
+    """
+    "<field> of <symbol> goes <direction> <threshold>", checked by
+    watchlist.alerts after every ingest. A blank symbol applies the rule to
+    every symbol on the user's watchlist.
+    """
+    FIELDS = ("close", "change_pct", "volume", "rsi14")
+    DIRECTIONS = ("above", "below")
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="alert_rules")
+    symbol = models.CharField(max_length=32, blank=True, default="")
+    field = models.CharField(max_length=16, choices=[(f, f) for f in FIELDS], default="close")
+    direction = models.CharField(max_length=8, choices=[(d, d) for d in DIRECTIONS])
+    threshold = models.FloatField()
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_triggered_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.user} — {self.symbol or '*'} {self.field} {self.direction} {self.threshold}"
+
+
+class AlertEvent(models.Model):
+    """
+    A triggered alert in the user's inbox, at most one per rule, symbol and bar.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="alert_events")
+    rule = models.ForeignKey(AlertRule, on_delete=models.CASCADE, related_name="events")
+    symbol = models.CharField(max_length=32)
+    bar_date = models.DateField()
+    value = models.FloatField()
+    previous = models.FloatField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-id']
+        constraints = [
+            models.UniqueConstraint(fields=["rule", "symbol", "bar_date"], name="alertevent_rule_symbol_bar"),
+        ]
+        indexes = [models.Index(fields=["user", "id"], name="alertevent_user_id")]
+
+    def __str__(self):
+        return f"{self.user} — {self.symbol} {self.bar_date} {self.value}"
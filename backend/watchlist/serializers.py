@@ -1,8 +1,26 @@
 from rest_framework import serializers
-from .models import WatchlistItem
+from .models import WatchlistItem, AlertRule, AlertEvent
 
 class WatchlistItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = WatchlistItem
         fields = ['id', 'symbol', 'added_at']
         read_only_fields = ['id', 'added_at']
+
+
+class AlertRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AlertRule
+        fields = ['id', 'symbol', 'field', 'direction', 'threshold', 'active', 'created_at', 'last_triggered_at']
+        read_only_fields = ['id', 'created_at', 'last_triggered_at']
+
+    def validate_symbol(self, value):
+        return (value or "").strip().upper()
+
+
+class AlertEventSerializer(serializers.ModelSerializer):
+    rule = AlertRuleSerializer(read_only=True)
+
+    class Meta:
+        model = AlertEvent
+        fields = ['id', 'symbol', 'bar_date', 'value', 'previous', 'created_at', 'read_at', 'rule']
@@ -0,0 +1,66 @@
+# watchlist/signals.py
+import uuid
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from watchlist.models import WatchlistItem, AlertRule
+
+# Token that changes on every alert rule write, and on watchlist writes of
+# users with active blank-symbol rules (those follow the watchlist), so every
+# worker rebuilds its alert index.
+ALERTS_VERSION_KEY = "alerts:version"
+
+# Per-user set of watched symbols for membership checks, dropped on every
+# write to that user's watchlist.
+WATCHED_KEY = "watchlist:symbols:{}"
+WATCHED_TIMEOUT = 300
+
+
+def alerts_version():
+    version = cache.get(ALERTS_VERSION_KEY)
+    if version is None:
+        cache.add(ALERTS_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(ALERTS_VERSION_KEY)
+    return version
+
+
+def bump_alerts_version():
+    cache.set(ALERTS_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def watched_symbols(user_id):
+    """
+    frozenset of the symbols on the user's watchlist, cached.
+    """
+    key = WATCHED_KEY.format(user_id)
+    symbols = cache.get(key)
+    if symbols is None:
+        symbols = frozenset(
+            s.upper() for s in WatchlistItem.objects.filter(user_id=user_id).values_list("symbol", flat=True)
+        )
+        cache.set(key, symbols, WATCHED_TIMEOUT)
+    return symbols
+
+
+def watchlist_changed(user_id):
+    """
+    Invalidate after a write that sends no signals (bulk_create, raw delete).
+    The alert index only depends on the watchlist through blank-symbol rules.
+    """
+    cache.delete(WATCHED_KEY.format(user_id))
+    if AlertRule.objects.filter(user_id=user_id, symbol="", active=True).exists():
+        bump_alerts_version()
+
+
+@receiver(post_save, sender=AlertRule)
+@receiver(post_delete, sender=AlertRule)
+def alerts_changed(sender, instance, **kwargs):
+    bump_alerts_version()
+
+
+@receiver(post_save, sender=WatchlistItem)
+@receiver(post_delete, sender=WatchlistItem)
+def watchlist_item_changed(sender, instance, **kwargs):
+    watchlist_changed(instance.user_id)
@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from users.models import User
+from watchlist.alerts import AlertIndex
+from watchlist.models import WatchlistItem, AlertRule
+from watchlist.signals import alerts_version
+
+
+class AlertIndexTests(SimpleTestCase):
+    def setUp(self):
+        # thresholds are indexed out of order on purpose
+        self.index = AlertIndex("v", [
+            (1, 10, "NABIL", "close", "above", 520.0),
+            (2, 10, "NABIL", "close", "above", 500.0),
+            (3, 11, "NABIL", "close", "above", 540.0),
+            (4, 10, "NABIL", "close", "below", 480.0),
+            (5, 11, "NABIL", "close", "below", 500.0),
+            (6, 10, "ADBL", "close", "above", 500.0),
+        ])
+
+    def fired(self, prev, value, symbol="NABIL"):
+        rule_ids, _ = self.index.match(symbol, "close", prev, value)
+        return sorted(int(r) for r in rule_ids)
+
+    def test_crossing_up_fires_the_thresholds_passed(self):
+        self.assertEqual(self.fired(510, 530), [1])
+        self.assertEqual(self.fired(490, 550), [1, 2, 3])
+        # from <= threshold to > threshold
+        self.assertEqual(self.fired(520, 521), [1])
+
+    def test_staying_on_one_side_is_quiet(self):
+        self.assertEqual(self.fired(530, 535), [])
+        self.assertEqual(self.fired(510, 520), [])
+        self.assertEqual(self.fired(470, 460), [])
+
+    def test_crossing_down_fires_below_rules(self):
+        self.assertEqual(self.fired(505, 495), [5])
+        self.assertEqual(self.fired(500, 470), [4, 5])
+        self.assertEqual(self.fired(480, 479), [4])
+
+    def test_without_previous_value_the_latest_decides(self):
+        self.assertEqual(self.fired(float("nan"), 525), [1, 2])
+        self.assertEqual(self.fired(float("nan"), 490), [5])
+
+    def test_other_symbols_and_fields(self):
+        self.assertEqual(self.fired(490, 510, symbol="ADBL"), [6])
+        self.assertEqual(self.fired(490, 510, symbol="NICA"), [])
+        self.assertEqual(len(self.index.match("NABIL", "volume", 0, 1e9)[0]), 0)
+        self.assertEqual(len(self.index), 6)
+
+
+class AlertsVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="alerts-user", email="a@example.com", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_watchlist_edit_without_blank_rules_keeps_the_index(self):
+        AlertRule.objects.create(user=self.user, symbol="NABIL", direction="above", threshold=500)
+        version = alerts_version()
+        WatchlistItem.objects.create(user=self.user, symbol="ADBL")
+        self.client.post(reverse("watchlist_bulk_add"), {"symbols": ["NICA", "SBL"]}, format="json")
+        self.assertEqual(alerts_version(), version)
+
+    def test_watchlist_edit_with_blank_rules_rebuilds_the_index(self):
+        AlertRule.objects.create(user=self.user, symbol="", direction="above", threshold=500)
+        version = alerts_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("watchlist_bulk_add"), {"symbols": ["NICA", "SBL"]}, format="json")
+        self.assertNotEqual(alerts_version(), version)
+
+    def test_bulk_remove_is_one_delete(self):
+        WatchlistItem.objects.bulk_create([WatchlistItem(user=self.user, symbol=s) for s in ("A", "B", "C")])
+        with self.captureOnCommitCallbacks() as callbacks, self.assertNumQueries(2):
+            # select the found symbols, then a single DELETE
+            response = self.client.post(reverse("watchlist_bulk_remove"), {"symbols": ["A", "B", "C", "D"]},
+                                        format="json")
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(sorted(response.data["removed"]), ["A", "B", "C"])
+        self.assertFalse(WatchlistItem.objects.filter(user=self.user).exists())
@@ -6,4 +6,12 @@ urlpatterns = [
     path('add/', views.add_to_watchlist, name='watchlist_add'),   # POST
     path('remove/<str:symbol>/', views.remove_from_watchlist, name='watchlist_remove'),  # DELETE
     path('check/<str:symbol>/', views.check_watchlist, name='watchlist_check'),  # GET
+    path('bulk/add/', views.bulk_add_to_watchlist, name='watchlist_bulk_add'),  # POST
+    path('bulk/remove/', views.bulk_remove_from_watchlist, name='watchlist_bulk_remove'),  # POST
+    path('bulk/check/', views.bulk_check_watchlist, name='watchlist_bulk_check'),  # GET
+    path('summary/', views.watchlist_summary, name='watchlist_summary'),  # GET
+    path('alerts/', views.alert_rules, name='alert_rules'),  # GET, POST
+    path('alerts/<int:rule_id>/', views.delete_alert_rule, name='alert_rule_delete'),  # DELETE
+    path('alerts/inbox/', views.alert_inbox, name='alert_inbox'),  # GET
+    path('alerts/inbox/read/', views.mark_alerts_read, name='alert_inbox_read'),  # POST
 ]
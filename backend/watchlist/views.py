@@ -2,10 +2,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
-from .models import WatchlistItem
-from .serializers import WatchlistItemSerializer
+from .models import WatchlistItem, AlertRule, AlertEvent
+from .serializers import WatchlistItemSerializer, AlertRuleSerializer, AlertEventSerializer
+from .signals import watched_symbols, watchlist_changed
+from stockdata.snapshot import portfolio_summary
+from backend.instrumentation import span
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -19,9 +24,6 @@ def list_watchlist(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def add_to_watchlist(request):
-    print("request.user:", request.user, type(request.user))
-    print("HTTP_AUTHORIZATION:", request.META.get('HTTP_AUTHORIZATION'))
-
     user = request.user
     symbol = (request.data.get('symbol') or "").strip().upper()
 
@@ -54,5 +56,193 @@ def remove_from_watchlist(request, symbol):
 def check_watchlist(request, symbol):
     user = request.user
     symbol = symbol.strip().upper()
-    exists = WatchlistItem.objects.filter(user=user, symbol=symbol).exists()
-    return Response({'added': exists}, status=status.HTTP_200_OK)
+    return Response({'added': symbol in watched_symbols(user.id)}, status=status.HTTP_200_OK)
+
+
+MAX_BULK = 500
+
+
+def _symbol_list(value):
+    """
+    Upper-cased, de-duplicated symbols from a list or a comma separated
+    string, or None when the input is not usable.
+    """
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list) or not all(isinstance(s, str) for s in value):
+        return None
+    symbols = list(dict.fromkeys(s.strip().upper() for s in value if s.strip()))
+    if not symbols or len(symbols) > MAX_BULK:
+        return None
+    return symbols
+
+
+BULK_ERROR = f"'symbols' must be a non-empty list of at most {MAX_BULK} symbols"
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_add_to_watchlist(request):
+    """
+    Add {"symbols": [...]} in one transaction; symbols already watched are
+    reported, not duplicated.
+    """
+    symbols = _symbol_list(request.data.get('symbols'))
+    if symbols is None:
+        return Response({'error': BULK_ERROR}, status=status.HTTP_400_BAD_REQUEST)
+
+    user = request.user
+    with transaction.atomic():
+        existing = set(WatchlistItem.objects.filter(user=user, symbol__in=symbols).values_list('symbol', flat=True))
+        added = [s for s in symbols if s not in existing]
+        WatchlistItem.objects.bulk_create(
+            [WatchlistItem(user=user, symbol=s) for s in added], ignore_conflicts=True,
+        )
+    if added:
+        transaction.on_commit(lambda: watchlist_changed(user.id))
+    return Response({'added': added, 'existing': [s for s in symbols if s in existing]},
+                    status=status.HTTP_201_CREATED if added else status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_remove_from_watchlist(request):
+    """
+    Remove {"symbols": [...]} with one delete.
+    """
+    symbols = _symbol_list(request.data.get('symbols'))
+    if symbols is None:
+        return Response({'error': BULK_ERROR}, status=status.HTTP_400_BAD_REQUEST)
+
+    user = request.user
+    items = WatchlistItem.objects.filter(user=user, symbol__in=symbols)
+    found = set(items.values_list('symbol', flat=True))
+    if found:
+        # nothing references WatchlistItem: one DELETE, one invalidation
+        # instead of a post_delete signal per row
+        items._raw_delete(items.db)
+        transaction.on_commit(lambda: watchlist_changed(user.id))
+    return Response({'removed': [s for s in symbols if s in found], 'missing': [s for s in symbols if s not in found]},
+                    status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bulk_check_watchlist(request):
+    """
+    {symbol: watched} for ?symbols=A,B,C, from the cached watchlist set.
+    """
+    symbols = _symbol_list(request.GET.get('symbols', ''))
+    if symbols is None:
+        return Response({'error': BULK_ERROR}, status=status.HTTP_400_BAD_REQUEST)
+    watched = watched_symbols(request.user.id)
+    return Response({'added': {s: s in watched for s in symbols}}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def watchlist_summary(request):
+    """
+    Latest price, day change, 1W/1M/1Y returns and volatility for every
+    watchlist symbol, plus an equal-weight portfolio, in one response.
+    """
+    items = list(
+        WatchlistItem.objects.filter(user=request.user)
+        .order_by('-added_at')
+        .values_list('symbol', 'added_at')
+    )
+    symbols = [s.upper() for s, _ in items]
+
+    try:
+        with span('snapshot'):
+            summary = portfolio_summary(symbols)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    rows = []
+    for symbol, added_at in items:
+        row = {'symbol': symbol, 'added_at': added_at}
+        row.update(summary['items'].get(symbol.upper(), {}))
+        rows.append(row)
+
+    return Response({
+        'as_of': summary['as_of'],
+        'items': rows,
+        'portfolio': summary['portfolio'],
+    }, status=status.HTTP_200_OK)
+
+
+INBOX_LIMIT = 50
+INBOX_MAX_LIMIT = 200
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def alert_rules(request):
+    """
+    GET: the user's alert rules. POST: add one
+    ({symbol, field, direction, threshold}; a blank symbol covers the whole watchlist).
+    """
+    if request.method == 'GET':
+        rules = AlertRule.objects.filter(user=request.user)
+        return Response(AlertRuleSerializer(rules, many=True).data, status=status.HTTP_200_OK)
+
+    serializer = AlertRuleSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    serializer.save(user=request.user)
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+def delete_alert_rule(request, rule_id):
+    rule = get_object_or_404(AlertRule, id=rule_id, user=request.user)
+    rule.delete()
+    return Response({'message': 'Alert removed'}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def alert_inbox(request):
+    """
+    Triggered alerts, oldest first, at most `limit` per page. Poll with
+    ?after=<cursor of the previous response> to get the events not yet
+    delivered; "has_more" means the next page is already waiting.
+    ?unread=1 leaves out read ones.
+    """
+    try:
+        after = int(request.GET.get('after') or 0)
+        limit = min(int(request.GET.get('limit') or INBOX_LIMIT), INBOX_MAX_LIMIT)
+    except ValueError:
+        return Response({'error': "'after' and 'limit' must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+    events = AlertEvent.objects.filter(user=request.user, id__gt=after)
+    if request.GET.get('unread') in ('1', 'true'):
+        events = events.filter(read_at=None)
+    limit = max(limit, 1)
+    events = list(events.select_related('rule').order_by('id')[:limit + 1])
+    has_more = len(events) > limit
+    events = events[:limit]
+    return Response({
+        'events': AlertEventSerializer(events, many=True).data,
+        'cursor': events[-1].id if events else after,
+        'has_more': has_more,
+        'unread': AlertEvent.objects.filter(user=request.user, read_at=None).count(),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_alerts_read(request):
+    """
+    Mark the given event ids ({"ids": [...]}) or, without ids, every event as read.
+    """
+    events = AlertEvent.objects.filter(user=request.user, read_at=None)
+    ids = request.data.get('ids')
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return Response({'error': "'ids' must be a list of integers"}, status=status.HTTP_400_BAD_REQUEST)
+        events = events.filter(id__in=ids)
+    updated = events.update(read_at=timezone.now())
+    return Response({'updated': updated}, status=status.HTTP_200_OK)